@@ -1,14 +1,19 @@
+import csv
+import io
 import os
-import json
-import uuid
-import datetime
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 
-from sarif_parser import SarifParser, SeverityLevel
+import json_backend
+from sarif_parser import Finding, Location, SarifParser, SeverityLevel, ToolInfo
+from sarif_writer import SarifWriter
+from parse_cache import ParseCache
+from snippet_store import SnippetStore
+from storage import FILTER_KEYS, FINDING_KEYS, Storage, now_iso, open_storage, parse_sort
 
 
 APP = Flask(__name__)
@@ -17,28 +22,60 @@ CORS(APP)
 DATA_DIR = Path("data")
 DB_PATH = DATA_DIR / "db.json"
 
+# Opt-in parse cache: identical re-uploads skip JSON decoding entirely
+PARSE_CACHE = ParseCache(os.environ["DM_PARSE_CACHE_DIR"]) if os.environ.get("DM_PARSE_CACHE_DIR") else None
 
-def now_iso() -> str:
-    return datetime.datetime.utcnow().isoformat() + "Z"
 
+# Storage backend: "json" (data/db.json, default), "journal" (db.json snapshot +
+# append-only data/db.journal, single worker) or "sqlite" (data/db.sqlite3, indexed)
+STORAGE_BACKEND = os.environ.get("DM_STORAGE", "json")
 
-def load_db() -> Dict[str, Any]:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    if not DB_PATH.exists():
-        return {"projects": []}
-    try:
-        with DB_PATH.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"projects": []}
+# Decoded db.json cache for the json backend: "shared" (default, revalidated by
+# file stat, safe with several workers), "process" (single worker, no disk I/O
+# on reads) or "off"
+DB_CACHE = os.environ.get("DM_DB_CACHE", "shared")
+
+FINDING_STATUSES = ("new", "confirmed", "false-positive", "fixed")
+
+# /api/findings page size: default and upper bound for ?limit=
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Bytes of NDJSON/CSV accumulated before a chunk is sent to the client
+EXPORT_CHUNK_SIZE = 1 << 16
+
+# Findings read from storage per cursor query while exporting
+EXPORT_BATCH_SIZE = 1000
+
+_storage: Optional[Storage] = None
+_storage_key = None
+
+
+def get_storage() -> Storage:
+    # Reopened when DATA_DIR is repointed (tests, benchmarks)
+    global _storage, _storage_key
+    key = (STORAGE_BACKEND, DATA_DIR, DB_CACHE)
+    if _storage is None or _storage_key != key:
+        if _storage is not None:
+            _storage.close()
+        _storage = open_storage(STORAGE_BACKEND, DATA_DIR, None if DB_CACHE == "off" else DB_CACHE)
+        _storage_key = key
+    return _storage
 
 
-def save_db(db: Dict[str, Any]):
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    tmp = DB_PATH.with_suffix(".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-    tmp.replace(DB_PATH)
+def load_snippets() -> SnippetStore:
+    # Content-addressed code snippets shared by all uploads, one file per snippet next to db.json
+    return SnippetStore.open(DATA_DIR / "snippets")
+
+
+# UI severity back to SARIF level, for SARIF export
+SEVERITY_LEVELS = {
+    "critical": SeverityLevel.ERROR,
+    "high": SeverityLevel.ERROR,
+    "medium": SeverityLevel.WARNING,
+    "low": SeverityLevel.NOTE,
+    "info": SeverityLevel.NONE,
+}
 
 
 def map_severity(level: SeverityLevel) -> str:
@@ -52,22 +89,6 @@ def map_severity(level: SeverityLevel) -> str:
     return "info"
 
 
-def upsert_project(db: Dict[str, Any], name: str) -> Dict[str, Any]:
-    for p in db.get("projects", []):
-        if p.get("name") == name:
-            return p
-    project = {
-        "id": str(uuid.uuid4()),
-        "name": name,
-        "description": "",
-        "findings": [],
-        "tools": [],
-        "updated_at": now_iso(),
-    }
-    db.setdefault("projects", []).append(project)
-    return project
-
-
 @APP.route("/api/upload", methods=["POST"])
 def api_upload():
     # Accept multiple files under key 'file'
@@ -77,50 +98,52 @@ def api_upload():
     if not files:
         return jsonify({"error": "No files provided"}), 400
 
-    db = load_db()
-    project = upsert_project(db, project_name)
+    storage = get_storage()
+    snippets = load_snippets()
 
-    total_findings = 0
     total_size = 0
     tools: List[str] = []
+    records: List[Dict[str, Any]] = []
 
     for f in files:
         try:
             content = f.read()
             total_size += len(content)
-            data = json.loads(content.decode("utf-8"))
-            report = SarifParser.parse_dict(data)
+            # Every run of the log, each with its own tool
+            log = SarifParser.parse_log_bytes(content, cache=PARSE_CACHE)
         except Exception as e:
             return jsonify({"error": f"Failed to parse {f.filename}: {e}"}), 400
 
-        tool_name = report.tool.name
-        if tool_name and tool_name not in tools:
-            tools.append(tool_name)
-
-        for finding in report.findings:
-            total_findings += 1
-            # Choose primary location (first)
-            loc = finding.locations[0] if finding.locations else None
-            project["findings"].append({
-                "severity": map_severity(finding.level),
-                "ruleId": finding.rule_id,
-                "message": finding.message or finding.rule_name or finding.rule_id,
-                "file": loc.file_path if loc else "",
-                "tool": tool_name,
-                "status": "new",
-                "projectName": project["name"],
-                "created_at": now_iso(),
-            })
-
-        if tool_name and tool_name not in project["tools"]:
-            project["tools"].append(tool_name)
-
-    project["updated_at"] = now_iso()
-    save_db(db)
+        snippets.attach(log)
+        for report in log.reports:
+            tool_name = report.tool.name
+            if tool_name and tool_name not in tools:
+                tools.append(tool_name)
+
+            for finding in report.findings:
+                # Choose primary location (first)
+                loc = finding.locations[0] if finding.locations else None
+                records.append({
+                    "severity": map_severity(finding.level),
+                    "ruleId": finding.rule_id,
+                    "fingerprint": finding.fingerprint,
+                    "message": finding.message or finding.rule_name or finding.rule_id,
+                    "file": loc.file_path if loc else "",
+                    "snippetRef": loc.snippet_ref if loc else None,
+                    "tool": tool_name,
+                    "status": "new",
+                    "projectName": project_name,
+                    "created_at": now_iso(),
+                })
+
+    # Everything parsed: one write for the project and one for all findings
+    project = storage.upsert_project(project_name)
+    snippets.save()
+    storage.add_findings(project["id"], records, tools)
 
     return jsonify({
         "total_files": len(files),
-        "total_findings": total_findings,
+        "total_findings": len(records),
         "size_mb": round(total_size / (1024 * 1024), 2),
         "tools": tools,
         "projects": [{"id": project["id"], "name": project["name"]}],
@@ -129,77 +152,185 @@ def api_upload():
 
 @APP.route("/api/projects", methods=["GET"])
 def api_projects():
-    db = load_db()
-    out = []
-    for p in db.get("projects", []):
-        out.append({
-            "id": p.get("id"),
-            "name": p.get("name"),
-            "description": p.get("description"),
-            "total_findings": len(p.get("findings", [])),
-            "updated_at": p.get("updated_at"),
-        })
-    return jsonify(out)
+    return jsonify(get_storage().list_projects())
 
 
 @APP.route("/api/projects", methods=["POST"])
 def api_projects_create():
-    db = load_db()
     payload = request.get_json(silent=True) or {}
     name = (payload.get("name") or "").strip()
     if not name:
         return jsonify({"error": "name is required"}), 400
     description = (payload.get("description") or "").strip()
-    project = upsert_project(db, name)
-    if description:
-        project["description"] = description
-    project["updated_at"] = now_iso()
-    save_db(db)
-    return jsonify({
-        "id": project["id"],
-        "name": project["name"],
-        "description": project.get("description", ""),
-        "total_findings": len(project.get("findings", [])),
-        "updated_at": project.get("updated_at"),
-    })
+    return jsonify(get_storage().upsert_project(name, description))
+
+
+def arg_values(name: str) -> List[str]:
+    # Repeated (?severity=high&severity=low) or comma-separated (?severity=high,low)
+    values: List[str] = []
+    for raw in request.args.getlist(name):
+        values.extend(v.strip() for v in raw.split(",") if v.strip())
+    return values
+
+
+def finding_query() -> Dict[str, Any]:
+    # Query parameters shared by /api/findings and /api/findings/export
+    return {
+        "project_id": request.args.get("project_id"),
+        "filters": {key: arg_values(key) for key in FILTER_KEYS},
+        "file_prefix": request.args.get("file"),
+        "sort": request.args.get("sort"),
+    }
 
 
 @APP.route("/api/findings", methods=["GET"])
 def api_findings():
-    db = load_db()
-    project_id = request.args.get("project_id")
-    findings: List[Dict[str, Any]] = []
-    for p in db.get("projects", []):
-        if project_id and p.get("id") != project_id:
-            continue
-        findings.extend(p.get("findings", []))
-    # Optional simple sort by severity
-    return jsonify(findings)
+    # Filtered, sorted page of findings; follow next_cursor for the next page
+    try:
+        limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        page = get_storage().query_findings(limit=limit, cursor=request.args.get("cursor"), **finding_query())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    page["limit"] = limit
+    return jsonify(page)
+
+
+class ChunkSink:
+    # Write target for SarifWriter whose output is handed out by a generator
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes):
+        self.chunks.append(data)
+
+    def drain(self) -> List[bytes]:
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def record_to_finding(record: Dict[str, Any], snippets: SnippetStore) -> Finding:
+    ref = record.get("snippetRef")
+    location = Location(file_path=record.get("file") or "", snippet_ref=ref,
+                        snippet_store=snippets if ref else None)
+    return Finding(
+        rule_id=record.get("ruleId") or "",
+        message=record.get("message"),
+        level=SEVERITY_LEVELS.get(record.get("severity"), SeverityLevel.NONE),
+        locations=[location] if location.file_path else [],
+        fingerprint=record.get("fingerprint"),
+    )
+
+
+def export_ndjson(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    lines: List[str] = []
+    size = 0
+    for record in records:
+        line = json_backend.dumps(record)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines, size = [], 0
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def export_csv(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FINDING_KEYS)
+    for record in records:
+        writer.writerow([record.get(key) for key in FINDING_KEYS])
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def export_sarif(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    # One run per tool: records arrive sorted by tool
+    snippets = load_snippets()
+    sink = ChunkSink()
+    writer = SarifWriter(sink)
+    for tool, group in groupby(records, key=lambda record: record.get("tool") or ""):
+        writer.begin_run()
+        for record in group:
+            writer.write_result(record_to_finding(record, snippets))
+            yield from sink.drain()
+        writer.end_run(ToolInfo(name=tool or "unknown"))
+    writer.close()
+    yield from sink.drain()
+
+
+# format -> (generator, mimetype, file extension)
+EXPORT_FORMATS = {
+    "ndjson": (export_ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (export_csv, "text/csv", "csv"),
+    "sarif": (export_sarif, "application/sarif+json", "sarif"),
+}
+
+
+@APP.route("/api/findings/export", methods=["GET"])
+def api_findings_export():
+    # Streams every matching finding (chunked, constant server memory); same filters as /api/findings
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    query = finding_query()
+    if fmt == "sarif":
+        query["sort"] = "tool"
+    try:
+        parse_sort(query["sort"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    export, mimetype, extension = EXPORT_FORMATS[fmt]
+    records = get_storage().iter_matching(**query, batch_size=EXPORT_BATCH_SIZE)
+    return Response(
+        stream_with_context(export(records)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=findings.{extension}"},
+    )
+
+
+@APP.route("/api/findings/<finding_id>", methods=["PATCH"])
+def api_finding_update(finding_id: str):
+    payload = request.get_json(silent=True) or {}
+    status = payload.get("status")
+    if status not in FINDING_STATUSES:
+        return jsonify({"error": f"status must be one of: {', '.join(FINDING_STATUSES)}"}), 400
+    finding = get_storage().set_finding_status(finding_id, status)
+    if finding is None:
+        return jsonify({"error": "finding not found"}), 404
+    return jsonify(finding)
+
+
+@APP.route("/api/snippets/<ref>", methods=["GET"])
+def api_snippet(ref: str):
+    text = load_snippets().get(ref)
+    if text is None:
+        return jsonify({"error": "snippet not found"}), 404
+    return jsonify({"ref": ref, "text": text})
 
 
 @APP.route("/api/statistics", methods=["GET"])
 def api_statistics():
-    db = load_db()
-    total_findings = 0
-    total_projects = len(db.get("projects", []))
+    stats = get_storage().get_statistics()
     total_files = 0  # Not tracked per-file yet; could be derived if stored
-    by_severity = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
-
-    for p in db.get("projects", []):
-        for f in p.get("findings", []):
-            total_findings += 1
-            sev = f.get("severity", "info")
-            if sev in by_severity:
-                by_severity[sev] += 1
 
     return jsonify({
         "summary": {
-            "total_findings": total_findings,
-            "total_projects": total_projects,
+            "total_findings": stats["total_findings"],
+            "total_projects": stats["total_projects"],
             "total_files": total_files,
             "size_mb": None,
         },
-        "by_severity": by_severity,
+        "by_severity": stats["by_severity"],
     })
 
 
@@ -0,0 +1,242 @@
+"""
+Замеры производительности парсера SARIF
+
+Для каждого размера синтетического отчета (sarif_synth) измеряются время
+и пиковая память (tracemalloc) для SarifParser.parse_file,
+SarifReport.get_statistics и пути загрузки через API (/api/upload).
+Результаты пишутся в JSON и могут сравниваться с сохраненной базовой линией.
+
+Пример:
+    python bench_parser.py --sizes 1000,100000 --output bench.json
+    python bench_parser.py --baseline bench_baseline.json --tolerance 0.2
+"""
+
+import io
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import json_backend
+from sarif_parser import SarifParser
+from sarif_synth import SynthConfig, write_sarif_file
+
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+BENCH_FORMAT_VERSION = 1
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> Tuple[float, int]:
+    """
+    Замерить функцию
+
+    Время - медиана repeat запусков без трассировки памяти, пиковая память -
+    отдельный запуск под tracemalloc (трассировка заметно замедляет код).
+
+    Returns:
+        (секунды, пиковая память в байтах)
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def _api_upload(content: bytes, data_dir: Path) -> Optional[Callable[[], Any]]:
+    """Функция загрузки отчета через тестовый клиент Flask (None - Flask недоступен)"""
+    try:
+        import api_server
+    except ImportError:
+        return None
+
+    client = api_server.APP.test_client()
+
+    def upload():
+        api_server.DATA_DIR = data_dir
+        api_server.DB_PATH = data_dir / "db.json"
+        if api_server.DB_PATH.exists():
+            api_server.DB_PATH.unlink()
+        response = client.post(
+            "/api/upload",
+            data={"file": (io.BytesIO(content), "bench.sarif"), "project_name": "bench"},
+            content_type="multipart/form-data"
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/upload вернул {response.status_code}: {response.get_data(as_text=True)}")
+
+    return upload
+
+
+def run_benchmarks(sizes: List[int], config: SynthConfig, workdir: Path,
+                   repeat: int = 3, api: bool = True, compact: bool = False) -> List[Dict[str, Any]]:
+    """
+    Выполнить замеры для всех размеров
+
+    Args:
+        sizes: числа результатов в синтетических отчетах
+        config: остальные параметры генератора
+        workdir: каталог для сгенерированных файлов (готовые файлы переиспользуются)
+        repeat: число повторов для замера времени
+        api: замерять путь загрузки через API
+        compact: разбирать в компактное колоночное хранилище
+
+    Returns:
+        список записей {"benchmark", "results", "seconds", "peak_bytes"}
+    """
+    records = []
+    for size in sizes:
+        size_config = SynthConfig(**{**config.__dict__, "results": size})
+        sarif_path = workdir / (
+            f"synth_{size}_r{config.rules}_l{config.locations_per_result}"
+            f"_s{config.snippet_size}_x{config.runs}_{config.seed}.sarif"
+        )
+        if not sarif_path.exists():
+            write_sarif_file(str(sarif_path), size_config)
+
+        benchmarks: List[Tuple[str, Callable[[], Any]]] = [
+            ("parse_file", lambda: SarifParser.parse_file(str(sarif_path), compact=compact)),
+        ]
+        report = SarifParser.parse_file(str(sarif_path), compact=compact)
+        benchmarks.append(("get_statistics", report.get_statistics))
+        if api:
+            upload = _api_upload(sarif_path.read_bytes(), workdir / f"api_{size}")
+            if upload is None:
+                print("⚠️  Flask не установлен, замер /api/upload пропущен")
+            else:
+                benchmarks.append(("api_upload", upload))
+
+        for name, func in benchmarks:
+            seconds, peak = measure(func, repeat)
+            record = {
+                "benchmark": name,
+                "results": size,
+                "seconds": round(seconds, 6),
+                "peak_bytes": peak,
+            }
+            records.append(record)
+            print(f"  {name:<16} {size:>9}  {seconds:10.4f} s  {peak / 2**20:10.1f} MiB")
+        del report
+    return records
+
+
+def environment_info() -> Dict[str, Any]:
+    """Описание окружения для сопоставимости результатов"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "json_backend": json_backend.BACKEND,
+    }
+
+
+def compare_with_baseline(records: List[Dict[str, Any]], baseline: Dict[str, Any],
+                          tolerance: float) -> List[str]:
+    """
+    Сравнить результаты с базовой линией
+
+    Args:
+        records: текущие результаты
+        baseline: сохраненный документ с результатами
+        tolerance: допустимое относительное ухудшение (0.2 = на 20%)
+
+    Returns:
+        описания регрессий (пустой список - регрессий нет)
+    """
+    previous = {(r["benchmark"], r["results"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    print(f"\n{'Замер':<16} {'Размер':>9} {'Время':>10} {'Память':>10}")
+    for record in records:
+        key = (record["benchmark"], record["results"])
+        old = previous.get(key)
+        if old is None:
+            print(f"{key[0]:<16} {key[1]:>9} {'—':>10} {'—':>10}")
+            continue
+        ratios = {}
+        for metric in ("seconds", "peak_bytes"):
+            ratios[metric] = record[metric] / old[metric] if old[metric] else 1.0
+            if ratios[metric] > 1 + tolerance:
+                regressions.append(
+                    f"{key[0]} ({key[1]}): {metric} {old[metric]} -> {record[metric]} "
+                    f"(x{ratios[metric]:.2f})"
+                )
+        print(f"{key[0]:<16} {key[1]:>9} {ratios['seconds']:>9.2f}x {ratios['peak_bytes']:>9.2f}x")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Замеры производительности парсера SARIF")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="числа результатов через запятую")
+    parser.add_argument("--rules", type=int, default=SynthConfig.rules)
+    parser.add_argument("--locations", type=int, default=SynthConfig.locations_per_result)
+    parser.add_argument("--snippet-size", type=int, default=SynthConfig.snippet_size)
+    parser.add_argument("--runs", type=int, default=SynthConfig.runs)
+    parser.add_argument("--seed", type=int, default=SynthConfig.seed)
+    parser.add_argument("--repeat", type=int, default=3, help="повторов для замера времени")
+    parser.add_argument("--compact", action="store_true", help="компактное хранение находок")
+    parser.add_argument("--no-api", action="store_true", help="не замерять /api/upload")
+    parser.add_argument("--workdir", help="каталог для сгенерированных отчетов (по умолчанию временный)")
+    parser.add_argument("--output", help="сохранить результаты в JSON файл")
+    parser.add_argument("--baseline", help="JSON файл базовой линии для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="допустимое относительное ухудшение относительно базовой линии")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    config = SynthConfig(
+        rules=args.rules,
+        locations_per_result=args.locations,
+        snippet_size=args.snippet_size,
+        runs=args.runs,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="sarif_bench_") as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        records = run_benchmarks(sizes, config, workdir, repeat=args.repeat,
+                                 api=not args.no_api, compact=args.compact)
+
+    document = {
+        "version": BENCH_FORMAT_VERSION,
+        "environment": environment_info(),
+        "config": {**config.__dict__, "compact": args.compact, "repeat": args.repeat},
+        "results": records,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json_backend.dump(document, f, indent=2)
+        print(f"\n✅ Результаты сохранены в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "rb") as f:
+            baseline = json_backend.load(f)
+        regressions = compare_with_baseline(records, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Регрессии относительно базовой линии:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\n✅ Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,7 @@
 """
 
 from sarif_parser import SarifParser, SeverityLevel, print_report_summary
+from itertools import islice
 import os
 
 
@@ -161,37 +162,15 @@ def demo_file_analysis():
     
     print_section("Анализ по файлам")
     
-    # Собираем статистику по файлам
-    from collections import defaultdict
-    
-    files_stats = defaultdict(lambda: {
-        'total': 0,
-        'critical': 0,
-        'warnings': 0,
-        'notes': 0,
-        'types': set()
-    })
-    
-    for finding in report.findings:
-        for location in finding.locations:
-            if location.file_path:
-                file = location.file_path
-                files_stats[file]['total'] += 1
-                files_stats[file]['types'].add(finding.rule_id)
-                
-                if finding.level == SeverityLevel.ERROR:
-                    files_stats[file]['critical'] += 1
-                elif finding.level == SeverityLevel.WARNING:
-                    files_stats[file]['warnings'] += 1
-                else:
-                    files_stats[file]['notes'] += 1
+    # Статистика по файлам накоплена парсером
+    files_stats = report.get_stats().by_file
     
     print(f"Всего уникальных файлов с проблемами: {len(files_stats)}")
     
     # Топ-10 файлов
     sorted_files = sorted(
         files_stats.items(),
-        key=lambda x: x[1]['total'],
+        key=lambda x: x[1].total,
         reverse=True
     )
     
@@ -202,11 +181,19 @@ def demo_file_analysis():
         short_path = file if len(file) < 60 else "..." + file[-57:]
         
         print(f"{i:2}. {short_path}")
-        print(f"    └─ Всего: {stats['total']} | ", end="")
-        print(f"🔴 {stats['critical']} | ", end="")
-        print(f"🟡 {stats['warnings']} | ", end="")
-        print(f"🔵 {stats['notes']}")
-        print(f"       Типов проблем: {len(stats['types'])}")
+        notes = stats.total - stats.by_severity['error'] - stats.by_severity['warning']
+        print(f"    └─ Всего: {stats.total} | ", end="")
+        print(f"🔴 {stats.by_severity['error']} | ", end="")
+        print(f"🟡 {stats.by_severity['warning']} | ", end="")
+        print(f"🔵 {notes}")
+        print(f"       Типов проблем: {len(stats.rules)}")
+    
+    print_section("Анализ по каталогам")
+    
+    # Дерево каталогов строится по статистике файлов, без обхода находок
+    tree = report.get_stats().paths
+    for directory, count, depth in islice(tree.walk(max_depth=5), 25):
+        print(f"{'  ' * (depth - 1)}📁 {directory.rsplit('/', 1)[-1]}  [{count}]")
 
 
 def demo_export():
@@ -287,6 +274,20 @@ def demo_export():
         json.dump(data, f, indent=2, ensure_ascii=False)
     
     print(f"✅ Экспортировано в: {output_file}")
+    
+    print_section("Экспорт критических находок в SARIF")
+    
+    from sarif_writer import write_report
+    
+    output_file = "demo_export_errors.sarif"
+    count = write_report(
+        report,
+        output_file,
+        findings=(f for f in report.findings if f.level == SeverityLevel.ERROR)
+    )
+    
+    print(f"✅ Экспортировано в: {output_file}")
+    print(f"📊 Находок: {count}")
 
 
 def main():
@@ -3,6 +3,7 @@
 """
 
 from sarif_parser import SarifParser, SeverityLevel, print_report_summary, print_detailed_findings
+from sarif_diff import diff_reports
 
 
 def example_1_basic_parsing():
@@ -44,11 +45,8 @@ def example_3_filter_by_severity():
     
     report = SarifParser.parse_file("AI3.sarif")
     
-    # Фильтруем только критические ошибки
-    critical_findings = [
-        f for f in report.findings 
-        if f.level == SeverityLevel.ERROR
-    ]
+    # Фильтруем только критические ошибки (по индексу отчета)
+    critical_findings = report.query(severity=SeverityLevel.ERROR)
     
     print(f"\nКритические находки (ERROR): {len(critical_findings)}")
     
@@ -69,10 +67,7 @@ def example_4_filter_by_rule():
     report = SarifParser.parse_file("bbs1_ru.sarif")
     
     # Ищем все находки SQL Injection
-    sqli_findings = [
-        f for f in report.findings 
-        if f.rule_id == "sqli"
-    ]
+    sqli_findings = report.query(rule="sqli")
     
     print(f"\nНайдено SQL Injection: {len(sqli_findings)}")
     
@@ -169,6 +164,15 @@ def example_7_compare_reports():
     print(f"\nОбщие типы находок: {len(common_rules)}")
     print(f"Уникальные для отчета 1: {len(unique_to_1)}")
     print(f"Уникальные для отчета 2: {len(unique_to_2)}")
+    
+    # Сравниваем сами находки по отпечаткам
+    diff = diff_reports(report1, report2)
+    stats = diff.get_statistics()
+    
+    print(f"\nНовые находки: {stats['new']}")
+    print(f"Исправленные: {stats['fixed']}")
+    print(f"Перемещенные: {stats['moved']}")
+    print(f"Без изменений: {stats['unchanged']}")
 
 
 def example_8_generate_html_report():
@@ -0,0 +1,339 @@
+"""
+Компактное колоночное хранение находок SARIF
+
+FindingTable хранит находки не объектами Finding/Location, а набором
+целочисленных колонок (array, при наличии NumPy - с векторной статистикой)
+и словарями интернированных строк. Для миллиона результатов это в разы
+меньше памяти, чем список dataclass-объектов.
+"""
+
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from sarif_parser import CodeFlow, Finding, Location, Rule, SarifParser, SeverityLevel
+
+try:
+    import numpy as np
+except ImportError:  # NumPy опционален
+    np = None
+
+
+# Код уровня серьезности - позиция в перечислении SeverityLevel
+_SEVERITIES = list(SeverityLevel)
+_SEVERITY_CODES = {level: code for code, level in enumerate(_SEVERITIES)}
+
+# Значение целочисленной колонки, означающее None
+NULL = -1
+
+# Отпечатки хранятся подряд в bytearray по FINGERPRINT_SIZE байт,
+# нулевой отпечаток означает его отсутствие
+FINGERPRINT_SIZE = 16
+_NO_FINGERPRINT = bytes(FINGERPRINT_SIZE)
+
+
+class StringTable:
+    """Словарь интернированных строк: строка <-> плотный целочисленный индекс"""
+
+    __slots__ = ("values", "_index")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        """Получить индекс строки, добавив ее при первом появлении"""
+        if value is None:
+            return NULL
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.values)
+            self._index[value] = index
+            self.values.append(value)
+        return index
+
+    def get(self, index: int) -> Optional[str]:
+        """Получить строку по индексу"""
+        return None if index == NULL else self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.values = values
+        self._index = {value: index for index, value in enumerate(values)}
+
+
+def _int_or_null(value: Optional[int]) -> int:
+    return NULL if value is None else value
+
+
+def _null_or_int(value: int) -> Optional[int]:
+    return None if value == NULL else value
+
+
+class FindingRow:
+    """Представление строки FindingTable, совместимое с Finding"""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "FindingTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def rule_id(self) -> str:
+        return self._table.rule_ids.values[self._table.rule[self._index]]
+
+    @property
+    def rule_name(self) -> Optional[str]:
+        return self._table.texts.get(self._table.rule_name[self._index])
+
+    @property
+    def message(self) -> Optional[str]:
+        return self._table.texts.get(self._table.message[self._index])
+
+    @property
+    def level(self) -> SeverityLevel:
+        return _SEVERITIES[self._table.severity[self._index]]
+
+    @property
+    def locations(self) -> List[Location]:
+        return self._table.get_locations(self._index)
+
+    @property
+    def rule(self) -> Optional[Rule]:
+        return self._table.rule_refs[self._table.rule[self._index]]
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        return self._table.get_fingerprint(self._index)
+
+    @property
+    def code_flows(self) -> List[CodeFlow]:
+        return self._table.get_code_flows(self._index)
+
+    @property
+    def has_code_flows(self) -> bool:
+        return self._index in self._table.code_flows
+
+    def to_finding(self) -> Finding:
+        """Материализовать строку в объект Finding"""
+        finding = Finding(
+            rule_id=self.rule_id,
+            rule_name=self.rule_name,
+            message=self.message,
+            level=self.level,
+            locations=self.locations,
+            rule=self.rule,
+            fingerprint=self.fingerprint
+        )
+        code_flows = self._table.code_flows.get(self._index)
+        if code_flows is not None:
+            # Исходные трассы передаются без разбора
+            if code_flows and isinstance(code_flows[0], CodeFlow):
+                finding.code_flows = code_flows
+            else:
+                finding.defer_code_flows(code_flows)
+        return finding
+
+    def __eq__(self, other):
+        if isinstance(other, (Finding, FindingRow)):
+            if isinstance(other, FindingRow):
+                other = other.to_finding()
+            return self.to_finding() == other
+        return NotImplemented
+
+    def __repr__(self):
+        loc_count = self._table.location_count(self._index)
+        return f"Finding(rule_id='{self.rule_id}', level={self.level.value}, locations={loc_count})"
+
+
+def code_flows_source(finding) -> List[Any]:
+    """Исходные данные трасс, если они еще не разобраны, иначе объекты CodeFlow"""
+    if isinstance(finding, FindingRow):
+        return finding._table.code_flows[finding._index]
+    return finding.__dict__.get("_code_flows_data") or finding.code_flows
+
+
+class FindingTable:
+    """
+    Колоночное хранилище находок
+
+    Ведет себя как последовательность находок: поддерживает len(),
+    итерацию и индексацию, строки возвращаются как FindingRow.
+    """
+
+    def __init__(self):
+        # Словари строк
+        self.rule_ids = StringTable()
+        self.files = StringTable()
+        self.texts = StringTable()
+
+        # Колонки находок
+        self.rule = array("i")
+        self.rule_name = array("i")
+        self.message = array("i")
+        self.severity = array("b")
+        self.fingerprints = bytearray()
+        self.location_offsets = array("i", [0])
+
+        # Колонки локаций
+        self.location_file = array("i")
+        self.location_snippet = array("i")
+        self.start_line = array("i")
+        self.end_line = array("i")
+        self.start_column = array("i")
+        self.end_column = array("i")
+
+        # Трассы находок, у которых они есть: исходные данные codeFlows
+        # или уже разобранные объекты CodeFlow
+        self.code_flows: Dict[int, List[Any]] = {}
+
+        # Объект правила и первая строка (для имени и уровня в статистике)
+        # для каждого значения словаря rule_ids
+        self.rule_refs: List[Optional[Rule]] = []
+        self._rule_first_row = array("i")
+
+    @classmethod
+    def from_findings(cls, findings: Iterable[Finding]) -> "FindingTable":
+        """Построить таблицу из итерируемого набора находок"""
+        table = cls()
+        table.extend(findings)
+        return table
+
+    def append(self, finding: Finding):
+        """Добавить находку"""
+        row = len(self.rule)
+        rule = self.rule_ids.add(finding.rule_id)
+        if rule == len(self._rule_first_row):
+            self._rule_first_row.append(row)
+            self.rule_refs.append(finding.rule)
+
+        self.rule.append(rule)
+        self.rule_name.append(self.texts.add(finding.rule_name))
+        self.message.append(self.texts.add(finding.message))
+        self.severity.append(_SEVERITY_CODES[finding.level])
+        self.fingerprints += (
+            bytes.fromhex(finding.fingerprint) if finding.fingerprint else _NO_FINGERPRINT
+        )
+        if finding.has_code_flows:
+            self.code_flows[row] = code_flows_source(finding)
+
+        for location in finding.locations:
+            self.location_file.append(self.files.add(location.file_path))
+            self.location_snippet.append(self.texts.add(location.snippet))
+            self.start_line.append(_int_or_null(location.start_line))
+            self.end_line.append(_int_or_null(location.end_line))
+            self.start_column.append(_int_or_null(location.start_column))
+            self.end_column.append(_int_or_null(location.end_column))
+        self.location_offsets.append(len(self.location_file))
+
+    def extend(self, findings: Iterable[Finding]):
+        """Добавить несколько находок"""
+        for finding in findings:
+            self.append(finding)
+
+    def get_fingerprint(self, index: int) -> Optional[str]:
+        """Отпечаток находки в шестнадцатеричном виде"""
+        start = index * FINGERPRINT_SIZE
+        value = bytes(self.fingerprints[start:start + FINGERPRINT_SIZE])
+        return None if value == _NO_FINGERPRINT else value.hex()
+
+    def get_code_flows(self, index: int) -> List[CodeFlow]:
+        """Трассы находки (разбираются при первом обращении)"""
+        code_flows = self.code_flows.get(index)
+        if not code_flows:
+            return []
+        if not isinstance(code_flows[0], CodeFlow):
+            code_flows = self.code_flows[index] = SarifParser._parse_code_flows(code_flows)
+        return code_flows
+
+    def location_count(self, index: int) -> int:
+        """Число локаций у находки"""
+        return self.location_offsets[index + 1] - self.location_offsets[index]
+
+    def get_locations(self, index: int) -> List[Location]:
+        """Материализовать локации находки"""
+        return [
+            Location(
+                file_path=self.files.values[self.location_file[i]],
+                snippet=self.texts.get(self.location_snippet[i]),
+                start_line=_null_or_int(self.start_line[i]),
+                end_line=_null_or_int(self.end_line[i]),
+                start_column=_null_or_int(self.start_column[i]),
+                end_column=_null_or_int(self.end_column[i])
+            )
+            for i in range(self.location_offsets[index], self.location_offsets[index + 1])
+        ]
+
+    def column(self, name: str):
+        """
+        Получить колонку по имени
+
+        При наличии NumPy возвращается ndarray без копирования данных,
+        иначе - исходный array.
+        """
+        values = getattr(self, name)
+        if not isinstance(values, array):
+            raise KeyError(name)
+        if np is not None:
+            return np.frombuffer(values, dtype=values.typecode)
+        return values
+
+    def get_statistics(self, total_rules: int = 0) -> Dict[str, Any]:
+        """
+        Статистика в формате SarifReport.get_statistics, посчитанная по колонкам
+
+        Args:
+            total_rules: число правил в отчете
+        """
+        if np is not None:
+            severity_counts = np.bincount(self.column("severity"), minlength=len(_SEVERITIES)).tolist()
+            rule_counts = np.bincount(self.column("rule"), minlength=len(self.rule_ids)).tolist()
+        else:
+            severity_counter = Counter(self.severity)
+            severity_counts = [severity_counter[code] for code in range(len(_SEVERITIES))]
+            rule_counter = Counter(self.rule)
+            rule_counts = [rule_counter[rule] for rule in range(len(self.rule_ids))]
+
+        by_rule = {}
+        for rule, count in enumerate(rule_counts):
+            first = self._rule_first_row[rule]
+            rule_id = self.rule_ids.values[rule]
+            by_rule[rule_id] = {
+                "count": count,
+                "name": self.texts.get(self.rule_name[first]) or rule_id,
+                "level": _SEVERITIES[self.severity[first]].value
+            }
+
+        return {
+            "total_findings": len(self),
+            "total_rules": total_rules,
+            "by_severity": {
+                level.value: severity_counts[code] for code, level in enumerate(_SEVERITIES)
+            },
+            "by_rule": by_rule
+        }
+
+    def __len__(self):
+        return len(self.rule)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [FindingRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FindingTable index out of range")
+        return FindingRow(self, index)
+
+    def __iter__(self) -> Iterator[FindingRow]:
+        for index in range(len(self)):
+            yield FindingRow(self, index)
+
+    def __repr__(self):
+        return f"FindingTable(findings={len(self)}, files={len(self.files)}, rules={len(self.rule_ids)})"
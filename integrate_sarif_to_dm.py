@@ -6,23 +6,26 @@
 """
 
 from sarif_parser import SarifParser, SeverityLevel
+from parse_cache import ParseCache
 from datetime import datetime
 from pathlib import Path
-import json
+import json_backend
 
 
 class SecurityReportManager:
     """Менеджер отчетов безопасности для DM проекта"""
     
-    def __init__(self, reports_dir="security_reports"):
+    def __init__(self, reports_dir="security_reports", cache=None):
         """
         Инициализация менеджера
         
         Args:
             reports_dir: директория для хранения отчетов
+            cache: ParseCache, чтобы не парсить один и тот же файл повторно
         """
         self.reports_dir = Path(reports_dir)
         self.reports_dir.mkdir(exist_ok=True)
+        self.cache = cache
     
     def import_sarif_report(self, sarif_file_path, project_name="Unknown"):
         """
@@ -40,7 +43,7 @@ class SecurityReportManager:
         print(f"   Проект: {project_name}")
         
         # Парсим SARIF файл
-        report = SarifParser.parse_file(sarif_file_path)
+        report = SarifParser.parse_file(sarif_file_path, cache=self.cache)
         stats = report.get_statistics()
         
         # Создаем метаданные отчета
@@ -65,7 +68,7 @@ class SecurityReportManager:
         # Сохраняем метаданные
         metadata_file = self.reports_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(report_metadata, f, indent=2, ensure_ascii=False)
+            json_backend.dump(report_metadata, f, indent=2)
         
         print(f"\n✅ Отчет импортирован!")
         print(f"   Метаданные сохранены: {metadata_file}")
@@ -76,15 +79,7 @@ class SecurityReportManager:
     
     def _get_critical_files(self, report):
         """Получить список критичных файлов"""
-        critical_files = set()
-        
-        for finding in report.findings:
-            if finding.level == SeverityLevel.ERROR:
-                for location in finding.locations:
-                    if location.file_path:
-                        critical_files.add(location.file_path)
-        
-        return list(critical_files)
+        return report.get_stats().critical_files()
     
     def _get_top_issues(self, stats, limit=5):
         """Получить топ проблем"""
@@ -115,14 +110,18 @@ class SecurityReportManager:
         Returns:
             путь к созданному файлу
         """
-        report = SarifParser.parse_file(sarif_file_path)
+        report = SarifParser.parse_file(sarif_file_path, cache=self.cache)
         
         findings_list = []
         
         for finding in report.findings:
-            for location in finding.locations:
+            for index, location in enumerate(finding.locations):
+                # Отпечаток стабилен между запусками, в отличие от hash()
+                finding_id = f"{finding.rule_id}_{finding.fingerprint}"
+                if index:
+                    finding_id += f"_{index}"
                 finding_entry = {
-                    'id': f"{finding.rule_id}_{hash(location.file_path)}",
+                    'id': finding_id,
                     'title': finding.rule_name or finding.rule_id,
                     'description': finding.message or '',
                     'severity': finding.level.value,
@@ -138,7 +137,7 @@ class SecurityReportManager:
         if output_format == "json":
             output_file = self.reports_dir / f"findings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(findings_list, f, indent=2, ensure_ascii=False)
+                json_backend.dump(findings_list, f, indent=2)
         
         elif output_format == "csv":
             import csv
@@ -166,7 +165,7 @@ class SecurityReportManager:
         Returns:
             dict с данными для дашборда
         """
-        report = SarifParser.parse_file(sarif_file_path)
+        report = SarifParser.parse_file(sarif_file_path, cache=self.cache)
         stats = report.get_statistics()
         
         # Формируем данные для дашборда
@@ -194,7 +193,7 @@ class SecurityReportManager:
         # Сохраняем для дашборда
         output_file = self.reports_dir / "dashboard_data.json"
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(dashboard_data, f, indent=2, ensure_ascii=False)
+            json_backend.dump(dashboard_data, f, indent=2)
         
         print(f"✅ Данные для дашборда сохранены: {output_file}")
         
@@ -203,12 +202,10 @@ class SecurityReportManager:
     def _generate_recommendations(self, report):
         """Генерация рекомендаций на основе находок"""
         recommendations = []
+        stats = report.get_stats()
         
         # Подсчет критических
-        critical_count = sum(
-            1 for f in report.findings 
-            if f.level == SeverityLevel.ERROR
-        )
+        critical_count = stats.by_severity[SeverityLevel.ERROR.value]
         
         if critical_count > 0:
             recommendations.append({
@@ -218,8 +215,8 @@ class SecurityReportManager:
         
         # Подсчет SQL Injection
         sqli_count = sum(
-            1 for f in report.findings 
-            if 'sql' in f.rule_id.lower()
+            info['count'] for rule_id, info in stats.by_rule.items()
+            if 'sql' in rule_id.lower()
         )
         
         if sqli_count > 0:
@@ -230,8 +227,8 @@ class SecurityReportManager:
         
         # Подсчет XSS
         xss_count = sum(
-            1 for f in report.findings 
-            if 'xss' in f.rule_id.lower()
+            info['count'] for rule_id, info in stats.by_rule.items()
+            if 'xss' in rule_id.lower()
         )
         
         if xss_count > 0:
@@ -255,7 +252,10 @@ def demo_integration():
 """)
     
     # Создаем менеджер
-    manager = SecurityReportManager(reports_dir="security_reports")
+    manager = SecurityReportManager(
+        reports_dir="security_reports",
+        cache=ParseCache("security_reports/.cache")
+    )
     
     print("\n📁 Директория для отчетов создана: security_reports/\n")
     
@@ -0,0 +1,178 @@
+"""
+Подключаемый JSON бэкенд
+
+Декодирование JSON - самая дорогая часть парсинга больших отчетов.
+Модуль выбирает самую быструю доступную библиотеку (orjson, затем ujson)
+и откатывается на стандартный json. Бэкенд можно задать явно через
+переменную окружения DM_JSON_BACKEND (auto, orjson, ujson, json).
+
+Вывод dumps() совпадает байт в байт для всех бэкендов: отступ 2 пробела
+(или компактный вывод без пробелов), не-ASCII символы не экранируются.
+Исключения, которые не нормализуются (это потребовало бы обхода всего
+объекта в Python и свело бы выигрыш быстрых бэкендов на нет):
+
+- float в экспоненциальной записи: stdlib пишет 1e+16 и 1e-07, orjson -
+  1e16 и 1e-7. Это одни и те же JSON числа, loads() любого бэкенда читает
+  обе записи;
+- NaN и Infinity не входят в JSON: stdlib (и ujson, откатываясь на него)
+  вызывает ValueError, orjson записывает null.
+
+NaN, Infinity и -Infinity во входных данных stdlib, как и orjson,
+отклоняет (JSONDecodeError), поэтому документ, прочитанный одним из них,
+читается и другим.
+"""
+
+import codecs
+import json
+import os
+from typing import IO, Any, Optional
+
+
+ENV_VAR = "DM_JSON_BACKEND"
+BACKENDS = ("orjson", "ujson", "json")
+
+try:
+    import orjson
+except ImportError:  # orjson опционален
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # ujson опционален
+    ujson = None
+
+
+def available_backends():
+    """Список установленных бэкендов в порядке предпочтения"""
+    modules = {"orjson": orjson, "ujson": ujson, "json": json}
+    return [name for name in BACKENDS if modules[name] is not None]
+
+
+def reject_constant(name: str):
+    """parse_constant для json.JSONDecoder: NaN и Infinity не являются JSON"""
+    raise json.JSONDecodeError(f"{name} не является допустимым значением JSON", name, 0)
+
+
+def _json_dumps(obj: Any, indent: Optional[int]) -> str:
+    if indent is None:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    return json.dumps(obj, ensure_ascii=False, indent=indent, allow_nan=False)
+
+
+def _orjson_dumps(obj: Any, indent: Optional[int]) -> str:
+    if indent not in (None, 2):
+        return _json_dumps(obj, indent)
+    option = orjson.OPT_INDENT_2 if indent == 2 else 0
+    try:
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    except TypeError:
+        # Нестроковые ключи, целые больше 64 бит и т.п. - только stdlib
+        return _json_dumps(obj, indent)
+
+
+def _orjson_loads(data):
+    if isinstance(data, memoryview) and not data.c_contiguous:
+        data = data.tobytes()
+    return orjson.loads(data)
+
+
+def _ujson_dumps(obj: Any, indent: Optional[int]) -> str:
+    # Отступы ujson отличаются от stdlib, поэтому форматированный вывод
+    # строится стандартной библиотекой
+    if indent is not None:
+        return _json_dumps(obj, indent)
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+    except OverflowError:
+        return _json_dumps(obj, indent)
+
+
+def _ujson_loads(data):
+    if isinstance(data, (memoryview, bytearray)):
+        data = bytes(data)
+    return ujson.loads(data)
+
+
+def _json_loads(data):
+    if isinstance(data, memoryview):
+        # Декодирование прямо из буфера, без промежуточной копии в bytes;
+        # кодировка определяется так же, как в json.loads
+        if not data.c_contiguous:
+            data = data.tobytes()
+        else:
+            data = codecs.decode(data, json.detect_encoding(data[:4].tobytes()), "surrogatepass")
+    return json.loads(data, parse_constant=reject_constant)
+
+
+_IMPLEMENTATIONS = {
+    "orjson": (_orjson_loads, _orjson_dumps),
+    "ujson": (_ujson_loads, _ujson_dumps),
+    "json": (_json_loads, _json_dumps),
+}
+
+_ERRORS = {
+    "orjson": lambda: orjson.JSONDecodeError,
+    "ujson": lambda: ujson.JSONDecodeError,
+    "json": lambda: json.JSONDecodeError,
+}
+
+BACKEND = "json"
+JSONDecodeError = json.JSONDecodeError
+_loads = _json_loads
+_dumps = _json_dumps
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    Выбрать JSON бэкенд
+
+    Args:
+        name: auto, orjson, ujson или json
+
+    Returns:
+        имя выбранного бэкенда
+    """
+    global BACKEND, JSONDecodeError, _loads, _dumps
+
+    name = (name or "auto").strip().lower()
+    available = available_backends()
+    if name == "auto":
+        name = available[0]
+    elif name not in BACKENDS:
+        raise ValueError(f"Неизвестный JSON бэкенд: {name}")
+    elif name not in available:
+        raise ValueError(f"JSON бэкенд {name} не установлен")
+
+    BACKEND = name
+    JSONDecodeError = _ERRORS[name]()
+    _loads, _dumps = _IMPLEMENTATIONS[name]
+    return name
+
+
+def loads(data) -> Any:
+    """Декодировать JSON из str, bytes, bytearray или memoryview"""
+    return _loads(data)
+
+
+def load(fp: IO) -> Any:
+    """Декодировать JSON из файла (текстового или бинарного)"""
+    return _loads(fp.read())
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """
+    Сериализовать объект в JSON строку
+
+    Args:
+        obj: сериализуемый объект
+        indent: отступ (None - компактный вывод без пробелов)
+    """
+    return _dumps(obj, indent)
+
+
+def dump(obj: Any, fp: IO[str], indent: Optional[int] = None):
+    """Сериализовать объект в текстовый файл"""
+    fp.write(_dumps(obj, indent))
+
+
+set_backend(os.environ.get(ENV_VAR, "auto"))
@@ -0,0 +1,137 @@
+"""
+Кэш результатов парсинга SARIF
+
+Ключ кэша - SHA-256 исходных байтов отчета (плюс параметры парсинга),
+значение - разобранный SarifReport в компактном бинарном виде
+(pickle + zlib). Размер каталога ограничен, при переполнении
+удаляются записи, к которым дольше всего не обращались (LRU).
+"""
+
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+
+# Версия формата записей. Увеличивается при изменении структур парсера,
+# чтобы не загружать несовместимые объекты из старого кэша.
+CACHE_VERSION = 7
+
+_SUFFIX = ".sarifcache"
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class ParseCache:
+    """Дисковый кэш разобранных отчетов с LRU вытеснением"""
+
+    def __init__(self, cache_dir: str = ".sarif_cache", max_bytes: int = 512 * 1024 * 1024,
+                 compress: bool = True):
+        """
+        Args:
+            cache_dir: каталог для хранения записей
+            max_bytes: максимальный суммарный размер записей
+            compress: сжимать записи zlib
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content: bytes, **options: Any) -> str:
+        """
+        Ключ кэша для исходных байтов отчета
+
+        Args:
+            content: исходные байты SARIF файла
+            **options: параметры парсинга, влияющие на результат
+        """
+        digest = hashlib.sha256(content)
+        suffix = ",".join(f"{name}={options[name]!r}" for name in sorted(options))
+        digest.update(f"|v{CACHE_VERSION}|{suffix}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Получить объект по ключу (None, если записи нет или она повреждена)"""
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+
+        try:
+            if self.compress:
+                payload = zlib.decompress(payload)
+            value = pickle.loads(payload)
+        except Exception:
+            # Поврежденная или несовместимая запись - удаляем
+            _unlink(path)
+            self.misses += 1
+            return None
+
+        # Обновляем время доступа для LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        """Сохранить объект и при необходимости вытеснить старые записи"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+        if len(payload) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(path)
+
+        self.evict()
+
+    def evict(self):
+        """Удалить давно не использованные записи сверх лимита размера"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*/*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            _unlink(path)
+            total -= size
+
+    def clear(self):
+        """Удалить все записи"""
+        for path in self.cache_dir.glob(f"*/*{_SUFFIX}"):
+            _unlink(path)
+
+    def __repr__(self):
+        return f"ParseCache({str(self.cache_dir)!r}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,151 @@
+"""
+Профилирование фаз парсинга SARIF
+
+SarifParser сообщает наблюдателю (ParseObserver) время каждой фазы
+разбора и число обработанных объектов и байтов. Наблюдатель задается
+атрибутом SarifParser.observer; пока он равен None, парсер не вызывает
+таймеры вовсе. ParseProfile накапливает сводку по фазам.
+
+Пример:
+    with profiling() as profile:
+        SarifParser.parse_file("report.sarif")
+    print_profile(profile)
+
+Фазы вызываются только в текущем процессе: находки, разобранные в пуле
+процессов (parse_many, parse_log с workers > 1), в профиль не попадают.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from sarif_parser import SarifParser
+
+
+# Фазы верхнего уровня (в сумме дают общее время) и вложенные в них
+PHASE_READ = "read"
+PHASE_DECODE = "decode"
+PHASE_TOOL = "tool"
+PHASE_RULES = "rules"
+PHASE_FINDINGS = "findings"
+PHASE_LOCATIONS = "locations"
+PHASE_STATS = "stats"
+
+TOP_LEVEL_PHASES = (PHASE_READ, PHASE_DECODE, PHASE_TOOL, PHASE_RULES, PHASE_FINDINGS)
+NESTED_PHASES = {PHASE_FINDINGS: (PHASE_LOCATIONS, PHASE_STATS)}
+
+
+class ParseObserver:
+    """Наблюдатель за фазами парсинга (базовая реализация ничего не делает)"""
+
+    def on_phase(self, phase: str, seconds: float, objects: int = 0, nbytes: int = 0):
+        """
+        Фаза завершена
+
+        Args:
+            phase: имя фазы (PHASE_*)
+            seconds: затраченное время
+            objects: число разобранных объектов (правил, находок, локаций)
+            nbytes: число обработанных байтов (для read/decode - размер
+                документа, для locations - суммарная длина фрагментов кода)
+        """
+
+
+@dataclass
+class PhaseStats:
+    """Накопленные показатели одной фазы"""
+    calls: int = 0
+    seconds: float = 0.0
+    objects: int = 0
+    nbytes: int = 0
+
+
+class ParseProfile(ParseObserver):
+    """Наблюдатель, суммирующий показатели по фазам"""
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+
+    def on_phase(self, phase: str, seconds: float, objects: int = 0, nbytes: int = 0):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.objects += objects
+        stats.nbytes += nbytes
+
+    @property
+    def total_seconds(self) -> float:
+        """Суммарное время фаз верхнего уровня"""
+        return sum(self.phases[phase].seconds for phase in TOP_LEVEL_PHASES if phase in self.phases)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Машиночитаемое представление"""
+        return {
+            phase: {
+                "calls": stats.calls,
+                "seconds": stats.seconds,
+                "objects": stats.objects,
+                "bytes": stats.nbytes,
+            }
+            for phase, stats in self.phases.items()
+        }
+
+    def __repr__(self):
+        return f"ParseProfile(phases={len(self.phases)}, seconds={self.total_seconds:.4f})"
+
+
+@contextmanager
+def profiling(observer: Optional[ParseObserver] = None) -> Iterator[ParseObserver]:
+    """
+    Подключить наблюдателя к SarifParser на время блока with
+
+    Args:
+        observer: наблюдатель (по умолчанию - новый ParseProfile)
+    """
+    if observer is None:
+        observer = ParseProfile()
+    previous = SarifParser.observer
+    SarifParser.observer = observer
+    try:
+        yield observer
+    finally:
+        SarifParser.observer = previous
+
+
+def _format_bytes(nbytes: int) -> str:
+    if not nbytes:
+        return ""
+    for unit in ("B", "KiB", "MiB"):
+        if nbytes < 1024:
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f} GiB"
+
+
+def print_profile(profile: ParseProfile):
+    """Вывести разбивку времени парсинга по фазам"""
+    total = profile.total_seconds or 1e-12
+
+    print(f"\n{'='*80}")
+    print("Профиль парсинга")
+    print(f"{'='*80}\n")
+    print(f"{'Фаза':<16} {'Вызовы':>8} {'Время, с':>10} {'%':>6} {'Объекты':>10} {'Объем':>12}")
+
+    def line(name: str, stats: PhaseStats):
+        print(f"{name:<16} {stats.calls:>8} {stats.seconds:>10.4f} "
+              f"{100 * stats.seconds / total:>5.1f}% {stats.objects or '':>10} "
+              f"{_format_bytes(stats.nbytes):>12}")
+
+    for phase in TOP_LEVEL_PHASES:
+        stats = profile.phases.get(phase)
+        if stats is None:
+            continue
+        line(phase, stats)
+        for nested in NESTED_PHASES.get(phase, ()):
+            if nested in profile.phases:
+                line(f"  {nested}", profile.phases[nested])
+
+    print(f"\n{'Итого':<16} {'':>8} {profile.total_seconds:>10.4f}")
+    print(f"\n{'='*80}\n")
@@ -0,0 +1,144 @@
+"""
+Префиксное дерево путей файлов
+
+PathTrie хранит пути по компонентам каталогов; каждый узел (каталог
+или файл) содержит суммарный счетчик по своему поддереву, поэтому
+сводка по любому каталогу читается без повторного обхода находок.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def split_path(file_path: str) -> List[str]:
+    """Компоненты пути (разделители / и \\, пустые компоненты и "." отбрасываются)"""
+    return [part for part in file_path.replace("\\", "/").split("/") if part and part != "."]
+
+
+class PathTrieNode:
+    """Узел дерева путей"""
+
+    __slots__ = ("children", "count", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "PathTrieNode"] = {}
+        self.count = 0
+        self.values: Optional[List[Any]] = None
+
+    def iter_values(self) -> Iterator[Any]:
+        """Значения этого узла и всех потомков"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.values:
+                yield from node.values
+            stack.extend(node.children.values())
+
+
+class PathTrie:
+    """
+    Префиксное дерево путей файлов
+
+    Каждый узел (каталог или файл) хранит суммарный счетчик по своему
+    поддереву, листья могут хранить произвольные значения.
+    """
+
+    def __init__(self):
+        self.root = PathTrieNode()
+
+    def insert(self, file_path: str, value: Any = None, count: int = 1):
+        """
+        Добавить путь
+
+        Args:
+            file_path: путь к файлу
+            value: значение, сохраняемое в узле файла (None - не сохранять)
+            count: на сколько увеличить счетчики узлов по пути
+        """
+        node = self.root
+        node.count += count
+        for part in split_path(file_path):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = PathTrieNode()
+            node = child
+            node.count += count
+        if value is not None:
+            if node.values is None:
+                node.values = []
+            node.values.append(value)
+
+    def find(self, prefix: str) -> Optional[PathTrieNode]:
+        """Узел каталога или файла (None, если такого пути нет)"""
+        node = self.root
+        for part in split_path(prefix):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def count(self, prefix: str = "") -> int:
+        """Счетчик поддерева по префиксу пути"""
+        node = self.find(prefix)
+        return node.count if node is not None else 0
+
+    def children(self, prefix: str = "") -> Dict[str, int]:
+        """Непосредственные потомки каталога со счетчиками"""
+        node = self.find(prefix)
+        if node is None:
+            return {}
+        return {name: child.count for name, child in node.children.items()}
+
+    def values(self, prefix: str = "") -> Iterator[Any]:
+        """Значения всех файлов под префиксом"""
+        node = self.find(prefix)
+        if node is not None:
+            yield from node.iter_values()
+
+    def walk(self, prefix: str = "", max_depth: Optional[int] = None) -> Iterator[Tuple[str, int, int]]:
+        """
+        Обойти поддерево в глубину, потомков - по убыванию счетчика, затем по имени
+
+        Args:
+            prefix: каталог, с которого начинается обход (сам он не выдается)
+            max_depth: максимальная глубина относительно prefix (None - без ограничения)
+
+        Yields:
+            (путь, счетчик, глубина начиная с 1)
+        """
+        node = self.find(prefix)
+        if node is None:
+            return
+        base = "/".join(split_path(prefix))
+        stack = [(base, node, 0)]
+        while stack:
+            path, node, depth = stack.pop()
+            if depth:
+                yield path, node.count, depth
+            if max_depth is not None and depth >= max_depth:
+                continue
+            children = sorted(node.children.items(), key=lambda item: (-item[1].count, item[0]))
+            for name, child in reversed(children):
+                stack.append((f"{path}/{name}" if path else name, child, depth + 1))
+
+    def merge(self, other: "PathTrie") -> "PathTrie":
+        """Добавить счетчики и значения другого дерева (изменяет и возвращает self)"""
+        stack = [(self.root, other.root)]
+        while stack:
+            target, source = stack.pop()
+            target.count += source.count
+            if source.values:
+                if target.values is None:
+                    target.values = []
+                target.values.extend(source.values)
+            for name, child in source.children.items():
+                target_child = target.children.get(name)
+                if target_child is None:
+                    target_child = target.children[name] = PathTrieNode()
+                stack.append((target_child, child))
+        return self
+
+    def __len__(self):
+        return self.root.count
+
+    def __repr__(self):
+        return f"PathTrie(count={self.root.count}, top={len(self.root.children)})"
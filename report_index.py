@@ -0,0 +1,169 @@
+"""
+Вторичные индексы по находкам отчета
+
+ReportIndex строится один раз (лениво, при первом запросе) и позволяет
+фильтровать находки по уровню серьезности, правилу, файлу и каталогу
+без полного просмотра списка. Индекс по каталогам - дерево путей
+PathTrie (модуль path_trie), листья которого хранят позиции находок.
+
+Позиции хранятся отсортированными массивами array; объединения (набор
+уровней или правил, поддерево каталога) строятся один раз и кэшируются.
+Пересечение начинается с самого короткого списка: по остальным - двоичным
+поиском или по кэшируемой байтовой маске.
+"""
+
+from array import array
+from bisect import bisect_left
+from itertools import compress
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from path_trie import PathTrie
+from sarif_parser import SeverityLevel, normalize_path
+
+
+# Сколько объединений и масок хранить в кэше
+UNION_CACHE_SIZE = 256
+MASK_CACHE_SIZE = 32
+
+# Пересечение двоичным поиском, если короткий список меньше длинного
+# хотя бы во столько раз (иначе - по маске длинного списка)
+_BISECT_RATIO = 32
+
+_EMPTY = array("i")
+
+
+def _as_values(value: Union[Any, Iterable[Any]]) -> List[Any]:
+    if isinstance(value, (str, SeverityLevel)):
+        return [value]
+    return list(value)
+
+
+def _bisect_intersect(small: Sequence[int], large: Sequence[int]) -> array:
+    """Пересечение отсортированных списков двоичным поиском по длинному"""
+    result = array("i")
+    low, high = 0, len(large)
+    for position in small:
+        low = bisect_left(large, position, low, high)
+        if low == high:
+            break
+        if large[low] == position:
+            result.append(position)
+    return result
+
+
+def _cache_put(cache: Dict[Hashable, Any], key: Hashable, value: Any, size: int):
+    if len(cache) >= size:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+class ReportIndex:
+    """Индексы позиций находок по уровню, правилу, файлу и каталогу"""
+
+    def __init__(self, findings: Sequence):
+        self.size = len(findings)
+        self.by_severity: Dict[SeverityLevel, array] = {}
+        self.by_rule: Dict[str, array] = {}
+        self.by_file: Dict[str, array] = {}
+        self.paths = PathTrie()
+        self._unions: Dict[Hashable, Sequence[int]] = {}
+        self._masks: Dict[Hashable, bytearray] = {}
+
+        for position, finding in enumerate(findings):
+            positions = self.by_severity.get(finding.level)
+            if positions is None:
+                positions = self.by_severity[finding.level] = array("i")
+            positions.append(position)
+            positions = self.by_rule.get(finding.rule_id)
+            if positions is None:
+                positions = self.by_rule[finding.rule_id] = array("i")
+            positions.append(position)
+
+            seen: Set[str] = set()
+            for location in finding.locations:
+                file_path = normalize_path(location.file_path)
+                if not file_path or file_path in seen:
+                    continue
+                seen.add(file_path)
+                positions = self.by_file.get(file_path)
+                if positions is None:
+                    positions = self.by_file[file_path] = array("i")
+                    self.paths.insert(file_path, positions, count=0)
+                positions.append(position)
+                self.paths.insert(file_path, None)
+
+    def select(self, severity=None, rule=None, file: Optional[str] = None,
+               path_prefix: Optional[str] = None) -> List[int]:
+        """
+        Позиции находок, удовлетворяющих всем условиям
+
+        Args:
+            severity: SeverityLevel, его строковое значение или набор таких значений
+            rule: id правила или набор id
+            file: точный путь к файлу
+            path_prefix: каталог (сравнение по компонентам пути)
+
+        Returns:
+            отсортированный список позиций
+        """
+        # (ключ кэша, отсортированные позиции)
+        candidates: List[Tuple[Hashable, Sequence[int]]] = []
+
+        if severity is not None:
+            levels = frozenset(SeverityLevel(level) for level in _as_values(severity))
+            key = ("severity", levels)
+            candidates.append((key, self._union(key, lambda: (self.by_severity.get(level)
+                                                              for level in levels))))
+        if rule is not None:
+            rule_ids = frozenset(_as_values(rule))
+            key = ("rule", rule_ids)
+            candidates.append((key, self._union(key, lambda: (self.by_rule.get(rule_id)
+                                                              for rule_id in rule_ids))))
+        if file is not None:
+            file_path = normalize_path(file)
+            candidates.append((("file", file_path), self.by_file.get(file_path, _EMPTY)))
+        if path_prefix is not None:
+            node = self.paths.find(path_prefix)
+            candidates.append((node, _EMPTY if node is None else self._union(node, node.iter_values)))
+
+        if not candidates:
+            return list(range(self.size))
+
+        # Условия, которым удовлетворяют все находки, ничего не отсекают
+        candidates = [c for c in candidates if len(c[1]) < self.size] or candidates[:1]
+        candidates.sort(key=lambda candidate: len(candidate[1]))
+        result = candidates[0][1]
+        for key, positions in candidates[1:]:
+            if not result:
+                break
+            if len(result) * _BISECT_RATIO < len(positions):
+                result = _bisect_intersect(result, positions)
+            else:
+                result = array("i", compress(result, map(self._mask(key, positions).__getitem__, result)))
+        return result.tolist()
+
+    def _union(self, key: Hashable, lists: Callable[[], Iterable[Optional[Sequence[int]]]]) -> Sequence[int]:
+        """Объединение списков позиций lists() из кэша по ключу key"""
+        merged = self._unions.get(key)
+        if merged is None:
+            parts = [positions for positions in lists() if positions]
+            if len(parts) == 1:
+                merged = parts[0]
+            else:
+                merged = array("i", sorted(set().union(*parts)))
+            _cache_put(self._unions, key, merged, UNION_CACHE_SIZE)
+        return merged
+
+    def _mask(self, key: Hashable, positions: Sequence[int]) -> bytearray:
+        """Маска принадлежности позиций (байт на находку) из кэша по ключу key"""
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = bytearray(self.size)
+            for position in positions:
+                mask[position] = 1
+            _cache_put(self._masks, key, mask, MASK_CACHE_SIZE)
+        return mask
+
+    def __repr__(self):
+        return (f"ReportIndex(findings={self.size}, rules={len(self.by_rule)}, "
+                f"files={len(self.by_file)})")
@@ -0,0 +1,218 @@
+"""
+Сравнение двух SARIF отчетов: новые, исправленные, перемещенные находки
+
+Находки сопоставляются хэш-соединением по стабильному отпечатку
+(Finding.fingerprint). Находки без точного совпадения дополнительно
+сопоставляются по ключу без учета позиции (правило + файл + фрагмент кода)
+и считаются перемещенными. Время работы линейно; для файлов старый отчет
+читается потоково в два прохода, поэтому в памяти держатся только
+отпечатки, а не сами находки.
+"""
+
+import hashlib
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import json_backend
+from sarif_parser import (
+    Finding, SarifParser, SarifReport, SeverityLevel, normalize_path, normalize_snippet
+)
+
+
+Source = Union[str, SarifReport, Iterable[Finding]]
+
+_LEVEL_ORDER = {level.value: rank for rank, level in enumerate(SeverityLevel)}
+
+
+def location_key(finding: Finding) -> str:
+    """
+    Ключ находки без учета позиции в файле
+
+    Совпадает у находки, сдвинутой внутри файла (другие строки),
+    но с тем же правилом, файлом и фрагментом кода.
+    """
+    location = finding.locations[0] if finding.locations else None
+    parts = [finding.rule_id]
+    if location is not None:
+        parts.append(normalize_path(location.file_path))
+        parts.append(normalize_snippet(location.snippet) or finding.message or "")
+    else:
+        parts.append(finding.message or "")
+    return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class ReportDiff:
+    """Результат сравнения отчетов"""
+    new: List[Finding] = field(default_factory=list)
+    fixed: List[Finding] = field(default_factory=list)
+    moved: List[Tuple[Finding, Finding]] = field(default_factory=list)  # (старая, новая)
+    unchanged: List[Finding] = field(default_factory=list)  # только при keep_unchanged=True
+    unchanged_count: int = 0
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Число находок в каждой категории"""
+        return {
+            "new": len(self.new),
+            "fixed": len(self.fixed),
+            "moved": len(self.moved),
+            "unchanged": self.unchanged_count,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Машиночитаемое представление (без неизмененных находок)"""
+        def describe(finding: Finding) -> Dict[str, Any]:
+            location = finding.locations[0] if finding.locations else None
+            return {
+                "fingerprint": finding.fingerprint,
+                "rule_id": finding.rule_id,
+                "level": finding.level.value,
+                "message": finding.message,
+                "file": location.file_path if location else None,
+                "line": location.start_line if location else None,
+            }
+
+        return {
+            "statistics": self.get_statistics(),
+            "new": [describe(f) for f in self.new],
+            "fixed": [describe(f) for f in self.fixed],
+            "moved": [{"old": describe(old), "new": describe(new)} for old, new in self.moved],
+        }
+
+    def __repr__(self):
+        stats = self.get_statistics()
+        return (f"ReportDiff(new={stats['new']}, fixed={stats['fixed']}, "
+                f"moved={stats['moved']}, unchanged={stats['unchanged']})")
+
+
+def _replayable(source: Source) -> Callable[[], Iterator[Finding]]:
+    """Функция, позволяющая обойти находки источника несколько раз"""
+    if isinstance(source, str):
+        return lambda: SarifParser.iter_file(source)
+    if isinstance(source, SarifReport):
+        return lambda: iter(source.findings)
+    if not isinstance(source, Sequence):
+        # Одноразовый итератор - сохраняем находки
+        source = list(source)
+    return lambda: iter(source)
+
+
+def _require_fingerprint(finding: Finding) -> str:
+    if finding.fingerprint is None:
+        raise ValueError(f"У находки {finding!r} нет отпечатка (fingerprint)")
+    return finding.fingerprint
+
+
+def diff_reports(old: Source, new: Source, keep_unchanged: bool = False) -> ReportDiff:
+    """
+    Сравнить два отчета
+
+    Args:
+        old: предыдущий отчет - путь к SARIF файлу (читается потоково),
+            SarifReport или набор находок
+        new: новый отчет в тех же форматах
+        keep_unchanged: сохранять неизмененные находки (иначе только счетчик)
+
+    Returns:
+        ReportDiff с новыми, исправленными, перемещенными и неизмененными находками
+    """
+    old_findings = _replayable(old)
+    diff = ReportDiff()
+
+    # Проход 1: мультимножество отпечатков старого отчета
+    old_counts: Dict[str, int] = defaultdict(int)
+    for finding in old_findings():
+        old_counts[_require_fingerprint(finding)] += 1
+
+    # Новый отчет: точные совпадения - неизмененные находки
+    unmatched_new: Dict[str, deque] = defaultdict(deque)
+    new_source = SarifParser.iter_file(new) if isinstance(new, str) else (
+        new.findings if isinstance(new, SarifReport) else new
+    )
+    for finding in new_source:
+        fingerprint = _require_fingerprint(finding)
+        if old_counts.get(fingerprint, 0) > 0:
+            old_counts[fingerprint] -= 1
+            diff.unchanged_count += 1
+            if keep_unchanged:
+                diff.unchanged.append(finding)
+        else:
+            unmatched_new[location_key(finding)].append(finding)
+
+    # Проход 2: оставшиеся старые находки - перемещенные или исправленные
+    for finding in old_findings():
+        fingerprint = finding.fingerprint
+        if old_counts.get(fingerprint, 0) <= 0:
+            continue
+        old_counts[fingerprint] -= 1
+        candidates = unmatched_new.get(location_key(finding))
+        if candidates:
+            diff.moved.append((finding, candidates.popleft()))
+        else:
+            diff.fixed.append(finding)
+
+    for candidates in unmatched_new.values():
+        diff.new.extend(candidates)
+
+    return diff
+
+
+def print_diff_summary(diff: ReportDiff, max_findings: int = 10):
+    """Вывести результат сравнения"""
+    stats = diff.get_statistics()
+
+    print(f"\n{'='*80}")
+    print("Сравнение отчетов")
+    print(f"{'='*80}\n")
+    print(f"  🆕 Новые:         {stats['new']}")
+    print(f"  ✅ Исправленные:  {stats['fixed']}")
+    print(f"  ↕️  Перемещенные:  {stats['moved']}")
+    print(f"  ⚪ Без изменений: {stats['unchanged']}")
+
+    if diff.new:
+        print(f"\nНовые находки (первые {max_findings}):")
+        ordered = sorted(diff.new, key=lambda f: _LEVEL_ORDER[f.level.value])
+        for finding in ordered[:max_findings]:
+            location = finding.locations[0] if finding.locations else None
+            where = f"{location.file_path}:{location.start_line or ''}" if location else ""
+            print(f"  - [{finding.level.value}] {finding.rule_name or finding.rule_id} {where}")
+
+    print(f"\n{'='*80}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Сравнение двух SARIF отчетов",
+        epilog="Пример: python sarif_diff.py old.sarif new.sarif --fail-on-new error"
+    )
+    parser.add_argument("old", help="предыдущий SARIF отчет")
+    parser.add_argument("new", help="новый SARIF отчет")
+    parser.add_argument("--json", dest="json_path", help="сохранить результат в JSON файл")
+    parser.add_argument("--fail-on-new", nargs="?", const="note", default=None,
+                        choices=[level.value for level in SeverityLevel],
+                        help="код возврата 1 при новых находках уровня не ниже указанного")
+    args = parser.parse_args(argv)
+
+    diff = diff_reports(args.old, args.new)
+    print_diff_summary(diff)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json_backend.dump(diff.to_dict(), f, indent=2)
+
+    if args.fail_on_new:
+        threshold = _LEVEL_ORDER[args.fail_on_new]
+        if any(_LEVEL_ORDER[f.level.value] <= threshold for f in diff.new):
+            print("❌ Обнаружены новые находки")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Чтение SARIF файлов
+
+Файл отображается в память (mmap) и передается JSON декодеру байтами,
+без промежуточного декодирования в str и без лишней копии в памяти.
+Поддерживаются UTF-8 с BOM, а также UTF-16/UTF-32, которые выдают
+некоторые сканеры под Windows.
+
+Сжатые отчеты (gzip, bz2, xz, zip, а при установленном пакете zstandard -
+и zstd) распознаются по сигнатуре и распаковываются потоково, без
+временных файлов на диске. Объем распакованных данных ограничен
+MAX_DECOMPRESSED_SIZE (защита от zip-бомб).
+"""
+
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import mmap
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, List, Optional, TextIO, Tuple
+
+import json_backend
+
+try:
+    import zstandard
+except ImportError:  # zstd опционален
+    zstandard = None
+
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"PK\x03\x04", "zip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+# Достаточная длина начала файла для определения сжатия и кодировки
+HEAD_SIZE = 6
+
+# Расширения, по которым выбирается отчет внутри zip архива
+_ZIP_MEMBER_SUFFIXES = (".sarif", ".sarif.json", ".json")
+
+# Расширения сжатых отчетов (report.sarif.gz, report.zip и т.п.)
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst", ".zip")
+
+# Предельный размер распакованных данных в байтах (переменная окружения
+# DM_MAX_DECOMPRESSED_SIZE), при превышении чтение прерывается ValueError
+MAX_DECOMPRESSED_SIZE = int(os.environ.get("DM_MAX_DECOMPRESSED_SIZE", 1 << 30))
+
+_CHUNK_SIZE = 1 << 16
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """
+    Определить формат сжатия по сигнатуре
+
+    Args:
+        head: первые HEAD_SIZE байт файла
+
+    Returns:
+        "gzip", "bz2", "xz", "zip", "zstd" или None для несжатых данных
+    """
+    head = bytes(head[:HEAD_SIZE])
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _size_exceeded(max_size: int) -> ValueError:
+    return ValueError(f"Распакованные данные превышают {max_size} байт")
+
+
+def _zip_member(archive: zipfile.ZipFile) -> str:
+    """Имя SARIF отчета внутри zip архива"""
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    if len(names) == 1:
+        return names[0]
+    for suffix in _ZIP_MEMBER_SUFFIXES:
+        for name in names:
+            if name.lower().endswith(suffix):
+                return name
+    raise ValueError("zip архив не содержит SARIF отчета")
+
+
+class _DecompressedStream(io.RawIOBase):
+    """
+    Поток распакованных данных, при закрытии закрывающий всю цепочку потоков
+
+    Чтение сверх max_size байт прерывается ValueError.
+    """
+
+    def __init__(self, stream: BinaryIO, closers: List[Any], max_size: int):
+        self._stream = stream
+        self._closers = closers
+        self._max_size = max_size
+        self._size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        self._size += len(data)
+        if self._size > self._max_size:
+            raise _size_exceeded(self._max_size)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            for closer in reversed(self._closers):
+                closer.close()
+        super().close()
+
+
+def open_decompressed(raw: BinaryIO, compression: str,
+                      max_size: Optional[int] = None) -> io.BufferedReader:
+    """
+    Потоково распаковать бинарный поток
+
+    Args:
+        raw: сжатые данные (для zip поток должен поддерживать seek)
+        compression: формат из detect_compression
+        max_size: предельный размер распакованных данных (None - MAX_DECOMPRESSED_SIZE)
+
+    Returns:
+        буферизованный поток распакованных данных; закрывает и raw
+    """
+    if max_size is None:
+        max_size = MAX_DECOMPRESSED_SIZE
+    closers: List[Any] = [raw]
+    if compression == "gzip":
+        stream = gzip.GzipFile(fileobj=raw, mode="rb")
+    elif compression == "bz2":
+        stream = bz2.BZ2File(raw)
+    elif compression == "xz":
+        stream = lzma.LZMAFile(raw)
+    elif compression == "zip":
+        archive = zipfile.ZipFile(raw)
+        closers.append(archive)
+        member = archive.getinfo(_zip_member(archive))
+        if member.file_size > max_size:
+            archive.close()
+            raise _size_exceeded(max_size)
+        stream = archive.open(member)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ValueError("Для чтения zstd установите пакет zstandard")
+        stream = zstandard.ZstdDecompressor().stream_reader(raw)
+    else:
+        raise ValueError(f"Неизвестный формат сжатия: {compression}")
+    closers.append(stream)
+    return io.BufferedReader(_DecompressedStream(stream, closers, max_size), buffer_size=_CHUNK_SIZE)
+
+
+def decompress_bytes(data, max_size: Optional[int] = None) -> Any:
+    """
+    Распаковать данные, если они сжаты
+
+    Данные распаковываются порциями, поэтому превышение предела
+    обнаруживается без распаковки всего архива.
+
+    Args:
+        data: bytes, bytearray или memoryview
+        max_size: предельный размер распакованных данных (None - MAX_DECOMPRESSED_SIZE)
+
+    Returns:
+        исходный объект для несжатых данных, иначе распакованный bytearray
+
+    Raises:
+        ValueError: распакованные данные больше max_size
+    """
+    compression = detect_compression(data[:HEAD_SIZE])
+    if compression is None:
+        return data
+    result = bytearray()
+    with open_decompressed(io.BytesIO(data), compression, max_size) as stream:
+        while True:
+            chunk = stream.read(_CHUNK_SIZE)
+            if not chunk:
+                return result
+            result += chunk
+
+
+def open_binary(file_path: str) -> io.BufferedReader:
+    """Открыть файл для чтения, сжатый файл - с потоковой распаковкой"""
+    raw = open(file_path, "rb")
+    try:
+        compression = detect_compression(raw.peek(HEAD_SIZE))
+        if compression is None:
+            return raw
+        return open_decompressed(raw, compression)
+    except Exception:
+        raw.close()
+        raise
+
+
+def is_sarif_path(file_path: str) -> bool:
+    """Похоже ли имя файла на SARIF отчет (в том числе сжатый)"""
+    name = os.path.basename(file_path).lower()
+    if name.endswith(".zip"):
+        return True
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name.endswith(".sarif")
+
+
+def detect_encoding(head: bytes) -> Tuple[str, int]:
+    """
+    Определить кодировку JSON документа по первым байтам
+
+    Args:
+        head: первые (минимум 4) байта документа
+
+    Returns:
+        (кодировка, длина BOM в байтах)
+    """
+    head = bytes(head[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+
+    # Без BOM: JSON начинается с ASCII символа, по нулевым байтам
+    # определяем ширину и порядок байт (как json.detect_encoding)
+    if len(head) >= 4:
+        if not head[0] and not head[1] and not head[2]:
+            return "utf-32-be", 0
+        if not head[1] and not head[2] and not head[3]:
+            return "utf-32-le", 0
+    if len(head) >= 2:
+        if not head[0]:
+            return "utf-16-be", 0
+        if not head[1]:
+            return "utf-16-le", 0
+    return "utf-8", 0
+
+
+@contextmanager
+def map_file(file_path: str) -> Iterator[memoryview]:
+    """
+    Отобразить файл в память только для чтения
+
+    Yields:
+        memoryview содержимого (действителен только внутри блока with)
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def loads_bytes(data) -> Any:
+    """
+    Декодировать JSON из байтов с учетом BOM и кодировки
+
+    Args:
+        data: bytes, bytearray или memoryview (в том числе сжатые)
+    """
+    data = decompress_bytes(data)
+    encoding, bom_length = detect_encoding(data[:4])
+    # Срез освобождается явно: иначе при ошибке разбора он остается жить
+    # в трассировке исключения и не дает закрыть отображение файла
+    if encoding == "utf-8":
+        if bom_length:
+            with memoryview(data) as view, view[bom_length:] as body:
+                return json_backend.loads(body)
+        return json_backend.loads(data)
+    # UTF-16/32 приходится перекодировать в str
+    with memoryview(data) as view, view[bom_length:] as body:
+        text = codecs.decode(body, encoding)
+    return json_backend.loads(text)
+
+
+def load_file(file_path: str) -> Any:
+    """Декодировать JSON файл (сжатый или нет) через отображение в память"""
+    with map_file(file_path) as view:
+        return loads_bytes(view)
+
+
+def open_text(file_path: str) -> TextIO:
+    """Открыть JSON файл (сжатый или нет) как текстовый поток с автоопределением кодировки"""
+    binary = open_binary(file_path)
+    try:
+        encoding, bom_length = detect_encoding(binary.peek(4))
+        binary.read(bom_length)
+    except Exception:
+        binary.close()
+        raise
+    return io.TextIOWrapper(binary, encoding=encoding)
@@ -7,12 +7,22 @@ SARIF Parser - парсер для отчетов в формате SARIF 2.1.0
 - Другие инструменты, использующие стандарт SARIF 2.1.0
 """
 
-import json
+import gc
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Set, Tuple
 from pathlib import Path
 from enum import Enum
 
+import json_backend
+import sarif_io
+from path_trie import PathTrie
+from sarif_stream import JsonStreamReader
+
 
 class SeverityLevel(Enum):
     """Уровни серьезности находок"""
@@ -31,6 +41,7 @@ class Rule:
     description_markdown: Optional[str] = None
     level: SeverityLevel = SeverityLevel.NOTE
     enabled: bool = True
+    guid: Optional[str] = None
     
     def __repr__(self):
         return f"Rule(id='{self.id}', name='{self.name}', level={self.level.value})"
@@ -38,13 +49,30 @@ class Rule:
 
 @dataclass
 class Location:
-    """Локация находки в коде"""
+    """
+    Локация находки в коде
+    
+    Фрагмент кода хранится либо в самой локации, либо в хранилище
+    фрагментов (snippet_store.SnippetStore): тогда локация содержит только
+    ссылку snippet_ref, а текст читается из хранилища при обращении к snippet.
+    """
     file_path: str
     snippet: Optional[str] = None
     start_line: Optional[int] = None
     end_line: Optional[int] = None
     start_column: Optional[int] = None
     end_column: Optional[int] = None
+    snippet_ref: Optional[str] = field(default=None, repr=False, compare=False)
+    snippet_store: Optional[Any] = field(default=None, repr=False, compare=False)
+    
+    def __getstate__(self):
+        # Хранилище не сериализуется вместе с локацией: в pickle (кэш,
+        # пул процессов) попадает сам текст фрагмента
+        state = dict(self.__dict__)
+        if state.get("snippet_store") is not None:
+            state["_snippet"] = self.snippet
+            state["snippet_store"] = None
+        return state
     
     def __repr__(self):
         location_str = self.file_path
@@ -55,20 +83,350 @@ class Location:
         return f"Location({location_str})"
 
 
+def _get_snippet(location: Location) -> Optional[str]:
+    text = location.__dict__.get("_snippet")
+    if text is None and location.snippet_ref is not None and location.snippet_store is not None:
+        return location.snippet_store.get(location.snippet_ref)
+    return text
+
+
+def _set_snippet(location: Location, text: Optional[str]):
+    location.__dict__["_snippet"] = text
+
+
+# snippet объявлен полем dataclass (для конструктора и сравнения),
+# а хранится через свойство, чтобы текст можно было читать из хранилища
+Location.snippet = property(_get_snippet, _set_snippet)
+
+
+@dataclass
+class ThreadFlowLocation:
+    """Шаг трассы потока данных (threadFlows[].locations[])"""
+    location: Optional[Location] = None
+    message: Optional[str] = None
+    nesting_level: Optional[int] = None
+    execution_order: Optional[int] = None
+    importance: Optional[str] = None
+    kinds: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ThreadFlow:
+    """Последовательность шагов в одном потоке выполнения"""
+    id: Optional[str] = None
+    message: Optional[str] = None
+    locations: List[ThreadFlowLocation] = field(default_factory=list)
+
+
+@dataclass
+class CodeFlow:
+    """Трасса (например, путь распространения taint-данных от источника к стоку)"""
+    message: Optional[str] = None
+    thread_flows: List[ThreadFlow] = field(default_factory=list)
+
+
 @dataclass
 class Finding:
-    """Находка (уязвимость или проблема)"""
+    """
+    Находка (уязвимость или проблема)
+    
+    code_flows разбираются лениво: парсер сохраняет ссылку на исходный
+    массив codeFlows, а объекты CodeFlow строятся при первом обращении.
+    """
     rule_id: str
     rule_name: Optional[str] = None
     message: Optional[str] = None
     level: SeverityLevel = SeverityLevel.NOTE
     locations: List[Location] = field(default_factory=list)
+    rule: Optional[Rule] = field(default=None, repr=False, compare=False)  # общий объект правила
+    fingerprint: Optional[str] = field(default=None, repr=False)
+    code_flows: Optional[List[CodeFlow]] = field(default=None, repr=False, compare=False)
+    
+    def defer_code_flows(self, code_flows_data: Optional[List[Dict[str, Any]]]):
+        """Сохранить исходный массив codeFlows для разбора при первом обращении"""
+        self.__dict__.pop("_code_flows", None)
+        if code_flows_data:
+            self.__dict__["_code_flows_data"] = code_flows_data
+        else:
+            self.__dict__.pop("_code_flows_data", None)
+    
+    @property
+    def has_code_flows(self) -> bool:
+        """Есть ли у находки трассы (без их разбора)"""
+        return bool(self.__dict__.get("_code_flows") or self.__dict__.get("_code_flows_data"))
     
     def __repr__(self):
         loc_count = len(self.locations)
         return f"Finding(rule_id='{self.rule_id}', level={self.level.value}, locations={loc_count})"
 
 
+def _get_code_flows(finding: Finding) -> List[CodeFlow]:
+    code_flows = finding.__dict__.get("_code_flows")
+    if code_flows is None:
+        data = finding.__dict__.get("_code_flows_data")
+        if not data:
+            return []
+        code_flows = finding.__dict__["_code_flows"] = SarifParser._parse_code_flows(data)
+        del finding.__dict__["_code_flows_data"]
+    return code_flows
+
+
+def _set_code_flows(finding: Finding, code_flows: Optional[List[CodeFlow]]):
+    # Без трасс атрибуты не создаются, чтобы не увеличивать __dict__ находки
+    finding.__dict__.pop("_code_flows_data", None)
+    if code_flows is None:
+        finding.__dict__.pop("_code_flows", None)
+    else:
+        finding.__dict__["_code_flows"] = code_flows
+
+
+# code_flows объявлен полем dataclass, но хранится через свойство:
+# трассы разбираются из исходных данных только при обращении
+Finding.code_flows = property(_get_code_flows, _set_code_flows)
+
+
+# Поля, которые можно запросить у парсера (параметр fields)
+FINDING_FIELDS = frozenset({"rule_id", "rule_name", "message", "level", "fingerprint", "code_flows"})
+LOCATION_FIELDS = frozenset({"file_path", "snippet", "start_line", "end_line",
+                             "start_column", "end_column"})
+RULE_FIELDS = frozenset({"description_text", "description_markdown"})
+ALL_FIELDS = FINDING_FIELDS | LOCATION_FIELDS | RULE_FIELDS | {"locations"}
+
+# Поля Location и соответствующие ключи region в SARIF
+_REGION_KEYS = (("start_line", "startLine"), ("end_line", "endLine"),
+                ("start_column", "startColumn"), ("end_column", "endColumn"))
+
+# Минимальный набор для статистики по уровням и правилам (без локаций)
+STATS_FIELDS = frozenset({"rule_id", "rule_name", "level"})
+
+
+def normalize_fields(fields: Optional[Iterable[str]]) -> Optional[frozenset]:
+    """
+    Проверить и дополнить набор запрошенных полей
+    
+    rule_id и level нужны всегда и добавляются автоматически,
+    "locations" означает все поля локаций.
+    
+    Returns:
+        frozenset полей или None, если запрошены все поля
+    """
+    if fields is None:
+        return None
+    fields = frozenset(fields)
+    unknown = fields - ALL_FIELDS
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    if "locations" in fields:
+        fields |= LOCATION_FIELDS
+    fields |= {"rule_id", "level"}
+    if fields >= ALL_FIELDS - {"locations"}:
+        return None
+    return fields
+
+
+def normalize_path(file_path: str) -> str:
+    """Нормализовать URI файла для сравнения между отчетами"""
+    path = file_path.replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+def normalize_snippet(text: Optional[str]) -> str:
+    """Нормализовать фрагмент кода: пробельные символы не влияют на сравнение"""
+    return " ".join(text.split()) if text else ""
+
+
+# Ключ partialFingerprints, под которым SarifWriter сохраняет отпечаток находки
+FINGERPRINT_KEY = "dmFingerprint/v1"
+
+
+def _is_fingerprint(value: Any) -> bool:
+    if not isinstance(value, str) or len(value) != 32:
+        return False
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return False
+    return True
+
+
+def compute_fingerprint(result: Dict[str, Any], rule_id: str) -> str:
+    """
+    Стабильный отпечаток находки
+    
+    Отпечаток, ранее записанный SarifWriter (partialFingerprints с ключом
+    FINGERPRINT_KEY), используется как есть. Если инструмент передал другие
+    partialFingerprints, отпечаток строится по ним, иначе - по правилу,
+    пути, региону и фрагменту кода первой локации (для находок без
+    локаций - по тексту сообщения). В отличие от hash() значение не
+    зависит от процесса и PYTHONHASHSEED.
+    
+    Args:
+        result: элемент results
+        rule_id: id правила находки
+        
+    Returns:
+        шестнадцатеричная строка (128 бит)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    parts = [rule_id]
+    
+    partial = result.get("partialFingerprints")
+    if partial and _is_fingerprint(partial.get(FINGERPRINT_KEY)):
+        return partial[FINGERPRINT_KEY].lower()
+    if partial:
+        parts.extend(f"{key}={partial[key]}" for key in sorted(partial))
+    else:
+        locations = result.get("locations")
+        if locations:
+            physical = locations[0].get("physicalLocation", {})
+            region = physical.get("region", {})
+            parts.append(normalize_path(physical.get("artifactLocation", {}).get("uri", "")))
+            parts.extend(str(region.get(key, "")) for key in
+                         ("startLine", "startColumn", "endLine", "endColumn"))
+            parts.append(normalize_snippet(region.get("snippet", {}).get("text")))
+        else:
+            parts.append(result.get("message", {}).get("text") or "")
+    
+    digest.update("\0".join(parts).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FingerprintIndex:
+    """
+    Хэш-индекс находок по отпечатку
+    
+    Дедупликация находок из любого числа отчетов за O(n),
+    проверка принадлежности - за O(1).
+    """
+    
+    def __init__(self):
+        self._findings: Dict[str, Finding] = {}
+        self.duplicates = 0
+    
+    def add(self, finding: Finding) -> bool:
+        """
+        Добавить находку
+        
+        Returns:
+            True, если находка с таким отпечатком встретилась впервые
+        """
+        fingerprint = finding.fingerprint
+        if fingerprint is None:
+            raise ValueError("У находки нет отпечатка (fingerprint)")
+        if fingerprint in self._findings:
+            self.duplicates += 1
+            return False
+        self._findings[fingerprint] = finding
+        return True
+    
+    def deduplicate(self, findings: Iterable[Finding]) -> Iterator[Finding]:
+        """Вернуть только находки, которых еще нет в индексе"""
+        for finding in findings:
+            if self.add(finding):
+                yield finding
+    
+    def get(self, fingerprint: str) -> Optional[Finding]:
+        """Первая находка с указанным отпечатком"""
+        return self._findings.get(fingerprint)
+    
+    def __contains__(self, item) -> bool:
+        fingerprint = item.fingerprint if isinstance(item, Finding) else item
+        return fingerprint in self._findings
+    
+    def __len__(self):
+        return len(self._findings)
+    
+    def __iter__(self) -> Iterator[Finding]:
+        return iter(self._findings.values())
+    
+    def __repr__(self):
+        return f"FingerprintIndex(unique={len(self)}, duplicates={self.duplicates})"
+
+
+class RuleResolver:
+    """
+    Разрешение ссылок находок на правила
+    
+    Индексирует правила tool.driver и всех tool.extensions по позиции
+    в массиве, GUID и id. Если SARIF указывает индекс (ruleIndex или
+    rule.index), правило берется прямой индексацией.
+    """
+    
+    def __init__(self, driver_rules: Optional[List[Rule]] = None,
+                 extensions: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            driver_rules: правила tool.driver в порядке массива
+            extensions: компоненты tool.extensions: словари с ключами
+                name, guid и rules (список Rule в порядке массива)
+        """
+        self.driver_rules = driver_rules or []
+        self.extensions = extensions or []
+        self.by_id: Dict[str, Rule] = {}
+        self.by_guid: Dict[str, Rule] = {}
+        self._components_by_guid: Dict[str, List[Rule]] = {}
+        self._components_by_name: Dict[str, List[Rule]] = {}
+        
+        # Правила драйвера имеют приоритет над правилами расширений
+        for rules in [self.driver_rules] + [ext["rules"] for ext in self.extensions]:
+            for rule in rules:
+                self.by_id.setdefault(rule.id, rule)
+                if rule.guid:
+                    self.by_guid.setdefault(rule.guid, rule)
+        
+        for extension in self.extensions:
+            if extension.get("guid"):
+                self._components_by_guid[extension["guid"]] = extension["rules"]
+            if extension.get("name"):
+                self._components_by_name.setdefault(extension["name"], extension["rules"])
+    
+    @property
+    def rules(self) -> Dict[str, Rule]:
+        """Все правила запуска по id"""
+        return self.by_id
+    
+    def _component(self, reference: Dict[str, Any]) -> Optional[List[Rule]]:
+        """Правила компонента по toolComponentReference"""
+        index = reference.get("index")
+        if index is not None:
+            if 0 <= index < len(self.extensions):
+                return self.extensions[index]["rules"]
+            return None
+        guid = reference.get("guid")
+        if guid:
+            return self._components_by_guid.get(guid)
+        return self._components_by_name.get(reference.get("name"))
+    
+    def resolve(self, result: Dict[str, Any]) -> Optional[Rule]:
+        """Найти правило для элемента results"""
+        rule_id = result.get("ruleId")
+        index = result.get("ruleIndex", -1)
+        component = self.driver_rules
+        
+        reference = result.get("rule")
+        if reference:
+            guid = reference.get("guid")
+            if guid and guid in self.by_guid:
+                return self.by_guid[guid]
+            index = reference.get("index", index)
+            rule_id = rule_id or reference.get("id")
+            if "toolComponent" in reference:
+                component = self._component(reference["toolComponent"])
+        
+        if component is not None and 0 <= index < len(component):
+            return component[index]
+        
+        if rule_id:
+            rule = self.by_id.get(rule_id)
+            if rule is None and "/" in rule_id:
+                # Иерархический id вида "CA2101/1" ссылается на правило "CA2101"
+                rule = self.by_id.get(rule_id.split("/", 1)[0])
+            return rule
+        return None
+
+
 @dataclass
 class ToolInfo:
     """Информация об инструменте сканирования"""
@@ -82,16 +440,230 @@ class ToolInfo:
         return f"ToolInfo({self.name}{ver})"
 
 
+def _empty_severity_counts() -> Dict[str, int]:
+    return {level.value: 0 for level in SeverityLevel}
+
+
+@dataclass
+class FileStats:
+    """Статистика находок по одному файлу"""
+    total: int = 0
+    by_severity: Dict[str, int] = field(default_factory=_empty_severity_counts)
+    rules: Set[str] = field(default_factory=set)
+    
+    def merge(self, other: "FileStats"):
+        self.total += other.total
+        for level, count in other.by_severity.items():
+            self.by_severity[level] += count
+        self.rules |= other.rules
+
+
+@dataclass
+class ReportStats:
+    """
+    Накопитель статистики, обновляемый во время парсинга
+    
+    Считает находки по уровню серьезности, правилам, файлам и каталогам
+    за один проход; статистики нескольких отчетов объединяются через merge().
+    Файлы считаются по локациям находок, сводка по каталогам (paths)
+    строится из by_file по требованию. Правила учитываются множеством
+    идентификаторов, поэтому общие для нескольких отчетов правила при
+    объединении не задваиваются.
+    """
+    total_findings: int = 0
+    rule_ids: Set[str] = field(default_factory=set)
+    by_severity: Dict[str, int] = field(default_factory=_empty_severity_counts)
+    by_rule: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    by_file: Dict[str, FileStats] = field(default_factory=dict)
+    _paths: Optional[PathTrie] = field(default=None, init=False, repr=False, compare=False)
+    _paths_total: int = field(default=-1, init=False, repr=False, compare=False)
+    
+    @classmethod
+    def from_findings(cls, findings: Iterable["Finding"], rule_ids: Iterable[str] = ()) -> "ReportStats":
+        """
+        Посчитать статистику по готовому набору находок
+        
+        Args:
+            findings: находки отчета
+            rule_ids: идентификаторы правил отчета
+        """
+        stats = cls(rule_ids=set(rule_ids))
+        for finding in findings:
+            stats.add(finding)
+        return stats
+    
+    @property
+    def total_rules(self) -> int:
+        """Число различных правил"""
+        return len(self.rule_ids)
+    
+    def add(self, finding: "Finding"):
+        """Учесть одну находку"""
+        level = finding.level.value
+        rule_id = finding.rule_id
+        
+        self.total_findings += 1
+        self.by_severity[level] += 1
+        
+        rule_stats = self.by_rule.get(rule_id)
+        if rule_stats is None:
+            rule_stats = self.by_rule[rule_id] = {
+                "count": 0,
+                "name": finding.rule_name or rule_id,
+                "level": level
+            }
+        rule_stats["count"] += 1
+        
+        for location in finding.locations:
+            file_path = location.file_path
+            if not file_path:
+                continue
+            file_stats = self.by_file.get(file_path)
+            if file_stats is None:
+                file_stats = self.by_file[file_path] = FileStats()
+            file_stats.total += 1
+            file_stats.by_severity[level] += 1
+            file_stats.rules.add(rule_id)
+    
+    def merge(self, other: "ReportStats") -> "ReportStats":
+        """Добавить статистику другого отчета (изменяет и возвращает self)"""
+        self.total_findings += other.total_findings
+        self.rule_ids |= other.rule_ids
+        for level, count in other.by_severity.items():
+            self.by_severity[level] += count
+        
+        for rule_id, info in other.by_rule.items():
+            if rule_id in self.by_rule:
+                self.by_rule[rule_id]["count"] += info["count"]
+            else:
+                self.by_rule[rule_id] = dict(info)
+        
+        for file_path, file_stats in other.by_file.items():
+            if file_path not in self.by_file:
+                self.by_file[file_path] = FileStats()
+            self.by_file[file_path].merge(file_stats)
+        
+        return self
+    
+    @property
+    def paths(self) -> PathTrie:
+        """
+        Дерево каталогов: счетчик узла - число находок в файлах его поддерева
+        
+        Строится по by_file (один раз на каждый уникальный файл, без обхода
+        находок) и перестраивается, только если статистика изменилась.
+        """
+        if self._paths is None or self._paths_total != self.total_findings:
+            paths = PathTrie()
+            for file_path, file_stats in self.by_file.items():
+                paths.insert(file_path, count=file_stats.total)
+            self._paths = paths
+            self._paths_total = self.total_findings
+        return self._paths
+    
+    def critical_files(self) -> List[str]:
+        """Файлы, в которых есть находки уровня error"""
+        return [path for path, stats in self.by_file.items() if stats.by_severity["error"]]
+    
+    def to_statistics(self) -> Dict[str, Any]:
+        """Статистика в формате SarifReport.get_statistics()"""
+        return {
+            "total_findings": self.total_findings,
+            "total_rules": self.total_rules,
+            "by_severity": dict(self.by_severity),
+            "by_rule": {rule_id: dict(info) for rule_id, info in self.by_rule.items()}
+        }
+
+
 @dataclass
 class SarifReport:
     """SARIF отчет"""
     tool: ToolInfo
     rules: Dict[str, Rule] = field(default_factory=dict)
-    findings: List[Finding] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)  # или FindingTable при compact=True
     sarif_version: str = "2.1.0"
+    stats: Optional[ReportStats] = field(default=None, repr=False)
+    _index: Optional[Any] = field(default=None, init=False, repr=False, compare=False)
+    # Номер изменения находок; stats действительна для _stats_version
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _stats_version: int = field(default=0, init=False, repr=False, compare=False)
+    _index_version: int = field(default=0, init=False, repr=False, compare=False)
+    
+    def invalidate(self):
+        """
+        Отметить, что находки изменены
+        
+        Статистика и индексы пересчитываются при следующем обращении.
+        add_findings() вызывает его сам; после изменения списка findings
+        напрямую (замена или правка находки) его нужно вызвать явно.
+        """
+        self._version += 1
+    
+    def add_findings(self, findings: Iterable[Finding]):
+        """Добавить находки в отчет"""
+        self.findings.extend(findings)
+        self.invalidate()
+    
+    def _stats_current(self) -> bool:
+        # Число находок - страховка от добавления в список в обход add_findings()
+        return (self.stats is not None and self._stats_version == self._version
+                and self.stats.total_findings == len(self.findings))
+    
+    def get_index(self):
+        """
+        Вторичные индексы по находкам (ReportIndex)
+        
+        Строятся при первом обращении и перестраиваются после
+        изменения находок (см. invalidate()).
+        """
+        if (self._index is None or self._index_version != self._version
+                or self._index.size != len(self.findings)):
+            from report_index import ReportIndex
+            self._index = ReportIndex(self.findings)
+            self._index_version = self._version
+        return self._index
+    
+    def query(self, severity=None, rule=None, file: Optional[str] = None,
+              path_prefix: Optional[str] = None) -> List[Finding]:
+        """
+        Отфильтровать находки по индексам
+        
+        Args:
+            severity: SeverityLevel, строка ('error', ...) или набор значений
+            rule: id правила или набор id
+            file: путь к файлу
+            path_prefix: каталог, например 'src/main/java'
+            
+        Returns:
+            список находок в исходном порядке
+        """
+        positions = self.get_index().select(
+            severity=severity, rule=rule, file=file, path_prefix=path_prefix
+        )
+        return [self.findings[position] for position in positions]
+    
+    def get_stats(self) -> ReportStats:
+        """
+        Получить накопленную статистику
+        
+        Парсер заполняет ее во время разбора; если находки были изменены
+        после парсинга (см. invalidate()) или отчет собран вручную,
+        статистика пересчитывается.
+        """
+        if not self._stats_current():
+            self.stats = ReportStats.from_findings(self.findings, self.rules)
+            self._stats_version = self._version
+        return self.stats
     
     def get_statistics(self) -> Dict[str, Any]:
         """Получить статистику по отчету"""
+        if self._stats_current():
+            return self.stats.to_statistics()
+        
+        if hasattr(self.findings, "get_statistics"):
+            # Колоночное хранилище (FindingTable) считает статистику само
+            return self.findings.get_statistics(total_rules=len(self.rules))
+        
         stats = {
             "total_findings": len(self.findings),
             "total_rules": len(self.rules),
@@ -124,59 +696,437 @@ class SarifReport:
         return f"SarifReport(tool={self.tool}, findings={len(self.findings)}, rules={len(self.rules)})"
 
 
+@dataclass
+class SarifLog:
+    """SARIF лог со всеми запусками (по одному SarifReport на run)"""
+    reports: List[SarifReport] = field(default_factory=list)
+    sarif_version: str = "2.1.0"
+    
+    @property
+    def findings(self) -> Iterator[Finding]:
+        """Находки всех запусков"""
+        for report in self.reports:
+            yield from report.findings
+    
+    def get_stats(self) -> ReportStats:
+        """Объединенная статистика всех запусков"""
+        merged = ReportStats()
+        for report in self.reports:
+            merged.merge(report.get_stats())
+        return merged
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Получить сводную статистику по всем запускам"""
+        return self.get_stats().to_statistics()
+    
+    def __repr__(self):
+        return f"SarifLog(runs={len(self.reports)})"
+
+
 class SarifParser:
     """Парсер SARIF отчетов"""
     
+    # Наблюдатель за фазами парсинга (parse_profile.ParseObserver);
+    # пока он равен None, таймеры и счетчики не вызываются
+    observer = None
+    
     @staticmethod
-    def parse_file(file_path: str) -> SarifReport:
+    def parse_file(file_path: str, compact: bool = False, cache=None,
+                   fields: Optional[Iterable[str]] = None) -> SarifReport:
         """
         Парсить SARIF файл
         
         Args:
-            file_path: путь к SARIF файлу
+            file_path: путь к SARIF файлу (gzip, bz2, xz, zip и zstd
+                распаковываются автоматически)
+            compact: хранить находки в колоночном FindingTable
+            cache: ParseCache для повторного использования результатов
+            fields: запрашиваемые поля (см. ALL_FIELDS); остальные поля
+                не извлекаются из JSON и остаются None (по умолчанию - все)
+            
+        Returns:
+            SarifReport объект
+        """
+        if cache is not None:
+            with sarif_io.map_file(file_path) as content:
+                return SarifParser.parse_bytes(content, compact=compact, cache=cache, fields=fields)
+        
+        data = SarifParser._load_file(file_path)
+        
+        return SarifParser.parse_dict(data, compact=compact, fields=fields)
+    
+    @staticmethod
+    def parse_bytes(content: bytes, compact: bool = False, cache=None,
+                    fields: Optional[Iterable[str]] = None) -> SarifReport:
+        """
+        Парсить SARIF отчет из исходных байтов
+        
+        Args:
+            content: содержимое SARIF файла (bytes или memoryview),
+                UTF-8 с BOM и UTF-16/32 распознаются автоматически
+            compact: хранить находки в колоночном FindingTable
+            cache: ParseCache; при попадании JSON не декодируется вовсе
+            fields: запрашиваемые поля (см. ALL_FIELDS); остальные поля
+                не извлекаются из JSON и остаются None (по умолчанию - все)
             
         Returns:
             SarifReport объект
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        fields = normalize_fields(fields)
+        if cache is not None:
+            key = cache.make_key(content, compact=compact,
+                                 fields=None if fields is None else sorted(fields))
+            report = cache.get(key)
+            if report is not None:
+                return report
+        
+        report = SarifParser.parse_dict(SarifParser._decode(content), compact=compact, fields=fields)
+        
+        if cache is not None:
+            cache.put(key, report)
+        return report
+    
+    @staticmethod
+    def _load_file(file_path: str) -> Dict[str, Any]:
+        """Прочитать и декодировать JSON файл"""
+        observer = SarifParser.observer
+        if observer is None:
+            # Файл отображается в память и декодируется из байтов
+            return sarif_io.load_file(file_path)
+        
+        # При профилировании файл читается целиком: с mmap чтение
+        # с диска и декодирование неразделимы по времени
+        started = time.perf_counter()
+        content = Path(file_path).read_bytes()
+        observer.on_phase("read", time.perf_counter() - started, nbytes=len(content))
+        return SarifParser._decode(content)
+    
+    @staticmethod
+    def _decode(content: bytes) -> Dict[str, Any]:
+        """Декодировать JSON из исходных байтов"""
+        observer = SarifParser.observer
+        if observer is None:
+            return sarif_io.loads_bytes(content)
+        
+        started = time.perf_counter()
+        data = sarif_io.loads_bytes(content)
+        observer.on_phase("decode", time.perf_counter() - started, nbytes=len(content))
+        return data
+    
+    @staticmethod
+    def iter_file(file_path: str, stats: Optional[ReportStats] = None,
+                  fields: Optional[Iterable[str]] = None) -> Iterator[Finding]:
+        """
+        Потоково читать находки из SARIF файла
+        
+        Файл читается порциями, находки из runs[].results[] возвращаются
+        по одной, поэтому потребление памяти не зависит от числа результатов.
+        Правила из tool.driver.rules разбираются до находок своего run.
+        Если в run массив results расположен раньше tool, находки этого
+        run возвращаются после остальных (повторным проходом по файлу).
+        
+        Args:
+            file_path: путь к SARIF файлу
+            stats: накопитель статистики, обновляется по мере чтения
+            fields: запрашиваемые поля (см. parse_file)
+            
+        Yields:
+            Finding объекты
+        """
+        fields = normalize_fields(fields)
+        strings: Dict[str, str] = {}
+        deferred_runs = []
+        has_runs = False
+        
+        with sarif_io.open_text(file_path) as f:
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key != "runs":
+                    reader.skip_value()
+                    continue
+                
+                for run_index, _ in enumerate(reader.iter_array()):
+                    has_runs = True
+                    resolver = None
+                    deferred = False
+                    
+                    for run_key in reader.iter_object():
+                        if run_key == "tool":
+                            resolver = SarifParser._parse_tool_rules(reader.read_value(), fields)
+                            if stats is not None:
+                                stats.rule_ids.update(resolver.rules)
+                        elif run_key == "results" and resolver is not None:
+                            for result in reader.iter_array_values():
+                                finding = SarifParser._parse_result(result, resolver, fields=fields,
+                                                                    strings=strings)
+                                if stats is not None:
+                                    stats.add(finding)
+                                yield finding
+                        else:
+                            deferred = deferred or run_key == "results"
+                            reader.skip_value()
+                    
+                    if deferred:
+                        deferred_runs.append((run_index, resolver or RuleResolver()))
+        
+        if not has_runs:
+            raise ValueError("SARIF файл не содержит запусков (runs)")
         
-        return SarifParser.parse_dict(data)
+        for run_index, resolver in deferred_runs:
+            for finding in SarifParser._iter_run_results(file_path, run_index, resolver,
+                                                         fields, strings):
+                if stats is not None:
+                    stats.add(finding)
+                yield finding
     
     @staticmethod
-    def parse_dict(data: Dict[str, Any]) -> SarifReport:
+    def _iter_run_results(file_path: str, run_index: int,
+                          resolver: RuleResolver,
+                          fields: Optional[frozenset] = None,
+                          strings: Optional[Dict[str, str]] = None) -> Iterator[Finding]:
+        """Потоково прочитать results указанного run"""
+        with sarif_io.open_text(file_path) as f:
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key != "runs":
+                    reader.skip_value()
+                    continue
+                for index, _ in enumerate(reader.iter_array()):
+                    if index != run_index:
+                        reader.skip_value()
+                        continue
+                    for run_key in reader.iter_object():
+                        if run_key != "results":
+                            reader.skip_value()
+                            continue
+                        for result in reader.iter_array_values():
+                            yield SarifParser._parse_result(result, resolver, fields=fields,
+                                                            strings=strings)
+                    return
+    
+    @staticmethod
+    def parse_dict(data: Dict[str, Any], compact: bool = False,
+                   fields: Optional[Iterable[str]] = None) -> SarifReport:
         """
         Парсить SARIF данные из словаря
         
         Args:
             data: словарь с SARIF данными
+            compact: хранить находки в колоночном FindingTable
+            fields: запрашиваемые поля (см. ALL_FIELDS); остальные поля
+                не извлекаются из JSON и остаются None (по умолчанию - все)
             
         Returns:
             SarifReport объект
         """
         sarif_version = data.get("version", "2.1.0")
         
-        # Парсим первый run (обычно он один)
         if not data.get("runs"):
             raise ValueError("SARIF файл не содержит запусков (runs)")
         
-        run = data["runs"][0]
+        # Находки всех runs объединяются в один отчет (инструмент - первого
+        # run); отчет по каждому run отдельно дает parse_log
+        return SarifParser._parse_run(data["runs"], sarif_version, compact,
+                                      normalize_fields(fields))
+    
+    @staticmethod
+    def parse_many(paths: Iterable[str], workers: Optional[int] = None,
+                   compact: bool = False, cache=None,
+                   fields: Optional[Iterable[str]] = None) -> "ParseBatch":
+        """
+        Парсить набор SARIF файлов в пуле процессов
+        
+        Args:
+            paths: пути к SARIF файлам
+            workers: число процессов (по умолчанию - число ядер)
+            compact: хранить находки в колоночном FindingTable
+            cache: ParseCache, общий для всех процессов
+            fields: запрашиваемые поля (см. ALL_FIELDS); остальные поля
+                не извлекаются из JSON и остаются None (по умолчанию - все)
+            
+        Returns:
+            ParseBatch: итерация дает пары (путь, SarifReport) в порядке
+            завершения парсинга, get_statistics() - сводную статистику
+        """
+        return ParseBatch(paths, workers=workers, compact=compact, cache=cache, fields=fields)
+    
+    @staticmethod
+    def parse_log_file(file_path: str, workers: int = 1, compact: bool = False,
+                       fields: Optional[Iterable[str]] = None) -> SarifLog:
+        """
+        Парсить SARIF файл со всеми запусками (runs)
+        
+        Args:
+            file_path: путь к SARIF файлу
+            workers: число процессов для параллельного парсинга runs
+            compact: хранить находки в колоночном FindingTable
+            fields: запрашиваемые поля (см. ALL_FIELDS); остальные поля
+                не извлекаются из JSON и остаются None (по умолчанию - все)
+            
+        Returns:
+            SarifLog объект
+        """
+        data = SarifParser._load_file(file_path)
+        
+        return SarifParser.parse_log(data, workers=workers, compact=compact, fields=fields)
+    
+    @staticmethod
+    def parse_log_bytes(content: bytes, workers: int = 1, compact: bool = False, cache=None,
+                        fields: Optional[Iterable[str]] = None) -> SarifLog:
+        """
+        Парсить SARIF лог со всеми запусками из исходных байтов
+        
+        Args:
+            content: содержимое SARIF файла (как в parse_bytes)
+            workers: число процессов для параллельного парсинга runs
+            compact: хранить находки в колоночном FindingTable
+            cache: ParseCache; при попадании JSON не декодируется вовсе
+            fields: запрашиваемые поля (см. ALL_FIELDS)
+            
+        Returns:
+            SarifLog объект
+        """
+        fields = normalize_fields(fields)
+        if cache is not None:
+            key = cache.make_key(content, log=True, compact=compact,
+                                 fields=None if fields is None else sorted(fields))
+            log = cache.get(key)
+            if log is not None:
+                return log
+        
+        log = SarifParser.parse_log(SarifParser._decode(content), workers=workers,
+                                    compact=compact, fields=fields)
+        
+        if cache is not None:
+            cache.put(key, log)
+        return log
+    
+    @staticmethod
+    def parse_log(data: Dict[str, Any], workers: int = 1, compact: bool = False,
+                  fields: Optional[Iterable[str]] = None) -> SarifLog:
+        """
+        Парсить все запуски (runs) SARIF лога
+        
+        Args:
+            data: словарь с SARIF данными
+            workers: число процессов; при workers > 1 runs разбираются
+                в пуле процессов, порядок отчетов сохраняется
+            compact: хранить находки в колоночном FindingTable
+            fields: запрашиваемые поля (см. ALL_FIELDS); остальные поля
+                не извлекаются из JSON и остаются None (по умолчанию - все)
+            
+        Returns:
+            SarifLog объект
+        """
+        sarif_version = data.get("version", "2.1.0")
+        runs = data.get("runs")
+        if not runs:
+            raise ValueError("SARIF файл не содержит запусков (runs)")
+        
+        fields = normalize_fields(fields)
+        if workers > 1 and len(runs) > 1:
+            reports = SarifParser._parse_runs_parallel(runs, sarif_version, compact, fields, workers)
+        else:
+            reports = [SarifParser._parse_run(run, sarif_version, compact, fields) for run in runs]
+        
+        return SarifLog(reports=reports, sarif_version=sarif_version)
+    
+    @staticmethod
+    def _parse_runs_parallel(runs: List[Dict[str, Any]], sarif_version: str, compact: bool,
+                             fields: Optional[frozenset], workers: int) -> List[SarifReport]:
+        """
+        Разобрать runs в пуле процессов
+        
+        Процессы получают только номер run: декодированный лог они наследуют
+        при fork, а не получают через pickle. Обратно возвращаются компактные
+        FindingTable - массивы колонок сериализуются в разы быстрее списка
+        объектов Finding. Без fork (Windows, macOS spawn) runs передаются
+        через pickle.
+        """
+        global _SHARED_RUNS
+        max_workers = min(workers, len(runs))
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            context = None
+        
+        if context is not None:
+            _SHARED_RUNS = runs
+            # Иначе сборщик мусора в процессах обходит унаследованные объекты
+            # лога и копирует их страницы памяти (copy-on-write)
+            gc.freeze()
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+                    reports = list(executor.map(
+                        _parse_shared_run, range(len(runs)),
+                        [sarif_version] * len(runs), [fields] * len(runs)
+                    ))
+            finally:
+                gc.unfreeze()
+                _SHARED_RUNS = None
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                reports = list(executor.map(
+                    SarifParser._parse_run, runs,
+                    [sarif_version] * len(runs), [True] * len(runs), [fields] * len(runs)
+                ))
+        
+        if not compact:
+            for report in reports:
+                report.findings = [row.to_finding() for row in report.findings]
+        return reports
+    
+    @staticmethod
+    def _parse_run(run, sarif_version: str = "2.1.0",
+                   compact: bool = False, fields: Optional[frozenset] = None) -> SarifReport:
+        """
+        Парсить один запуск (run; fields - результат normalize_fields)
         
-        # Парсим информацию об инструменте
-        tool_data = run.get("tool", {}).get("driver", {})
-        tool = SarifParser._parse_tool(tool_data)
+        Вместо run можно передать список runs: их находки и правила
+        объединяются в один отчет с инструментом первого run.
+        """
+        runs = run if isinstance(run, list) else [run]
+        observer = SarifParser.observer
         
-        # Парсим правила
-        rules = SarifParser._parse_rules(tool_data.get("rules", []))
+        rules: Dict[str, Rule] = {}
+        stats = ReportStats()
+        if compact:
+            from finding_table import FindingTable
+            findings = FindingTable()
+        else:
+            findings = []
+        strings: Dict[str, str] = {}
+        tool = None
         
-        # Парсим находки
-        findings = SarifParser._parse_findings(run.get("results", []), rules)
+        for run_data in runs:
+            started = time.perf_counter() if observer is not None else 0.0
+            
+            # Парсим информацию об инструменте
+            if tool is None:
+                tool = SarifParser._parse_tool(run_data.get("tool", {}).get("driver", {}))
+                if observer is not None:
+                    now = time.perf_counter()
+                    observer.on_phase("tool", now - started, objects=1)
+                    started = now
+            
+            # Парсим правила драйвера и расширений
+            resolver = SarifParser._parse_tool_rules(run_data.get("tool", {}), fields)
+            for rule_id, rule in resolver.rules.items():
+                rules.setdefault(rule_id, rule)
+            if observer is not None:
+                observer.on_phase("rules", time.perf_counter() - started, objects=len(resolver.rules))
+            
+            # Парсим находки, попутно накапливая статистику
+            SarifParser._parse_findings(run_data.get("results", []), resolver, stats, findings,
+                                        fields, strings)
         
+        stats.rule_ids.update(rules)
         return SarifReport(
             tool=tool,
             rules=rules,
             findings=findings,
-            sarif_version=sarif_version
+            sarif_version=sarif_version,
+            stats=stats
         )
     
     @staticmethod
@@ -190,75 +1140,226 @@ class SarifParser:
         )
     
     @staticmethod
-    def _parse_rules(rules_data: List[Dict[str, Any]]) -> Dict[str, Rule]:
-        """Парсить правила"""
-        rules = {}
+    def _parse_tool_rules(tool_data: Dict[str, Any],
+                          fields: Optional[frozenset] = None) -> RuleResolver:
+        """Парсить правила tool.driver и tool.extensions"""
+        driver_rules = [
+            SarifParser._parse_rule(rule_data, fields)
+            for rule_data in tool_data.get("driver", {}).get("rules", [])
+        ]
+        extensions = [
+            {
+                "name": extension.get("name"),
+                "guid": extension.get("guid"),
+                "rules": [SarifParser._parse_rule(rule_data, fields)
+                          for rule_data in extension.get("rules", [])]
+            }
+            for extension in tool_data.get("extensions", [])
+        ]
+        return RuleResolver(driver_rules, extensions)
+    
+    @staticmethod
+    def _parse_rule(rule_data: Dict[str, Any], fields: Optional[frozenset] = None) -> Rule:
+        """Парсить одно правило"""
+        rule_id = rule_data.get("id", "")
         
-        for rule_data in rules_data:
-            rule_id = rule_data.get("id", "")
-            
-            # Извлекаем описание
-            full_desc = rule_data.get("fullDescription", {})
-            desc_text = full_desc.get("text")
-            desc_markdown = full_desc.get("markdown")
-            
-            # Извлекаем уровень серьезности
-            config = rule_data.get("defaultConfiguration", {})
-            level_str = config.get("level", "note")
-            try:
-                level = SeverityLevel(level_str)
-            except ValueError:
-                level = SeverityLevel.NOTE
-            
-            rule = Rule(
-                id=rule_id,
-                name=rule_data.get("name", rule_id),
-                description_text=desc_text,
-                description_markdown=desc_markdown,
-                level=level,
-                enabled=config.get("enabled", True)
-            )
-            
-            rules[rule_id] = rule
+        # Извлекаем описание (только запрошенные поля)
+        full_desc = rule_data.get("fullDescription", {})
+        desc_text = full_desc.get("text") if fields is None or "description_text" in fields else None
+        desc_markdown = (full_desc.get("markdown")
+                         if fields is None or "description_markdown" in fields else None)
         
-        return rules
+        # Извлекаем уровень серьезности
+        config = rule_data.get("defaultConfiguration", {})
+        level_str = config.get("level", "note")
+        try:
+            level = SeverityLevel(level_str)
+        except ValueError:
+            level = SeverityLevel.NOTE
+        
+        return Rule(
+            id=rule_id,
+            name=rule_data.get("name", rule_id),
+            description_text=desc_text,
+            description_markdown=desc_markdown,
+            level=level,
+            enabled=config.get("enabled", True),
+            guid=rule_data.get("guid")
+        )
     
     @staticmethod
     def _parse_findings(results_data: List[Dict[str, Any]], 
-                       rules: Dict[str, Rule]) -> List[Finding]:
-        """Парсить находки"""
-        findings = []
+                       resolver: RuleResolver,
+                       stats: Optional[ReportStats] = None,
+                       findings=None,
+                       fields: Optional[frozenset] = None,
+                       strings: Optional[Dict[str, str]] = None) -> List[Finding]:
+        """
+        Парсить находки
+        
+        Args:
+            results_data: элементы results
+            resolver: правила запуска
+            stats: накопитель статистики, обновляется для каждой находки
+            findings: контейнер для находок (список или FindingTable)
+            fields: запрошенные поля (результат normalize_fields)
+            strings: таблица интернирования путей и id правил отчета
+                (по умолчанию - новая для этого набора находок)
+        """
+        if findings is None:
+            findings = []
+        if strings is None:
+            strings = {}
+        
+        if SarifParser.observer is not None:
+            return SarifParser._parse_findings_observed(results_data, resolver, stats, findings,
+                                                        fields, strings)
         
         for result in results_data:
-            rule_id = result.get("ruleId", "")
-            
-            # Получаем информацию о правиле
-            rule = rules.get(rule_id)
-            rule_name = rule.name if rule else rule_id
-            level = rule.level if rule else SeverityLevel.NOTE
-            
-            # Извлекаем сообщение
-            message_data = result.get("message", {})
-            message = message_data.get("text")
-            
-            # Парсим локации
-            locations = SarifParser._parse_locations(result.get("locations", []))
+            finding = SarifParser._parse_result(result, resolver, fields=fields, strings=strings)
+            if stats is not None:
+                stats.add(finding)
+            findings.append(finding)
+        
+        return findings
+    
+    @staticmethod
+    def _parse_findings_observed(results_data: List[Dict[str, Any]],
+                                 resolver: RuleResolver,
+                                 stats: Optional[ReportStats],
+                                 findings,
+                                 fields: Optional[frozenset] = None,
+                                 strings: Optional[Dict[str, str]] = None) -> List[Finding]:
+        """_parse_findings с замером времени локаций и статистики"""
+        observer = SarifParser.observer
+        clock = time.perf_counter
+        started = clock()
+        location_seconds = stats_seconds = 0.0
+        location_count = snippet_bytes = 0
+        
+        for result in results_data:
+            location_started = clock()
+            locations = SarifParser._parse_locations(result.get("locations", []), fields, strings)
+            location_seconds += clock() - location_started
+            location_count += len(locations)
+            snippet_bytes += sum(len(location.snippet) for location in locations if location.snippet)
             
+            finding = SarifParser._parse_result(result, resolver, locations, fields, strings)
+            if stats is not None:
+                stats_started = clock()
+                stats.add(finding)
+                stats_seconds += clock() - stats_started
+            findings.append(finding)
+        
+        observer.on_phase("locations", location_seconds, objects=location_count, nbytes=snippet_bytes)
+        if stats is not None:
+            observer.on_phase("stats", stats_seconds, objects=len(results_data))
+        observer.on_phase("findings", clock() - started, objects=len(results_data))
+        return findings
+    
+    @staticmethod
+    def _parse_result(result: Dict[str, Any], resolver: RuleResolver,
+                      locations: Optional[List[Location]] = None,
+                      fields: Optional[frozenset] = None,
+                      strings: Optional[Dict[str, str]] = None) -> Finding:
+        """
+        Парсить одну находку (элемент results)
+        
+        Args:
+            result: элемент results
+            resolver: правила запуска
+            locations: уже разобранные локации (иначе разбираются здесь)
+            fields: запрошенные поля (результат normalize_fields)
+            strings: таблица интернирования путей и id правил
+        """
+        # Получаем информацию о правиле (по индексу, GUID или id)
+        rule = resolver.resolve(result)
+        rule_id = result.get("ruleId") or result.get("rule", {}).get("id") or (rule.id if rule else "")
+        level = rule.level if rule else SeverityLevel.NOTE
+        
+        # Одинаковые id правил хранятся одним объектом строки
+        if rule is not None and rule_id == rule.id:
+            rule_id = rule.id
+        elif strings is not None:
+            rule_id = strings.setdefault(rule_id, rule_id)
+        
+        # Парсим локации
+        if locations is None:
+            locations = SarifParser._parse_locations(result.get("locations", []), fields, strings)
+        
+        if fields is not None:
             finding = Finding(
                 rule_id=rule_id,
-                rule_name=rule_name,
-                message=message,
+                rule_name=(rule.name if rule else rule_id) if "rule_name" in fields else None,
+                message=result.get("message", {}).get("text") if "message" in fields else None,
                 level=level,
-                locations=locations
+                locations=locations,
+                rule=rule,
+                fingerprint=compute_fingerprint(result, rule_id) if "fingerprint" in fields else None
             )
-            
-            findings.append(finding)
+            if "code_flows" in fields:
+                finding.defer_code_flows(result.get("codeFlows"))
+            return finding
         
-        return findings
+        # Извлекаем сообщение
+        message_data = result.get("message", {})
+        message = message_data.get("text")
+        
+        finding = Finding(
+            rule_id=rule_id,
+            rule_name=rule.name if rule else rule_id,
+            message=message,
+            level=level,
+            locations=locations,
+            rule=rule,
+            fingerprint=compute_fingerprint(result, rule_id)
+        )
+        
+        # Трассы (codeFlows) только запоминаются, разбор - при обращении
+        code_flows_data = result.get("codeFlows")
+        if code_flows_data:
+            finding.defer_code_flows(code_flows_data)
+        return finding
+    
+    @staticmethod
+    def _parse_code_flows(code_flows_data: List[Dict[str, Any]]) -> List[CodeFlow]:
+        """Парсить трассы codeFlows[].threadFlows[].locations[]"""
+        code_flows = []
+        for flow_data in code_flows_data:
+            thread_flows = []
+            for thread_data in flow_data.get("threadFlows", []):
+                steps = []
+                for step_data in thread_data.get("locations", []):
+                    location_data = step_data.get("location")
+                    location = (SarifParser._parse_locations([location_data])[0]
+                                if location_data else None)
+                    steps.append(ThreadFlowLocation(
+                        location=location,
+                        message=(location_data or {}).get("message", {}).get("text"),
+                        nesting_level=step_data.get("nestingLevel"),
+                        execution_order=step_data.get("executionOrder"),
+                        importance=step_data.get("importance"),
+                        kinds=step_data.get("kinds", [])
+                    ))
+                thread_flows.append(ThreadFlow(
+                    id=thread_data.get("id"),
+                    message=thread_data.get("message", {}).get("text"),
+                    locations=steps
+                ))
+            code_flows.append(CodeFlow(
+                message=flow_data.get("message", {}).get("text"),
+                thread_flows=thread_flows
+            ))
+        return code_flows
     
     @staticmethod
-    def _parse_locations(locations_data: List[Dict[str, Any]]) -> List[Location]:
-        """Парсить локации"""
+    def _parse_locations(locations_data: List[Dict[str, Any]],
+                         fields: Optional[frozenset] = None,
+                         strings: Optional[Dict[str, str]] = None) -> List[Location]:
+        """Парсить локации (fields - только запрошенные поля, strings - интернирование путей)"""
+        if fields is not None:
+            return SarifParser._parse_locations_projected(locations_data, fields, strings)
+        
         locations = []
         
         for loc_data in locations_data:
@@ -267,6 +1368,8 @@ class SarifParser:
             # Извлекаем путь к файлу
             artifact_loc = physical_loc.get("artifactLocation", {})
             file_path = artifact_loc.get("uri", "")
+            if strings is not None:
+                file_path = strings.setdefault(file_path, file_path)
             
             # Извлекаем регион (строки, колонки)
             region = physical_loc.get("region", {})
@@ -291,20 +1394,135 @@ class SarifParser:
             locations.append(location)
         
         return locations
+    
+    @staticmethod
+    def _parse_locations_projected(locations_data: List[Dict[str, Any]],
+                                   fields: frozenset,
+                                   strings: Optional[Dict[str, str]] = None) -> List[Location]:
+        """Парсить только запрошенные поля локаций; без полей локаций - пропустить их"""
+        if fields.isdisjoint(LOCATION_FIELDS):
+            return []
+        
+        with_path = "file_path" in fields
+        with_snippet = "snippet" in fields
+        region_keys = [(name, key) for name, key in _REGION_KEYS if name in fields]
+        
+        locations = []
+        for loc_data in locations_data:
+            physical_loc = loc_data.get("physicalLocation", {})
+            region = physical_loc.get("region", {})
+            
+            file_path = ""
+            if with_path:
+                file_path = physical_loc.get("artifactLocation", {}).get("uri", "")
+                if strings is not None:
+                    file_path = strings.setdefault(file_path, file_path)
+            
+            location = Location(
+                file_path=file_path,
+                snippet=region.get("snippet", {}).get("text") if with_snippet else None,
+                **{name: region.get(key) for name, key in region_keys}
+            )
+            locations.append(location)
+        
+        return locations
 
 
-def print_report_summary(report: SarifReport):
-    """Вывести краткую информацию о отчете"""
-    print(f"\n{'='*80}")
-    print(f"SARIF Отчет: {report.tool.name}")
-    if report.tool.version:
-        print(f"Версия: {report.tool.version}")
-    if report.tool.organization:
-        print(f"Организация: {report.tool.organization}")
-    print(f"{'='*80}\n")
+# Runs лога, разбираемого в пуле процессов: процессы наследуют их при fork
+_SHARED_RUNS: Optional[List[Dict[str, Any]]] = None
+
+
+def _parse_shared_run(index: int, sarif_version: str, fields: Optional[frozenset]) -> SarifReport:
+    """Разобрать унаследованный run в компактную таблицу (выполняется в процессе пула)"""
+    return SarifParser._parse_run(_SHARED_RUNS[index], sarif_version, True, fields)
+
+
+class ParseBatch:
+    """Пакетный парсинг файлов: результаты в порядке завершения и сводная статистика"""
+    
+    def __init__(self, paths: Iterable[str], workers: Optional[int] = None,
+                 compact: bool = False, cache=None, fields: Optional[Iterable[str]] = None):
+        self.paths = [str(path) for path in paths]
+        self.workers = workers or os.cpu_count() or 1
+        self.compact = compact
+        self.cache = cache
+        self.fields = normalize_fields(fields)
+        self.errors: Dict[str, str] = {}
+        self.stats = ReportStats()
+        self.parsed_files = 0
+        self._consumed = False
+    
+    def __iter__(self) -> Iterator[Tuple[str, SarifReport]]:
+        if self._consumed:
+            raise RuntimeError("ParseBatch можно обойти только один раз")
+        self._consumed = True
+        
+        if self.workers <= 1 or len(self.paths) <= 1:
+            for path in self.paths:
+                try:
+                    report = SarifParser.parse_file(path, compact=self.compact, cache=self.cache,
+                                                    fields=self.fields)
+                except Exception as e:
+                    self.errors[path] = str(e)
+                    continue
+                self._add(report)
+                yield path, report
+            return
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(self.paths))) as executor:
+            futures = {
+                executor.submit(SarifParser.parse_file, path, self.compact, self.cache, self.fields): path
+                for path in self.paths
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    report = future.result()
+                except Exception as e:
+                    self.errors[path] = str(e)
+                    continue
+                self._add(report)
+                yield path, report
     
-    stats = report.get_statistics()
+    def _add(self, report: SarifReport):
+        self.parsed_files += 1
+        self.stats.merge(report.get_stats())
     
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Сводная статистика по всем успешно разобранным файлам
+        
+        Если пакет еще не был обойден, файлы разбираются без сохранения отчетов.
+        """
+        if not self._consumed:
+            for _ in self:
+                pass
+        stats = self.stats.to_statistics()
+        stats["total_files"] = self.parsed_files
+        stats["failed_files"] = len(self.errors)
+        return stats
+    
+    def __repr__(self):
+        return f"ParseBatch(files={len(self.paths)}, workers={self.workers})"
+
+
+def collect_sarif_paths(paths: Iterable[str]) -> List[str]:
+    """Развернуть каталоги в список *.sarif файлов, в том числе сжатых (рекурсивно)"""
+    result = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            result.extend(
+                str(p) for p in sorted(path.rglob("*"))
+                if p.is_file() and sarif_io.is_sarif_path(p.name)
+            )
+        else:
+            result.append(str(path))
+    return result
+
+
+def print_statistics(stats: Dict[str, Any]):
+    """Вывести статистику в формате get_statistics()"""
     print(f"Всего находок: {stats['total_findings']}")
     print(f"Всего правил: {stats['total_rules']}\n")
     
@@ -331,6 +1549,19 @@ def print_report_summary(report: SarifReport):
         
         print(f"  {i:2}. {level_icon} [{rule_info['count']:4}] {rule_info['name']}")
         print(f"      ID: {rule_id}")
+
+
+def print_report_summary(report: SarifReport):
+    """Вывести краткую информацию о отчете"""
+    print(f"\n{'='*80}")
+    print(f"SARIF Отчет: {report.tool.name}")
+    if report.tool.version:
+        print(f"Версия: {report.tool.version}")
+    if report.tool.organization:
+        print(f"Организация: {report.tool.organization}")
+    print(f"{'='*80}\n")
+    
+    print_statistics(report.get_statistics())
     
     print(f"\n{'='*80}\n")
 
@@ -370,37 +1601,110 @@ def print_detailed_findings(report: SarifReport, max_findings: int = 10):
             if len(finding.locations) > 3:
                 print(f"     ... и еще {len(finding.locations) - 3} локаций")
         
+        if finding.has_code_flows:
+            for flow in finding.code_flows[:1]:
+                for thread_flow in flow.thread_flows[:1]:
+                    print(f"   Трасса ({len(thread_flow.locations)} шагов):")
+                    for step in thread_flow.locations:
+                        where = (f"{step.location.file_path}:{step.location.start_line or ''}"
+                                 if step.location else "")
+                        print(f"     → {where} {step.message or ''}".rstrip())
+        
         print()
 
 
-if __name__ == "__main__":
-    # Пример использования
-    import sys
+def print_batch_summary(batch: ParseBatch):
+    """Пакетный парсинг с выводом результатов по мере готовности"""
+    print(f"Пакетный парсинг: {len(batch.paths)} файлов, процессов: {batch.workers}\n")
+    
+    for path, report in batch:
+        print(f"  ✅ {path}: {len(report.findings)} находок ({report.tool.name})")
+    for path, error in batch.errors.items():
+        print(f"  ❌ {path}: {error}")
+    
+    stats = batch.get_statistics()
+    print(f"\n{'='*80}")
+    print(f"Сводно по {stats['total_files']} файлам (ошибок: {stats['failed_files']})")
+    print(f"{'='*80}\n")
+    print_statistics(stats)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Парсер SARIF отчетов",
+        epilog="Пример: python sarif_parser.py report.sarif"
+    )
+    parser.add_argument("paths", nargs="+", help="SARIF файлы (или каталоги в режиме --batch)")
+    parser.add_argument("--batch", action="store_true",
+                        help="пакетный режим: параллельный парсинг всех файлов и сводная статистика")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="число процессов для --batch (по умолчанию - число ядер)")
+    parser.add_argument("--stats-only", action="store_true",
+                        help="только статистика: локации, сообщения и описания не разбираются")
+    parser.add_argument("--profile", action="store_true",
+                        help="вывести время и объем работы по фазам парсинга")
+    args = parser.parse_args(argv)
     
-    if len(sys.argv) < 2:
-        print("Использование: python sarif_parser.py <путь_к_sarif_файлу>")
-        print("\nПример:")
-        print("  python sarif_parser.py report.sarif")
-        sys.exit(1)
+    if not args.profile:
+        return _run_cli(args)
     
-    sarif_file = sys.argv[1]
+    from parse_profile import ParseProfile, print_profile
+    
+    # Профиль собирается только в текущем процессе, поэтому пакет
+    # при --profile разбирается без пула процессов. Наблюдатель задается
+    # напрямую: при запуске скрипта SarifParser здесь - класс модуля __main__
+    args.workers = 1
+    profile = SarifParser.observer = ParseProfile()
+    try:
+        code = _run_cli(args)
+    finally:
+        SarifParser.observer = None
+    print_profile(profile)
+    return code
+
+
+def _run_cli(args) -> int:
+    """Разбор и вывод по аргументам командной строки"""
+    fields = STATS_FIELDS if args.stats_only else None
+    
+    if args.batch:
+        paths = collect_sarif_paths(args.paths)
+        if not paths:
+            print("❌ Ошибка: SARIF файлы не найдены")
+            return 1
+        batch = SarifParser.parse_many(paths, workers=args.workers, fields=fields)
+        print_batch_summary(batch)
+        return 1 if batch.errors else 0
+    
+    sarif_file = args.paths[0]
     
     try:
         print(f"Парсинг файла: {sarif_file}")
-        report = SarifParser.parse_file(sarif_file)
+        report = SarifParser.parse_file(sarif_file, fields=fields)
         
         print_report_summary(report)
-        print_detailed_findings(report)
+        if not args.stats_only:
+            print_detailed_findings(report)
         
     except FileNotFoundError:
         print(f"❌ Ошибка: Файл '{sarif_file}' не найден")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
+        return 1
+    except json_backend.JSONDecodeError as e:
         print(f"❌ Ошибка парсинга JSON: {e}")
-        sys.exit(1)
+        return 1
     except Exception as e:
         print(f"❌ Ошибка: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        return 1
+    
+    return 0
+
 
+if __name__ == "__main__":
+    import sys
+    
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Потоковое чтение больших JSON документов
+
+Позволяет обходить объекты и массивы верхнего уровня, не загружая
+весь документ в память: в памяти находится только текущий буфер
+и декодированный элемент, с которым работает вызывающий код.
+"""
+
+import json
+from typing import Any, Iterator, TextIO
+
+from json_backend import reject_constant
+
+
+_WHITESPACE = " \t\n\r"
+
+# Символы, которые могут продолжать JSON число
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+# Ошибка декодирования не дальше этого числа символов от конца буфера
+# может означать обрезанный границей буфера токен (литерал, число, \uXXXX)
+_TRUNCATION_TAIL = 16
+
+
+class JsonStreamReader:
+    """Инкрементальный читатель JSON поверх текстового потока"""
+
+    def __init__(self, stream: TextIO, chunk_size: int = 1 << 16):
+        """
+        Args:
+            stream: текстовый поток с JSON документом
+            chunk_size: размер порции чтения (в символах)
+        """
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder(parse_constant=reject_constant)
+
+    def _fill(self, min_size: int) -> bool:
+        """Дочитать поток, пока в буфере не будет min_size непрочитанных символов"""
+        if self._pos > self._chunk_size:
+            # Отбрасываем уже разобранную часть буфера
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+        read_any = False
+        while not self._eof and len(self._buffer) - self._pos < min_size:
+            chunk = self._stream.read(max(self._chunk_size, min_size))
+            if not chunk:
+                self._eof = True
+                break
+            self._buffer += chunk
+            read_any = True
+        return read_any
+
+    def _skip_whitespace(self):
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            length = len(buffer)
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length or not self._fill(1):
+                return
+
+    def peek(self) -> str:
+        """Первый значимый символ (пустая строка в конце потока)"""
+        self._skip_whitespace()
+        if self._pos < len(self._buffer):
+            return self._buffer[self._pos]
+        return ""
+
+    def expect(self, char: str):
+        """Прочитать указанный символ или выбросить ValueError"""
+        actual = self.peek()
+        if actual != char:
+            raise ValueError(
+                f"Ожидался символ {char!r}, получен {actual or 'конец файла'!r}"
+            )
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Декодировать следующее JSON значение целиком"""
+        self._skip_whitespace()
+        wanted = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if e.doc is not self._buffer or self._eof:
+                    # NaN/Infinity (reject_constant) или конец потока
+                    raise
+                truncated = (e.pos >= len(self._buffer) - _TRUNCATION_TAIL
+                             or e.msg.startswith("Unterminated string"))
+                if not truncated:
+                    # Синтаксическая ошибка внутри буфера: дочитывать поток незачем
+                    raise
+                # Значение обрезано границей буфера
+                if not self._fill(len(self._buffer) - self._pos + wanted):
+                    raise
+                wanted *= 2
+                continue
+            if not self._eof and isinstance(value, (int, float)) and not isinstance(value, bool):
+                # Число на границе буфера могло прочитаться не полностью:
+                # "12." декодируется как 12, поэтому дочитываем, пока за
+                # символами числа не появится другой символ или конец потока
+                scan = end
+                length = len(self._buffer)
+                while scan < length and self._buffer[scan] in _NUMBER_CHARS:
+                    scan += 1
+                if scan == length and self._fill(length - self._pos + 1):
+                    continue
+            self._pos = end
+            return value
+
+    def skip_value(self):
+        """Пропустить следующее значение, не удерживая его в памяти целиком"""
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Обойти ключи объекта
+
+        После получения каждого ключа вызывающий код обязан прочитать
+        его значение (read_value, skip_value, iter_object или iter_array).
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError("Ключ объекта должен быть строкой")
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Ожидался символ ',' или '}}', получен {char!r}")
+
+    def iter_array(self) -> Iterator[None]:
+        """
+        Обойти элементы массива
+
+        На каждой итерации вызывающий код обязан прочитать очередной элемент.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            char = self.peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Ожидался символ ',' или ']', получен {char!r}")
+
+    def iter_array_values(self) -> Iterator[Any]:
+        """Обойти массив, декодируя элементы по одному"""
+        for _ in self.iter_array():
+            yield self.read_value()
@@ -0,0 +1,169 @@
+"""
+Генератор синтетических SARIF отчетов
+
+Детерминированно (по seed) строит отчеты заданного размера для тестов
+и замеров производительности. Файл пишется потоково, поэтому можно
+генерировать отчеты на миллионы результатов без расхода памяти.
+"""
+
+import random
+import string
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, TextIO
+
+import json_backend
+
+
+_LEVELS = ("error", "warning", "note", "none")
+_LEVEL_WEIGHTS = (2, 3, 4, 1)
+_SNIPPET_ALPHABET = string.ascii_letters + string.digits + "    ()[]{}=+-*/.,;:'\""
+
+
+@dataclass
+class SynthConfig:
+    """Параметры синтетического отчета"""
+    results: int = 1000
+    rules: int = 50
+    locations_per_result: int = 1
+    snippet_size: int = 80
+    runs: int = 1
+    files: int = 500
+    seed: int = 0
+    tool_name: str = "Synthetic Scanner"
+
+
+def _rules(config: SynthConfig, run_index: int, rng: random.Random) -> List[Dict[str, Any]]:
+    rules = []
+    for index in range(config.rules):
+        rule_id = f"SYN{run_index:02d}-{index:04d}"
+        rules.append({
+            "id": rule_id,
+            "name": f"Synthetic rule {index}",
+            "fullDescription": {
+                "text": f"Description of synthetic rule {index}",
+                "markdown": f"**Synthetic rule {index}**\n\nGenerated for benchmarks.",
+            },
+            "defaultConfiguration": {
+                "level": rng.choices(_LEVELS, weights=_LEVEL_WEIGHTS)[0],
+            },
+        })
+    return rules
+
+
+def _file_path(config: SynthConfig, rng: random.Random) -> str:
+    index = rng.randrange(config.files)
+    return f"src/main/java/com/example/module_{index % 17}/package_{index % 5}/File{index}.java"
+
+
+def _location(config: SynthConfig, rng: random.Random) -> Dict[str, Any]:
+    start_line = rng.randint(1, 5000)
+    region: Dict[str, Any] = {
+        "startLine": start_line,
+        "endLine": start_line + rng.randint(0, 5),
+        "startColumn": rng.randint(1, 80),
+    }
+    if config.snippet_size:
+        region["snippet"] = {
+            "text": "".join(rng.choices(_SNIPPET_ALPHABET, k=config.snippet_size))
+        }
+    return {
+        "physicalLocation": {
+            "artifactLocation": {"uri": _file_path(config, rng)},
+            "region": region,
+        }
+    }
+
+
+def _results(config: SynthConfig, rules: List[Dict[str, Any]], count: int,
+             rng: random.Random) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        rule_index = rng.randrange(len(rules))
+        yield {
+            "ruleId": rules[rule_index]["id"],
+            "ruleIndex": rule_index,
+            "message": {"text": f"Synthetic finding {index} of {rules[rule_index]['name']}"},
+            "locations": [_location(config, rng) for _ in range(config.locations_per_result)],
+        }
+
+
+def _run_sizes(config: SynthConfig) -> List[int]:
+    """Распределение результатов по запускам"""
+    base, extra = divmod(config.results, config.runs)
+    return [base + (1 if index < extra else 0) for index in range(config.runs)]
+
+
+def write_sarif(stream: TextIO, config: SynthConfig):
+    """Записать синтетический отчет в текстовый поток"""
+    rng = random.Random(config.seed)
+    stream.write('{"version":"2.1.0","runs":[')
+    for run_index, size in enumerate(_run_sizes(config)):
+        if run_index:
+            stream.write(",")
+        rules = _rules(config, run_index, rng)
+        tool = {"driver": {"name": config.tool_name, "version": "1.0.0", "rules": rules}}
+        stream.write('{"tool":')
+        stream.write(json_backend.dumps(tool))
+        stream.write(',"results":[')
+        for result_index, result in enumerate(_results(config, rules, size, rng)):
+            if result_index:
+                stream.write(",")
+            stream.write(json_backend.dumps(result))
+        stream.write("]}")
+    stream.write("]}")
+
+
+def write_sarif_file(file_path: str, config: SynthConfig):
+    """Записать синтетический отчет в файл"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        write_sarif(f, config)
+
+
+def generate_sarif(config: SynthConfig) -> Dict[str, Any]:
+    """Построить синтетический отчет в памяти (для небольших размеров)"""
+    rng = random.Random(config.seed)
+    runs = []
+    for run_index, size in enumerate(_run_sizes(config)):
+        rules = _rules(config, run_index, rng)
+        runs.append({
+            "tool": {"driver": {"name": config.tool_name, "version": "1.0.0", "rules": rules}},
+            "results": list(_results(config, rules, size, rng)),
+        })
+    return {"version": "2.1.0", "runs": runs}
+
+
+def main(argv=None) -> int:
+    """Точка входа командной строки"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Генератор синтетических SARIF отчетов")
+    parser.add_argument("output", help="путь к создаваемому SARIF файлу")
+    parser.add_argument("--results", type=int, default=SynthConfig.results)
+    parser.add_argument("--rules", type=int, default=SynthConfig.rules)
+    parser.add_argument("--locations", type=int, default=SynthConfig.locations_per_result,
+                        help="локаций на результат")
+    parser.add_argument("--snippet-size", type=int, default=SynthConfig.snippet_size,
+                        help="длина фрагмента кода (0 - без фрагментов)")
+    parser.add_argument("--runs", type=int, default=SynthConfig.runs)
+    parser.add_argument("--files", type=int, default=SynthConfig.files,
+                        help="число различных файлов")
+    parser.add_argument("--seed", type=int, default=SynthConfig.seed)
+    args = parser.parse_args(argv)
+
+    config = SynthConfig(
+        results=args.results,
+        rules=args.rules,
+        locations_per_result=args.locations,
+        snippet_size=args.snippet_size,
+        runs=args.runs,
+        files=args.files,
+        seed=args.seed,
+    )
+    write_sarif_file(args.output, config)
+    print(f"✅ Создан {args.output}: {config.results} результатов, {config.runs} запусков")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
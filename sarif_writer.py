@@ -0,0 +1,289 @@
+"""
+Потоковая запись SARIF 2.1.0
+
+SarifWriter пишет документ по мере поступления находок и не строит его
+в памяти целиком, поэтому подходит для фильтрации и объединения больших
+отчетов. В tool.driver.rules попадают только правила, на которые
+ссылаются записанные находки: для этого массив results пишется раньше
+объекта tool (порядок ключей JSON объекта в SARIF не важен).
+"""
+
+import io
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+import json_backend
+from finding_table import code_flows_source
+from sarif_parser import (
+    FINGERPRINT_KEY, CodeFlow, Finding, Location, Rule, SarifLog, SarifReport, ThreadFlowLocation, ToolInfo
+)
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+_FLUSH_SIZE = 1 << 16
+
+
+def rule_to_sarif(rule: Rule) -> Dict[str, Any]:
+    """Правило в виде reportingDescriptor"""
+    data: Dict[str, Any] = {"id": rule.id}
+    if rule.guid:
+        data["guid"] = rule.guid
+    if rule.name:
+        data["name"] = rule.name
+    if rule.description_text or rule.description_markdown:
+        description = {"text": rule.description_text or rule.description_markdown}
+        if rule.description_markdown:
+            description["markdown"] = rule.description_markdown
+        data["fullDescription"] = description
+    data["defaultConfiguration"] = {"level": rule.level.value, "enabled": rule.enabled}
+    return data
+
+
+def location_to_sarif(location: Location) -> Dict[str, Any]:
+    """Локация в виде location с physicalLocation"""
+    physical: Dict[str, Any] = {"artifactLocation": {"uri": location.file_path}}
+    region: Dict[str, Any] = {}
+    for key, value in (("startLine", location.start_line), ("startColumn", location.start_column),
+                       ("endLine", location.end_line), ("endColumn", location.end_column)):
+        if value is not None:
+            region[key] = value
+    if location.snippet is not None:
+        region["snippet"] = {"text": location.snippet}
+    if region:
+        physical["region"] = region
+    return {"physicalLocation": physical}
+
+
+def _thread_flow_location_to_sarif(step: ThreadFlowLocation) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    if step.location is not None or step.message is not None:
+        location = location_to_sarif(step.location) if step.location is not None else {}
+        if step.message is not None:
+            location["message"] = {"text": step.message}
+        data["location"] = location
+    for key, value in (("nestingLevel", step.nesting_level), ("executionOrder", step.execution_order),
+                       ("importance", step.importance)):
+        if value is not None:
+            data[key] = value
+    if step.kinds:
+        data["kinds"] = step.kinds
+    return data
+
+
+def code_flow_to_sarif(code_flow: CodeFlow) -> Dict[str, Any]:
+    """Трасса в виде codeFlow"""
+    data: Dict[str, Any] = {}
+    if code_flow.message is not None:
+        data["message"] = {"text": code_flow.message}
+    thread_flows = []
+    for thread_flow in code_flow.thread_flows:
+        thread: Dict[str, Any] = {}
+        if thread_flow.id is not None:
+            thread["id"] = thread_flow.id
+        if thread_flow.message is not None:
+            thread["message"] = {"text": thread_flow.message}
+        thread["locations"] = [_thread_flow_location_to_sarif(step) for step in thread_flow.locations]
+        thread_flows.append(thread)
+    data["threadFlows"] = thread_flows
+    return data
+
+
+def finding_to_sarif(finding: Finding, rule_index: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Находка в виде элемента results
+
+    Отпечаток пишется в partialFingerprints (FINGERPRINT_KEY) и при
+    повторном чтении восстанавливается без изменений. Неразобранные
+    трассы передаются исходными данными codeFlows, разобранные -
+    сериализуются.
+    """
+    data: Dict[str, Any] = {"ruleId": finding.rule_id}
+    if rule_index is not None:
+        data["ruleIndex"] = rule_index
+    data["level"] = finding.level.value
+    data["message"] = {"text": finding.message or finding.rule_name or finding.rule_id}
+    if finding.locations:
+        data["locations"] = [location_to_sarif(location) for location in finding.locations]
+    if finding.fingerprint:
+        data["partialFingerprints"] = {FINGERPRINT_KEY: finding.fingerprint}
+    if finding.has_code_flows:
+        code_flows = code_flows_source(finding)
+        if isinstance(code_flows[0], CodeFlow):
+            code_flows = [code_flow_to_sarif(code_flow) for code_flow in code_flows]
+        data["codeFlows"] = code_flows
+    return data
+
+
+def tool_to_sarif(tool: ToolInfo, rules: List[Rule]) -> Dict[str, Any]:
+    """Инструмент в виде tool с driver"""
+    driver: Dict[str, Any] = {"name": tool.name}
+    if tool.version:
+        driver["version"] = tool.version
+    if tool.organization:
+        driver["organization"] = tool.organization
+    if tool.information_uri:
+        driver["informationUri"] = tool.information_uri
+    driver["rules"] = [rule_to_sarif(rule) for rule in rules]
+    return {"driver": driver}
+
+
+class SarifWriter:
+    """
+    Потоковый писатель SARIF документа
+
+    Пример:
+        with open("errors.sarif", "w", encoding="utf-8") as f:
+            with SarifWriter(f) as writer:
+                writer.write_run(report.tool, errors, report.rules)
+
+    Для записи в сокет используйте sock.makefile("w", encoding="utf-8").
+    """
+
+    def __init__(self, stream: IO):
+        """
+        Args:
+            stream: текстовый или бинарный поток с методом write()
+        """
+        self._stream = stream
+        self._binary = not isinstance(stream, io.TextIOBase)
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._runs = 0
+        self._run: Optional[Dict[str, Any]] = None
+        self._closed = False
+        self._write(f'{{"$schema":"{SARIF_SCHEMA}","version":"{SARIF_VERSION}","runs":[')
+
+    def _write(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= _FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Передать накопленный текст в поток"""
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._stream.write(text.encode("utf-8") if self._binary else text)
+
+    def write_run(self, tool: ToolInfo, findings: Iterable[Finding],
+                  rules: Optional[Dict[str, Rule]] = None) -> int:
+        """
+        Записать один запуск (run)
+
+        Args:
+            tool: информация об инструменте
+            findings: находки (любой итерируемый набор, читается один раз)
+            rules: правила отчета - для находок без ссылки на объект Rule
+
+        Returns:
+            число записанных находок
+        """
+        self.begin_run(rules)
+        for finding in findings:
+            self.write_result(finding)
+        return self.end_run(tool)
+
+    def begin_run(self, rules: Optional[Dict[str, Rule]] = None):
+        """
+        Начать запуск, находки которого передаются по одной через write_result
+
+        Нужно, когда писатель управляется снаружи (например, генератором
+        потокового HTTP ответа между находками). Запуск завершает end_run.
+
+        Args:
+            rules: правила отчета - для находок без ссылки на объект Rule
+        """
+        if self._closed:
+            raise ValueError("SarifWriter уже закрыт")
+        if self._run is not None:
+            raise ValueError("Предыдущий запуск не завершен")
+        self._run = {"rules": rules or {}, "referenced": {}, "rule_list": [], "count": 0}
+        if self._runs:
+            self._write(",")
+        self._write('{"results":[')
+
+    def write_result(self, finding: Finding):
+        """Записать находку текущего запуска"""
+        run = self._run
+        if run is None:
+            raise ValueError("Запуск не начат: вызовите begin_run")
+        referenced: Dict[str, int] = run["referenced"]
+        rule_list: List[Rule] = run["rule_list"]
+        rule_index = referenced.get(finding.rule_id)
+        if rule_index is None:
+            rule = finding.rule or run["rules"].get(finding.rule_id) or Rule(
+                id=finding.rule_id,
+                name=finding.rule_name or finding.rule_id,
+                level=finding.level
+            )
+            rule_index = referenced[finding.rule_id] = len(rule_list)
+            rule_list.append(rule)
+
+        if run["count"]:
+            self._write(",")
+        self._write(json_backend.dumps(finding_to_sarif(finding, rule_index)))
+        run["count"] += 1
+
+    def end_run(self, tool: ToolInfo) -> int:
+        """
+        Завершить запуск: записать инструмент и правила, на которые ссылались находки
+
+        Returns:
+            число записанных находок запуска
+        """
+        run = self._run
+        if run is None:
+            raise ValueError("Запуск не начат: вызовите begin_run")
+        self._write('],"tool":')
+        self._write(json_backend.dumps(tool_to_sarif(tool, run["rule_list"])))
+        self._write("}")
+        self._runs += 1
+        self._run = None
+        return run["count"]
+
+    def write_report(self, report: SarifReport, findings: Optional[Iterable[Finding]] = None) -> int:
+        """Записать отчет как run (при необходимости - только указанные находки)"""
+        return self.write_run(
+            report.tool,
+            report.findings if findings is None else findings,
+            report.rules
+        )
+
+    def write_log(self, log: SarifLog) -> int:
+        """Записать все запуски SarifLog"""
+        return sum(self.write_report(report) for report in log.reports)
+
+    def close(self):
+        """Завершить документ (поток не закрывается)"""
+        if self._closed:
+            return
+        self._write("]}")
+        self.flush()
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Недописанный документ намеренно остается невалидным
+            self.flush()
+
+
+def write_report(report: SarifReport, file_path: str,
+                 findings: Optional[Iterable[Finding]] = None) -> int:
+    """
+    Сохранить отчет (или отфильтрованные находки) в SARIF файл
+
+    Returns:
+        число записанных находок
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        with SarifWriter(f) as writer:
+            return writer.write_report(report, findings)
@@ -0,0 +1,157 @@
+"""
+Хранилище фрагментов кода с адресацией по содержимому
+
+Одинаковые фрагменты кода (PT Application Inspector повторяет один и тот же
+сниппет во многих результатах) хранятся один раз под ключом - хэшем текста.
+Локации после attach() держат только ссылку (Location.snippet_ref) и читают
+текст из хранилища при обращении. Хранилище - каталог с отдельным файлом на
+каждый фрагмент, поэтому несколько загрузок (в том числе параллельных) могут
+дополнять его, не переписывая и не читая целиком.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from sarif_parser import Finding, SarifLog, SarifReport
+
+# Ссылка - 32 шестнадцатеричных символа (см. snippet_ref)
+_REF_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def snippet_ref(text: str) -> str:
+    """Ссылка на фрагмент - BLAKE2b (16 байт) от текста в UTF-8"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SnippetStore:
+    """
+    Словарь фрагментов кода: ссылка -> текст
+
+    Фрагмент хранится в файле <каталог>/<первые 2 символа ссылки>/<ссылка>.
+    Содержимое файла однозначно определяется его именем, поэтому запись
+    идемпотентна: каждый фрагмент пишется во временный файл с уникальным
+    именем и атомарно переименовывается, одновременная запись одного и того
+    же фрагмента несколькими процессами безопасна.
+
+    Пример:
+        store = SnippetStore.open("data/snippets")
+        store.attach(report)
+        store.save()
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            path: каталог хранилища (None - только в памяти)
+        """
+        self.path = Path(path) if path is not None else None
+        # Прочитанные и добавленные фрагменты; _pending - еще не сохраненные
+        self._snippets: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "SnippetStore":
+        """Открыть хранилище в каталоге (фрагменты читаются по требованию)"""
+        return cls(path)
+
+    def _file(self, ref: str, root: Optional[Path] = None) -> Path:
+        return (root or self.path) / ref[:2] / ref
+
+    def _read(self, ref: str) -> Optional[str]:
+        if self.path is None or not _REF_RE.fullmatch(ref):
+            return None
+        try:
+            return self._file(ref).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, text: str) -> str:
+        """Добавить фрагмент (повторный - без копии) и вернуть ссылку на него"""
+        ref = snippet_ref(text)
+        if ref not in self._snippets:
+            self._snippets[ref] = text
+            if self.path is None or not self._file(ref).exists():
+                self._pending[ref] = text
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        """Текст фрагмента по ссылке"""
+        text = self._snippets.get(ref)
+        if text is None:
+            text = self._read(ref)
+            if text is not None:
+                self._snippets[ref] = text
+        return text
+
+    def attach(self, findings: Union[SarifReport, SarifLog, Iterable[Finding]]) -> int:
+        """
+        Перенести фрагменты кода находок в хранилище
+
+        Текст в локациях заменяется ссылкой. Находки компактного
+        FindingTable пропускаются: их фрагменты уже хранятся без повторов.
+
+        Returns:
+            число локаций, переведенных на ссылки
+        """
+        if isinstance(findings, (SarifReport, SarifLog)):
+            findings = findings.findings
+        attached = 0
+        for finding in findings:
+            if not isinstance(finding, Finding):
+                continue
+            for location in finding.locations:
+                text = location.snippet
+                if text is None or location.snippet_store is self:
+                    continue
+                location.snippet_ref = self.put(text)
+                location.snippet_store = self
+                location.snippet = None
+                attached += 1
+        return attached
+
+    def save(self, path: Optional[Union[str, Path]] = None):
+        """
+        Записать добавленные фрагменты
+
+        В текущий каталог пишутся только новые фрагменты, в другой
+        каталог (path) - все известные хранилищу.
+        """
+        root = Path(path) if path is not None else self.path
+        if root is None:
+            raise ValueError("Не задан каталог для сохранения хранилища фрагментов")
+        snippets = self._pending if root == self.path else self._snippets
+        for ref, text in snippets.items():
+            target = self._file(ref, root)
+            if target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{ref}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp, target)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        if root == self.path:
+            self._pending.clear()
+
+    def __contains__(self, ref) -> bool:
+        return self.get(ref) is not None
+
+    def __len__(self):
+        if self.path is None or not self.path.is_dir():
+            return len(self._snippets)
+        stored = sum(
+            1 for bucket in self.path.iterdir() if bucket.is_dir()
+            for entry in bucket.iterdir() if _REF_RE.fullmatch(entry.name)
+        )
+        return stored + len(self._pending)
+
+    def __repr__(self):
+        return f"SnippetStore(pending={len(self._pending)}, path={self.path})"
+
@@ -0,0 +1,993 @@
+"""
+Storage backends for the DM API server.
+
+JsonStorage keeps the whole database in data/db.json (the original format)
+and serves reads from a shared cache of the decoded document.
+JournalStorage keeps the same document in memory and appends each change to
+data/db.journal, folding the journal into db.json in the background.
+SqliteStorage keeps projects, findings and tools in SQLite (WAL mode) with
+indexes on the columns the API filters by, so requests no longer cost time
+proportional to the size of the whole database.
+
+    python storage.py migrate data/db.json data/db.sqlite3
+"""
+
+import base64
+import binascii
+import datetime
+import heapq
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import json_backend
+
+try:
+    import fcntl
+except ImportError:  # no cross-process write lock on Windows
+    fcntl = None
+
+
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+
+# Finding record keys as returned by the API, in column order
+FINDING_KEYS = (
+    "id", "severity", "ruleId", "fingerprint", "message", "file", "snippetRef",
+    "tool", "status", "projectName", "created_at",
+)
+
+
+# Finding record keys /api/findings can filter by (any of several values)
+FILTER_KEYS = ("severity", "status", "tool", "ruleId")
+
+# Sort keys for query_findings; a leading "-" sorts descending
+SORT_KEYS = ("created", "severity", "ruleId", "file", "tool", "status")
+
+# Higher rank = more severe, so "-severity" lists the most severe first;
+# unknown severities rank below "info"
+_SEVERITY_RANK = {severity: len(SEVERITIES) - 1 - index for index, severity in enumerate(SEVERITIES)}
+_UNKNOWN_SEVERITY_RANK = -1
+
+
+def parse_sort(sort: Optional[str]) -> tuple:
+    """(sort key, descending) from "key" or "-key"."""
+    sort = sort or "created"
+    key = sort.lstrip("-")
+    if key not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)} (optionally prefixed with -)")
+    return key, sort.startswith("-")
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque keyset cursor: the sort key of the last returned finding."""
+    return base64.urlsafe_b64encode(json_backend.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json_backend.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError("invalid cursor") from None
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix (code point order)."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _record_sort_key(record: Dict[str, Any], key: str) -> tuple:
+    tail = (record.get("created_at") or "", record.get("id") or "")
+    if key == "created":
+        return tail
+    if key == "severity":
+        return (_SEVERITY_RANK.get(record.get("severity"), _UNKNOWN_SEVERITY_RANK),) + tail
+    return (record.get(key) or "",) + tail
+
+
+def now_iso() -> str:
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+class Storage(ABC):
+    """Interface shared by all backends; records are plain dicts."""
+
+    @abstractmethod
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """Project summaries: id, name, description, total_findings, updated_at."""
+
+    @abstractmethod
+    def upsert_project(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
+        """Find a project by name or create it; a non-empty description is updated."""
+
+    @abstractmethod
+    def add_findings(self, project_id: str, findings: List[Dict[str, Any]],
+                     tools: Iterable[str] = ()) -> int:
+        """Append finding records (ids are assigned if missing) and tool names."""
+
+    @abstractmethod
+    def set_finding_status(self, finding_id: str, status: str) -> Optional[Dict[str, Any]]:
+        """Change the status of one finding; returns the updated record or None."""
+
+    @abstractmethod
+    def iter_findings(self, project_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """All finding records, optionally of one project, in insertion order."""
+
+    def query_findings(self, project_id: Optional[str] = None,
+                       filters: Optional[Dict[str, List[str]]] = None,
+                       file_prefix: Optional[str] = None, sort: Optional[str] = None,
+                       limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of findings matching all predicates.
+
+        filters maps FILTER_KEYS to accepted values, file_prefix matches the
+        start of the file path, sort is one of SORT_KEYS (with "-" for
+        descending). The next page starts after next_cursor; total counts all
+        matching findings regardless of paging.
+
+        Returns {"items", "total", "next_cursor"}. This generic version scans
+        iter_findings(); SqliteStorage answers from its indexes.
+        """
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        key, descending = parse_sort(sort)
+        after = tuple(decode_cursor(cursor)) if cursor else None
+
+        total = 0
+
+        def candidates():
+            nonlocal total
+            for record in self._matching(project_id, filters, file_prefix):
+                total += 1
+                sort_key = _record_sort_key(record, key)
+                if after is not None:
+                    try:
+                        seen = sort_key >= after if descending else sort_key <= after
+                    except TypeError:
+                        raise ValueError("invalid cursor") from None
+                    if seen:
+                        continue
+                yield sort_key, record
+
+        # Bounded heap: only limit + 1 candidates are held at a time
+        select = heapq.nlargest if descending else heapq.nsmallest
+        page = select(limit + 1, candidates(), key=lambda item: item[0])
+        next_cursor = encode_cursor(list(page[limit - 1][0])) if len(page) > limit else None
+        return {"items": [record for _, record in page[:limit]], "total": total, "next_cursor": next_cursor}
+
+    def iter_matching(self, project_id: Optional[str] = None,
+                      filters: Optional[Dict[str, List[str]]] = None,
+                      file_prefix: Optional[str] = None, sort: Optional[str] = None,
+                      batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        All findings matching the query_findings predicates, without paging.
+
+        Without sort the findings stream in storage order; a sorted listing
+        is read batch_size findings at a time through the query_findings
+        cursor, so the matches are never collected and sorted as a whole.
+        """
+        if sort is None:
+            yield from self._matching(project_id, filters, file_prefix)
+            return
+        parse_sort(sort)
+        cursor = None
+        while True:
+            page = self.query_findings(project_id, filters, file_prefix, sort, batch_size, cursor)
+            yield from page["items"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+
+    def _matching(self, project_id: Optional[str], filters: Optional[Dict[str, List[str]]],
+                  file_prefix: Optional[str]) -> Iterator[Dict[str, Any]]:
+        accepted = {name: set(values) for name, values in (filters or {}).items() if values}
+        for record in self.iter_findings(project_id):
+            if any(record.get(name) not in values for name, values in accepted.items()):
+                continue
+            if file_prefix and not (record.get("file") or "").startswith(file_prefix):
+                continue
+            yield record
+
+    @abstractmethod
+    def get_statistics(self) -> Dict[str, Any]:
+        """total_findings, total_projects and by_severity counters."""
+
+    def close(self):
+        pass
+
+
+def _project_summary(project: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": project.get("id"),
+        "name": project.get("name"),
+        "description": project.get("description", ""),
+        "total_findings": len(project.get("findings", [])),
+        "updated_at": project.get("updated_at"),
+    }
+
+
+def _find_project(db: Dict[str, Any], project_id: str) -> Dict[str, Any]:
+    for p in db.get("projects", []):
+        if p.get("id") == project_id:
+            return p
+    raise KeyError(project_id)
+
+
+# Mutations of the db.json document are described as operations (plain dicts),
+# so that the journal can record them and replay them over a snapshot.
+
+def upsert_project_op(name: str, description: Optional[str] = None) -> Dict[str, Any]:
+    return {"op": "upsert_project", "id": new_id(), "name": name,
+            "description": description or "", "at": now_iso()}
+
+
+def add_findings_op(project_id: str, findings: List[Dict[str, Any]],
+                    tools: Iterable[str] = ()) -> Dict[str, Any]:
+    for record in findings:
+        record.setdefault("id", new_id())
+    return {"op": "add_findings", "project_id": project_id, "findings": findings,
+            "tools": [tool for tool in tools if tool], "at": now_iso()}
+
+
+def set_status_op(finding_id: str, status: str) -> Dict[str, Any]:
+    return {"op": "set_status", "id": finding_id, "status": status, "at": now_iso()}
+
+
+def apply_op(db: Dict[str, Any], op: Dict[str, Any]) -> Any:
+    """
+    Apply one operation to a decoded db.json document.
+
+    Returns the project summary for upsert_project, the number of findings
+    for add_findings and the updated record (or None) for set_status.
+    """
+    kind = op["op"]
+    if kind == "upsert_project":
+        project = None
+        for p in db.get("projects", []):
+            if p.get("name") == op["name"]:
+                project = p
+                break
+        if project is None:
+            project = {
+                "id": op["id"],
+                "name": op["name"],
+                "description": "",
+                "findings": [],
+                "tools": [],
+                "updated_at": op["at"],
+            }
+            db.setdefault("projects", []).append(project)
+        if op["description"]:
+            project["description"] = op["description"]
+        project["updated_at"] = op["at"]
+        return _project_summary(project)
+    if kind == "add_findings":
+        project = _find_project(db, op["project_id"])
+        project.setdefault("findings", []).extend(op["findings"])
+        for tool in op["tools"]:
+            if tool not in project.setdefault("tools", []):
+                project["tools"].append(tool)
+        project["updated_at"] = op["at"]
+        return len(op["findings"])
+    if kind == "set_status":
+        for p in db.get("projects", []):
+            for f in p.get("findings", []):
+                if f.get("id") == op["id"]:
+                    f["status"] = op["status"]
+                    p["updated_at"] = op["at"]
+                    return f
+        return None
+    raise ValueError(f"Unknown storage operation: {kind}")
+
+
+def check_op(db: Dict[str, Any], op: Dict[str, Any]) -> bool:
+    """
+    Raise the error apply_op would raise for this operation, without applying it.
+
+    Returns False if the operation would leave the document unchanged
+    (set_status of an unknown finding).
+    """
+    kind = op["op"]
+    if kind == "add_findings":
+        _find_project(db, op["project_id"])
+    elif kind == "set_status":
+        return any(f.get("id") == op["id"] for f in _iter_db_findings(db))
+    elif kind != "upsert_project":
+        raise ValueError(f"Unknown storage operation: {kind}")
+    return True
+
+
+def _db_statistics(db: Dict[str, Any]) -> Dict[str, Any]:
+    by_severity = {severity: 0 for severity in SEVERITIES}
+    total_findings = 0
+    for p in db.get("projects", []):
+        for f in p.get("findings", []):
+            total_findings += 1
+            sev = f.get("severity", "info")
+            if sev in by_severity:
+                by_severity[sev] += 1
+    return {
+        "total_findings": total_findings,
+        "total_projects": len(db.get("projects", [])),
+        "by_severity": by_severity,
+    }
+
+
+def _iter_db_findings(db: Dict[str, Any], project_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    for p in db.get("projects", []):
+        if project_id and p.get("id") != project_id:
+            continue
+        yield from p.get("findings", [])
+
+
+# Decoded db.json documents shared by all JsonStorage objects of the process,
+# keyed by absolute path. "process" mode trusts the cache while its generation
+# is current (this process is the only writer); "shared" mode also compares
+# the file's inode, size and mtime, so writes from other workers are picked up.
+DB_CACHE_MODES = ("process", "shared")
+
+
+class _CachedDb:
+    __slots__ = ("db", "stat", "generation")
+
+    def __init__(self, db: Dict[str, Any], stat: Optional[tuple], generation: int):
+        self.db = db
+        self.stat = stat
+        self.generation = generation
+
+
+_DB_CACHE: Dict[Path, _CachedDb] = {}
+_DB_GENERATIONS: Dict[Path, int] = {}
+_DB_CACHE_LOCK = threading.RLock()
+
+
+def invalidate_db_cache(path: Optional[Path] = None):
+    """Drop cached documents (all, or one db.json) after editing files behind the server's back."""
+    with _DB_CACHE_LOCK:
+        keys = list(_DB_CACHE) if path is None else [Path(os.path.abspath(path))]
+        for key in keys:
+            _DB_CACHE.pop(key, None)
+            _DB_GENERATIONS[key] = _DB_GENERATIONS.get(key, 0) + 1
+
+
+class JsonStorage(Storage):
+    """
+    The original single-file database: every write rewrites db.json.
+
+    Reads go through the shared decoded-document cache (see DB_CACHE_MODES);
+    cache=None decodes the file on every call.
+    """
+
+    def __init__(self, path: Path, cache: Optional[str] = "shared"):
+        if cache is not None and cache not in DB_CACHE_MODES:
+            raise ValueError(f"Unknown db cache mode: {cache}")
+        self.path = Path(path)
+        self.cache = cache
+        self._key = Path(os.path.abspath(self.path))
+        self._lock = _DB_CACHE_LOCK
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _read(self) -> Dict[str, Any]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            return {"projects": []}
+        try:
+            with self.path.open("rb") as f:
+                return json_backend.load(f)
+        except Exception:
+            return {"projects": []}
+
+    def load(self) -> Dict[str, Any]:
+        """The decoded document; with a cache it is shared, so mutate it only through _mutate."""
+        if self.cache is None:
+            return self._read()
+        with self._lock:
+            entry = _DB_CACHE.get(self._key)
+            if entry is not None:
+                # Fast path: no disk I/O at all
+                if self.cache == "process" and entry.generation == _DB_GENERATIONS.get(self._key, 0):
+                    return entry.db
+                if self.cache == "shared" and entry.stat == self._stat():
+                    return entry.db
+            # Read-through
+            stat = self._stat()
+            db = self._read()
+            _DB_CACHE[self._key] = _CachedDb(db, stat, _DB_GENERATIONS.get(self._key, 0))
+            return db
+
+    def save(self, db: Dict[str, Any]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json_backend.dump(db, f, indent=2)
+        tmp.replace(self.path)
+        if self.cache is None:
+            return
+        with self._lock:
+            # Write-through: bump the generation and keep the saved document
+            generation = _DB_GENERATIONS.get(self._key, 0) + 1
+            _DB_GENERATIONS[self._key] = generation
+            _DB_CACHE[self._key] = _CachedDb(db, self._stat(), generation)
+
+    @contextmanager
+    def _write_lock(self):
+        # In shared mode several workers write db.json: serialize load-modify-save between them
+        if self.cache != "shared" or fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.with_suffix(".lock").open("a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _mutate(self, op: Dict[str, Any]) -> Any:
+        with self._lock, self._write_lock():
+            db = self.load()
+            try:
+                result = apply_op(db, op)
+                self.save(db)
+            except Exception:
+                # The cached document may be half-modified
+                invalidate_db_cache(self.path)
+                raise
+            return result
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [_project_summary(p) for p in self.load().get("projects", [])]
+
+    def upsert_project(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
+        return self._mutate(upsert_project_op(name, description))
+
+    def add_findings(self, project_id: str, findings: List[Dict[str, Any]],
+                     tools: Iterable[str] = ()) -> int:
+        return self._mutate(add_findings_op(project_id, findings, tools))
+
+    def set_finding_status(self, finding_id: str, status: str) -> Optional[Dict[str, Any]]:
+        return self._mutate(set_status_op(finding_id, status))
+
+    def iter_findings(self, project_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            findings = list(_iter_db_findings(self.load(), project_id))
+        return iter(findings)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return _db_statistics(self.load())
+
+
+def _replay_journal(db: Dict[str, Any], seq: int, journal: Path) -> Tuple[int, int]:
+    """
+    Apply the journal lines newer than seq to db.
+
+    Returns the new seq and the length of the intact part of the journal;
+    only a torn last line (a crashed write) may follow it.
+    """
+    offset = 0
+    if not journal.exists():
+        return seq, offset
+    with journal.open("rb") as f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated line")
+                op = json_backend.loads(line)
+            except ValueError:
+                if f.read(1):
+                    raise ValueError(f"{journal} is corrupt at byte {offset}") from None
+                break
+            offset += len(line)
+            if op["seq"] > seq:
+                apply_op(db, op)
+                seq = op["seq"]
+    return seq, offset
+
+
+class JournalStorage(JsonStorage):
+    """
+    db.json snapshot plus an append-only NDJSON journal (db.journal).
+
+    The database lives in memory; each mutation appends one line with its
+    operation to the journal, so a write costs the size of the change rather
+    than the size of the database. On open the journal is replayed over the
+    snapshot. Once the journal grows past compact_bytes, a background thread
+    writes a fresh snapshot and drops the journal lines it covers.
+
+    Snapshot and journal lines carry a sequence number ("seq"), which makes
+    replay idempotent if the process stops half-way through a compaction.
+    Operations are checked before they are journaled, so a failing call
+    leaves no trace. The in-memory state is per process: an exclusive lock
+    on db.journal.lock, held while the store is open, keeps a second writer
+    out.
+    """
+
+    def __init__(self, path: Path, compact_bytes: int = 64 * 1024 * 1024, fsync: bool = False):
+        # The document is held in memory anyway, so the shared cache is not used
+        super().__init__(path, cache=None)
+        self.journal_path = self.path.with_suffix(".journal")
+        # Journal being folded into a snapshot by an interrupted or running compaction
+        self.rotated_path = self.path.with_suffix(".journal.old")
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._lock_file = self._acquire_writer_lock()
+        try:
+            self._db = self.load()
+            self._seq = self._db.pop("seq", 0)
+            self._compacting = False
+            for journal in (self.rotated_path, self.journal_path):
+                self._replay(journal)
+            if self.rotated_path.exists():
+                # Finish a compaction that was interrupted before its snapshot was written
+                self._write_snapshot(self._dump_snapshot())
+            self._journal = self.journal_path.open("ab")
+        except BaseException:
+            if self._lock_file is not None:
+                self._lock_file.close()
+            raise
+        self._journal_size = self._journal.tell()
+
+    @classmethod
+    def read_document(cls, path: Path) -> Dict[str, Any]:
+        """
+        The document an open store would hold: the snapshot plus the journals.
+
+        Nothing is locked, truncated or compacted, so the files can be read
+        while the store is open in another process (e.g. to copy them).
+        """
+        path = Path(path)
+        db = JsonStorage(path, cache=None).load()
+        seq = db.pop("seq", 0)
+        for journal in (path.with_suffix(".journal.old"), path.with_suffix(".journal")):
+            seq, _ = _replay_journal(db, seq, journal)
+        return db
+
+    def _acquire_writer_lock(self):
+        if fcntl is None:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = self.path.with_suffix(".journal.lock").open("a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(f"{self.journal_path} is already open in another process") from None
+        return lock_file
+
+    def _replay(self, journal: Path):
+        self._seq, intact = _replay_journal(self._db, self._seq, journal)
+        if journal.exists() and journal.stat().st_size > intact:
+            # Torn last line of a crashed write: cut it off before appending
+            os.truncate(journal, intact)
+
+    def _mutate(self, op: Dict[str, Any]) -> Any:
+        with self._lock:
+            if not check_op(self._db, op):
+                # Nothing to journal
+                return apply_op(self._db, op)
+            self._seq += 1
+            op["seq"] = self._seq
+            line = json_backend.dumps(op).encode("utf-8") + b"\n"
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._journal_size += len(line)
+            result = apply_op(self._db, op)
+            if self._journal_size >= self.compact_bytes:
+                self._start_compaction()
+            return result
+
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="db-compactor", daemon=True)
+        self._compactor.start()
+
+    def _dump_snapshot(self) -> str:
+        return json_backend.dumps(dict(self._db, seq=self._seq), indent=2)
+
+    def _write_snapshot(self, snapshot: str):
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(snapshot)
+        tmp.replace(self.path)
+        if self.rotated_path.exists():
+            self.rotated_path.unlink()
+
+    def compact(self):
+        """Write a new snapshot and drop the journal lines it covers."""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+            # Serialize under the lock, write to disk outside of it
+            snapshot = self._dump_snapshot()
+            self._journal.close()
+            self.journal_path.replace(self.rotated_path)
+            self._journal = self.journal_path.open("ab")
+            self._journal_size = 0
+        try:
+            self._write_snapshot(snapshot)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [_project_summary(p) for p in self._db.get("projects", [])]
+
+    def iter_findings(self, project_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            findings = list(_iter_db_findings(self._db, project_id))
+        return iter(findings)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return _db_statistics(self._db)
+
+    def close(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self._journal.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+# Columns findings can be sorted by; stored NOT NULL (missing values as '')
+# so that ORDER BY and keyset comparisons run on bare, indexed columns
+_SORT_COLUMNS = ("severity_rank", "rule_id", "file", "tool", "status")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL DEFAULT '',
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS tools (
+    project_id TEXT NOT NULL REFERENCES projects(id),
+    name TEXT NOT NULL,
+    PRIMARY KEY (project_id, name)
+);
+CREATE TABLE IF NOT EXISTS findings (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    project_id TEXT NOT NULL REFERENCES projects(id),
+    severity TEXT NOT NULL DEFAULT '',
+    severity_rank INTEGER NOT NULL DEFAULT -1,
+    rule_id TEXT NOT NULL DEFAULT '',
+    fingerprint TEXT,
+    message TEXT,
+    file TEXT NOT NULL DEFAULT '',
+    snippet_ref TEXT,
+    tool TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    project_name TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_findings_project ON findings(project_id, seq);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity, seq);
+""" + "".join(
+    # Sorting within a project and across all projects
+    f"CREATE INDEX IF NOT EXISTS idx_findings_project_{column} ON findings(project_id, {column}, seq);\n"
+    f"CREATE INDEX IF NOT EXISTS idx_findings_{column} ON findings({column}, seq);\n"
+    for column in _SORT_COLUMNS
+)
+
+_FINDING_COLUMNS = (
+    "id", "severity", "rule_id", "fingerprint", "message", "file", "snippet_ref",
+    "tool", "status", "project_name", "created_at",
+)
+_NOT_NULL_KEYS = frozenset(("severity", "ruleId", "file", "tool", "status"))
+_SELECT_FINDINGS = f"SELECT {', '.join(_FINDING_COLUMNS)} FROM findings"
+_INSERT_FINDING = (
+    f"INSERT INTO findings (project_id, severity_rank, {', '.join(_FINDING_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(_FINDING_COLUMNS) + 2))})"
+)
+
+
+def _finding_row(project_id: str, record: Dict[str, Any]) -> tuple:
+    values = tuple(
+        (record.get(key) or "") if key in _NOT_NULL_KEYS else record.get(key) for key in FINDING_KEYS
+    )
+    return (project_id, _SEVERITY_RANK.get(values[1], _UNKNOWN_SEVERITY_RANK)) + values
+
+
+def _finding_record(row: tuple) -> Dict[str, Any]:
+    return dict(zip(FINDING_KEYS, row))
+
+
+_COLUMN_BY_KEY = dict(zip(FINDING_KEYS, _FINDING_COLUMNS))
+
+
+def _sort_column(key: str) -> str:
+    if key == "created":
+        return "seq"
+    if key == "severity":
+        return "severity_rank"
+    return _COLUMN_BY_KEY[key]
+
+
+class SqliteStorage(Storage):
+    """SQLite database in WAL mode; one connection per thread."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _summary(self, conn: sqlite3.Connection, project_id: str) -> Dict[str, Any]:
+        row = conn.execute(
+            "SELECT p.id, p.name, p.description, p.updated_at, "
+            "(SELECT COUNT(*) FROM findings f WHERE f.project_id = p.id) "
+            "FROM projects p WHERE p.id = ?", (project_id,)
+        ).fetchone()
+        return {"id": row[0], "name": row[1], "description": row[2],
+                "total_findings": row[4], "updated_at": row[3]}
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT p.id, p.name, p.description, p.updated_at, COUNT(f.seq) "
+            "FROM projects p LEFT JOIN findings f ON f.project_id = p.id "
+            "GROUP BY p.id ORDER BY p.rowid"
+        ).fetchall()
+        return [{"id": r[0], "name": r[1], "description": r[2],
+                 "total_findings": r[4], "updated_at": r[3]} for r in rows]
+
+    def upsert_project(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO projects (id, name, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO NOTHING", (new_id(), name, now_iso())
+            )
+            if description:
+                conn.execute("UPDATE projects SET description = ?, updated_at = ? WHERE name = ?",
+                             (description, now_iso(), name))
+            else:
+                conn.execute("UPDATE projects SET updated_at = ? WHERE name = ?", (now_iso(), name))
+            project_id = conn.execute("SELECT id FROM projects WHERE name = ?", (name,)).fetchone()[0]
+            return self._summary(conn, project_id)
+
+    def add_findings(self, project_id: str, findings: List[Dict[str, Any]],
+                     tools: Iterable[str] = ()) -> int:
+        conn = self._connect()
+        with conn:
+            for record in findings:
+                record.setdefault("id", new_id())
+            conn.executemany(_INSERT_FINDING, (_finding_row(project_id, r) for r in findings))
+            conn.executemany("INSERT OR IGNORE INTO tools (project_id, name) VALUES (?, ?)",
+                             [(project_id, tool) for tool in tools if tool])
+            conn.execute("UPDATE projects SET updated_at = ? WHERE id = ?", (now_iso(), project_id))
+        return len(findings)
+
+    def set_finding_status(self, finding_id: str, status: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("UPDATE findings SET status = ? WHERE id = ?", (status, finding_id))
+            if not cursor.rowcount:
+                return None
+            conn.execute(
+                "UPDATE projects SET updated_at = ? "
+                "WHERE id = (SELECT project_id FROM findings WHERE id = ?)", (now_iso(), finding_id)
+            )
+            row = conn.execute(f"{_SELECT_FINDINGS} WHERE id = ?", (finding_id,)).fetchone()
+        return _finding_record(row)
+
+    def iter_findings(self, project_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        conn = self._connect()
+        if project_id:
+            cursor = conn.execute(f"{_SELECT_FINDINGS} WHERE project_id = ? ORDER BY seq", (project_id,))
+        else:
+            cursor = conn.execute(f"{_SELECT_FINDINGS} ORDER BY seq")
+        for row in cursor:
+            yield _finding_record(row)
+
+    @staticmethod
+    def _where(project_id: Optional[str], filters: Optional[Dict[str, List[str]]],
+               file_prefix: Optional[str]) -> tuple:
+        # Every predicate is an equality, IN or range test on an indexed column
+        where: List[str] = []
+        params: List[Any] = []
+        if project_id:
+            where.append("project_id = ?")
+            params.append(project_id)
+        for name, values in (filters or {}).items():
+            if values:
+                where.append(f"{_COLUMN_BY_KEY[name]} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if file_prefix:
+            where.append("file >= ? AND file < ?")
+            params.extend((file_prefix, prefix_upper_bound(file_prefix)))
+        return where, params
+
+    def _page(self, where: List[str], params: List[Any], key: str, descending: bool,
+              limit: int, after: Optional[List[Any]]) -> tuple:
+        # Keyset paging on (sort column, seq): no OFFSET, and the row-value
+        # comparison and ORDER BY walk the (project_id, column, seq) index
+        column = _sort_column(key)
+        direction, op = ("DESC", "<") if descending else ("ASC", ">")
+        where, params = list(where), list(params)
+        if after is not None:
+            if len(after) != 2:
+                raise ValueError("invalid cursor")
+            if key == "created":
+                where.append(f"seq {op} ?")
+                params.append(after[1])
+            else:
+                where.append(f"({column}, seq) {op} (?, ?)")
+                params.extend(after)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+        order_sql = "seq" if key == "created" else f"{column} {direction}, seq"
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_FINDING_COLUMNS)}, {column}, seq FROM findings{where_sql} "
+            f"ORDER BY {order_sql} {direction} LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+        next_after = [rows[limit - 1][-2], rows[limit - 1][-1]] if len(rows) > limit else None
+        return [_finding_record(row[:len(_FINDING_COLUMNS)]) for row in rows[:limit]], next_after
+
+    def query_findings(self, project_id: Optional[str] = None,
+                       filters: Optional[Dict[str, List[str]]] = None,
+                       file_prefix: Optional[str] = None, sort: Optional[str] = None,
+                       limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        key, descending = parse_sort(sort)
+        where, params = self._where(project_id, filters, file_prefix)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+        total = self._connect().execute(f"SELECT COUNT(*) FROM findings{where_sql}", params).fetchone()[0]
+        items, next_after = self._page(where, params, key, descending, limit,
+                                       decode_cursor(cursor) if cursor else None)
+        return {
+            "items": items,
+            "total": total,
+            "next_cursor": encode_cursor(next_after) if next_after is not None else None,
+        }
+
+    def iter_matching(self, project_id: Optional[str] = None,
+                      filters: Optional[Dict[str, List[str]]] = None,
+                      file_prefix: Optional[str] = None, sort: Optional[str] = None,
+                      batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        key, descending = parse_sort(sort)
+        where, params = self._where(project_id, filters, file_prefix)
+        # Short indexed keyset queries instead of one read transaction held open
+        # for the whole (possibly slow) consumer
+        after = None
+        while True:
+            items, after = self._page(where, params, key, descending, batch_size, after)
+            yield from items
+            if after is None:
+                return
+
+    def get_statistics(self) -> Dict[str, Any]:
+        conn = self._connect()
+        by_severity = {severity: 0 for severity in SEVERITIES}
+        total_findings = 0
+        for severity, count in conn.execute("SELECT severity, COUNT(*) FROM findings GROUP BY severity"):
+            total_findings += count
+            if severity in by_severity:
+                by_severity[severity] = count
+        total_projects = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        return {
+            "total_findings": total_findings,
+            "total_projects": total_projects,
+            "by_severity": by_severity,
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_storage(backend: str, data_dir: Path, db_cache: Optional[str] = "shared") -> Storage:
+    """Storage by name: "json" (data/db.json, cached per db_cache), "journal"
+    (data/db.json + data/db.journal) or "sqlite" (data/db.sqlite3)."""
+    data_dir = Path(data_dir)
+    if backend == "json":
+        return JsonStorage(data_dir / "db.json", cache=db_cache)
+    if backend == "journal":
+        return JournalStorage(data_dir / "db.json")
+    if backend == "sqlite":
+        return SqliteStorage(data_dir / "db.sqlite3")
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def migrate_json_to_sqlite(json_path: Path, sqlite_path: Path) -> Dict[str, int]:
+    """
+    One-shot copy of a db.json database into SQLite.
+
+    Projects that already exist in the target (by name) are skipped, so the
+    migrator can be re-run safely. Findings without ids get new ones.
+    """
+    # Snapshot plus the changes journaled since it was written, if any
+    source = JournalStorage.read_document(json_path)
+    target = SqliteStorage(sqlite_path)
+    conn = target._connect()
+    migrated = {"projects": 0, "findings": 0}
+    try:
+        with conn:
+            for project in source.get("projects", []):
+                exists = conn.execute("SELECT 1 FROM projects WHERE name = ?",
+                                      (project.get("name"),)).fetchone()
+                if exists:
+                    continue
+                project_id = project.get("id") or new_id()
+                conn.execute(
+                    "INSERT INTO projects (id, name, description, updated_at) VALUES (?, ?, ?, ?)",
+                    (project_id, project.get("name"), project.get("description") or "",
+                     project.get("updated_at"))
+                )
+                findings = project.get("findings", [])
+                for record in findings:
+                    record.setdefault("id", new_id())
+                conn.executemany(_INSERT_FINDING, (_finding_row(project_id, r) for r in findings))
+                conn.executemany("INSERT OR IGNORE INTO tools (project_id, name) VALUES (?, ?)",
+                                 [(project_id, tool) for tool in project.get("tools", []) if tool])
+                migrated["projects"] += 1
+                migrated["findings"] += len(findings)
+    finally:
+        target.close()
+    return migrated
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DM storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="copy data/db.json into SQLite")
+    migrate.add_argument("json_path", nargs="?", default=os.path.join("data", "db.json"))
+    migrate.add_argument("sqlite_path", nargs="?", default=os.path.join("data", "db.sqlite3"))
+    args = parser.parse_args(argv)
+
+    counts = migrate_json_to_sqlite(Path(args.json_path), Path(args.sqlite_path))
+    print(f"Migrated {counts['projects']} projects, {counts['findings']} findings "
+          f"to {args.sqlite_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Тестирование API сервера: выгрузка находок /api/findings/export
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+pytest.importorskip("flask")
+
+import api_server
+import sarif_synth
+import storage
+from sarif_parser import SarifParser
+
+
+TOOLS = ("Scanner A", "Scanner B")
+
+
+def upload(client, project_name, config):
+    content = json.dumps(sarif_synth.generate_sarif(config)).encode("utf-8")
+    response = client.post(
+        "/api/upload",
+        data={"file": (io.BytesIO(content), "report.sarif"), "project_name": project_name},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def client(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(api_server, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(api_server, "DB_PATH", tmp_path / "db.json")
+    monkeypatch.setattr(api_server, "STORAGE_BACKEND", request.param)
+    client = api_server.APP.test_client()
+    for seed, tool in enumerate(TOOLS):
+        config = sarif_synth.SynthConfig(results=30, rules=5, files=6, snippet_size=12, seed=seed, tool_name=tool)
+        upload(client, "DM", config)
+    yield client
+    api_server.get_storage().close()
+
+
+def export(client, query):
+    response = client.get(f"/api/findings/export?{query}")
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response
+
+
+def all_findings(client):
+    return list(api_server.get_storage().iter_findings())
+
+
+def test_export_ndjson_and_csv(client):
+    """NDJSON и CSV содержат все находки со всеми полями"""
+    findings = all_findings(client)
+    assert len(findings) == 60
+
+    response = export(client, "format=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    assert "findings.ndjson" in response.headers["Content-Disposition"]
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert records == findings
+
+    response = export(client, "format=csv")
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["id"] for row in rows] == [f["id"] for f in findings]
+    assert rows[0]["ruleId"] == findings[0]["ruleId"] and rows[0]["tool"] == findings[0]["tool"]
+
+
+def test_export_filters_and_sort(client):
+    """Выгрузка применяет те же фильтры и сортировку, что и /api/findings"""
+    findings = all_findings(client)
+    sample = next(f for f in findings if f["tool"] == TOOLS[1] and f["severity"] == "high")
+    file_prefix = sample["file"].rsplit("/", 1)[0] + "/"
+    expected = [f for f in findings
+                if f["severity"] in ("high", "medium") and f["tool"] == TOOLS[1]
+                and f["file"].startswith(file_prefix)]
+    assert expected
+
+    query = f"severity=high,medium&tool={TOOLS[1]}&file={file_prefix}"
+    records = [json.loads(line) for line in export(client, query).get_data(as_text=True).splitlines()]
+    assert sorted(r["id"] for r in records) == sorted(f["id"] for f in expected)
+
+    records = [json.loads(line) for line in export(client, "sort=-severity").get_data(as_text=True).splitlines()]
+    ranks = ["info", "low", "medium", "high", "critical"]
+    assert [ranks.index(r["severity"]) for r in records] == sorted(
+        (ranks.index(f["severity"]) for f in findings), reverse=True)
+
+
+def test_export_rejects_bad_requests(client):
+    """Неизвестный формат и сортировка - ответ 400"""
+    response = client.get("/api/findings/export?format=xml")
+    assert response.status_code == 400
+    assert "format" in response.get_json()["error"]
+    assert client.get("/api/findings/export?sort=bogus").status_code == 400
+
+
+def test_export_sarif_round_trip(client):
+    """SARIF выгрузка - по запуску на инструмент, читается парсером обратно"""
+    findings = all_findings(client)
+    response = export(client, "format=sarif")
+    assert response.mimetype == "application/sarif+json"
+    content = response.get_data()
+
+    log = SarifParser.parse_log_bytes(content)
+    assert [report.tool.name for report in log.reports] == sorted(TOOLS)
+    for report in log.reports:
+        expected = [f for f in findings if f["tool"] == report.tool.name]
+        assert len(report.findings) == len(expected)
+        assert sorted(f.fingerprint for f in report.findings) == sorted(f["fingerprint"] for f in expected)
+
+    # Фрагменты кода подставляются из хранилища фрагментов
+    finding = log.reports[0].findings[0]
+    assert finding.locations[0].snippet and len(finding.locations[0].snippet) == 12
+
+    # Фильтр по инструменту - один запуск
+    log = SarifParser.parse_log_bytes(export(client, f"format=sarif&tool={TOOLS[0]}").get_data())
+    assert [report.tool.name for report in log.reports] == [TOOLS[0]]
+
+
+def test_export_reads_matches_in_batches(client, monkeypatch):
+    """Сортированная выгрузка читает совпадения пачками по курсору, а не все сразу"""
+    backend = api_server.get_storage()
+    batches = []
+    if isinstance(backend, storage.SqliteStorage):
+        page = storage.SqliteStorage._page
+
+        def spy(self, *args):
+            items, after = page(self, *args)
+            batches.append(len(items))
+            return items, after
+
+        monkeypatch.setattr(storage.SqliteStorage, "_page", spy)
+    else:
+        query = storage.Storage.query_findings
+
+        def spy(self, *args, **kwargs):
+            result = query(self, *args, **kwargs)
+            batches.append(len(result["items"]))
+            return result
+
+        monkeypatch.setattr(storage.Storage, "query_findings", spy)
+    monkeypatch.setattr(api_server, "EXPORT_BATCH_SIZE", 16)
+
+    records = export(client, "sort=-severity").get_data(as_text=True).splitlines()
+    assert len(records) == 60
+    assert batches == [16, 16, 16, 12]
@@ -0,0 +1,137 @@
+"""
+Тестирование JSON бэкендов: одинаковый вывод байт в байт
+"""
+
+import io
+import json
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import json_backend
+import sarif_io
+from sarif_stream import JsonStreamReader
+
+
+SAMPLE_DB = {
+    "projects": [
+        {
+            "id": "3f0c2a9e-8d1b-4c55-9a51-0b6e4f1c2d3a",
+            "name": "Проект DM",
+            "description": "",
+            "findings": [
+                {
+                    "severity": "high",
+                    "ruleId": "sqli",
+                    "message": "SQL-инъекция в параметре \"id\"\n\tстрока 2 / путь \\ слеш",
+                    "file": "src/app/db.py",
+                    "line": 42,
+                    "tool": "PT Application Inspector",
+                    "status": "new",
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "fixed": False,
+                    "assignee": None,
+                    "tags": [],
+                    "meta": {},
+                    "control": "\x01\x1f   😀",
+                }
+            ],
+            "tools": ["PT BlackBox", "PT Application Inspector"],
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+    ]
+}
+
+
+@pytest.fixture(params=json_backend.available_backends())
+def backend(request):
+    previous = json_backend.BACKEND
+    json_backend.set_backend(request.param)
+    yield request.param
+    json_backend.set_backend(previous)
+
+
+def test_dumps_indent_parity(backend):
+    """Форматированный вывод совпадает со стандартным json"""
+    expected = json.dumps(SAMPLE_DB, ensure_ascii=False, indent=2)
+    assert json_backend.dumps(SAMPLE_DB, indent=2).encode("utf-8") == expected.encode("utf-8")
+
+
+def test_dumps_compact_parity(backend):
+    """Компактный вывод совпадает со стандартным json без пробелов"""
+    expected = json.dumps(SAMPLE_DB, ensure_ascii=False, separators=(",", ":"))
+    assert json_backend.dumps(SAMPLE_DB).encode("utf-8") == expected.encode("utf-8")
+
+
+def test_loads_accepts_text_and_bytes(backend):
+    """Декодирование str, bytes и memoryview дает одинаковый результат"""
+    text = json.dumps(SAMPLE_DB, ensure_ascii=False)
+    raw = text.encode("utf-8")
+
+    assert json_backend.loads(text) == SAMPLE_DB
+    assert json_backend.loads(raw) == SAMPLE_DB
+    assert json_backend.loads(memoryview(raw)) == SAMPLE_DB
+
+
+def test_broken_bom_file_raises_decode_error(backend, tmp_path):
+    """Ошибка разбора файла с BOM - JSONDecodeError, отображение файла закрывается"""
+    path = tmp_path / "broken.sarif"
+    path.write_bytes(b"\xef\xbb\xbf" + '{"runs": [{"tool": "я"'.encode("utf-8"))
+    with pytest.raises(ValueError) as error:
+        sarif_io.load_file(str(path))
+    assert not isinstance(error.value, BufferError)
+    assert json_backend.loads(memoryview(b'{"tool": "\xd1\x8f"}')) == {"tool": "я"}
+
+
+def test_dumps_falls_back_for_unsupported_values(backend):
+    """Значения, не поддерживаемые бэкендом, сериализуются через stdlib"""
+    value = {"big": 2 ** 70, "items": [1, 2]}
+    assert json_backend.dumps(value, indent=2) == json.dumps(value, indent=2)
+
+
+def test_float_exponent_forms(backend):
+    """Экспонента float отличается только записью (1e+16 / 1e16, 1e-07 / 1e-7) и читается обратно"""
+    values = {"big": 1e16, "small": 1e-7, "huge": -2.5e300, "plain": 0.1, "zero": -0.0}
+    text = json_backend.dumps(values)
+    expected = json.dumps(values, separators=(",", ":"))
+    short = re.sub(r"e\+?(-?)0*(\d)", r"e\1\2", expected)
+    if backend == "orjson":
+        assert text == short and "1e16" in text and "1e-7" in text
+    elif backend == "json":
+        assert text == expected and "1e+16" in text
+    assert json_backend.loads(text) == values
+    assert json_backend.loads(expected) == json_backend.loads(short) == values
+
+
+def test_non_finite_numbers(backend):
+    """NaN и Infinity на входе отклоняются, на выходе - ValueError или null (orjson)"""
+    if backend != "ujson":
+        for text in ("[NaN]", '{"x": Infinity}', "-Infinity"):
+            with pytest.raises(json_backend.JSONDecodeError):
+                json_backend.loads(text)
+            with pytest.raises(ValueError):
+                json_backend.loads(text.encode("utf-8"))
+
+    if backend == "orjson":
+        assert json_backend.dumps({"v": float("nan"), "w": float("inf")}) == '{"v":null,"w":null}'
+    else:
+        with pytest.raises(ValueError):
+            json_backend.dumps({"v": float("nan")})
+
+
+def test_stream_reader_rejects_nan():
+    """Потоковое чтение отклоняет NaN сразу, не дочитывая поток до конца"""
+    reader = JsonStreamReader(io.StringIO('{"a": [1, NaN, 3]}' + " " * 100_000), chunk_size=8)
+    with pytest.raises(ValueError):
+        for _ in reader.iter_object():
+            list(reader.iter_array_values())
+    assert len(reader._buffer) < 1000
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        json_backend.set_backend("simplejson")
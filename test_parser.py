@@ -4,11 +4,67 @@
 
 import sys
 import os
+import io
+import random
+import json
+import gzip
+import bz2
+import lzma
+import zipfile
 
 # Добавляем текущую директорию в путь
 sys.path.insert(0, os.path.dirname(__file__))
 
-from sarif_parser import SarifParser, print_report_summary, SeverityLevel
+from sarif_parser import (
+    SarifParser, ReportStats, FingerprintIndex, ParseBatch, print_report_summary, SeverityLevel,
+    STATS_FIELDS
+)
+from sarif_stream import JsonStreamReader
+from parse_cache import ParseCache
+from sarif_diff import diff_reports
+from sarif_writer import SarifWriter, write_report
+import sarif_synth
+from parse_profile import ParseProfile, profiling
+import sarif_io
+from snippet_store import SnippetStore
+import pickle
+
+
+def make_sarif(results_count=5, results_first=False):
+    """Небольшой SARIF документ для тестов"""
+    tool = {
+        "driver": {
+            "name": "Test Scanner",
+            "version": "1.0",
+            "rules": [
+                {"id": "sqli", "name": "SQL Injection",
+                 "defaultConfiguration": {"level": "error"}},
+                {"id": "xss", "name": "Cross-Site Scripting",
+                 "defaultConfiguration": {"level": "warning"}},
+            ],
+        }
+    }
+    results = [
+        {
+            "ruleId": "sqli" if i % 2 == 0 else "xss",
+            "message": {"text": f"Finding {i}"},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": f"src/app/module_{i % 3}.py"},
+                    "region": {"startLine": i + 1, "snippet": {"text": "query(x)"}},
+                }
+            }],
+        }
+        for i in range(results_count)
+    ]
+    run = {"results": results, "tool": tool} if results_first else {"tool": tool, "results": results}
+    return {"version": "2.1.0", "runs": [run]}
+
+
+def write_sarif(tmp_path, data, name="report.sarif"):
+    path = tmp_path / name
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
 
 
 def test_parse_files():
@@ -70,6 +126,654 @@ def test_parse_files():
             traceback.print_exc()
 
 
+def test_iter_file_matches_parse_file(tmp_path):
+    """Потоковый парсинг дает те же находки, что и parse_file"""
+    path = write_sarif(tmp_path, make_sarif(results_count=50))
+    
+    streamed = list(SarifParser.iter_file(path))
+    
+    assert streamed == SarifParser.parse_file(path).findings
+    assert streamed[0].rule_name == "SQL Injection"
+    assert streamed[1].level == SeverityLevel.WARNING
+
+
+def test_iter_file_results_before_tool(tmp_path):
+    """Правила разрешаются, даже если results идут раньше tool"""
+    path = write_sarif(tmp_path, make_sarif(results_count=4, results_first=True))
+    
+    streamed = list(SarifParser.iter_file(path))
+    
+    assert len(streamed) == 4
+    assert all(f.rule_name in ("SQL Injection", "Cross-Site Scripting") for f in streamed)
+
+
+def test_parse_log_all_runs():
+    """parse_log разбирает все runs, в том числе в пуле процессов"""
+    data = make_sarif(results_count=6)
+    second = make_sarif(results_count=3)["runs"][0]
+    second["tool"]["driver"]["name"] = "Second Scanner"
+    data["runs"].append(second)
+    
+    log = SarifParser.parse_log(data)
+    parallel = SarifParser.parse_log(data, workers=2)
+    
+    assert [r.tool.name for r in log.reports] == ["Test Scanner", "Second Scanner"]
+    assert [r.findings for r in parallel.reports] == [r.findings for r in log.reports]
+    assert log.get_statistics()["total_findings"] == 9
+    assert log.get_statistics()["by_rule"]["sqli"]["count"] == 5
+
+    compact = SarifParser.parse_log(data, workers=2, compact=True)
+    assert [list(r.findings) for r in compact.reports] == [r.findings for r in log.reports]
+
+
+def test_parse_file_merges_all_runs(tmp_path):
+    """parse_file не теряет находки второго и последующих runs"""
+    data = make_sarif(results_count=6)
+    second = make_sarif(results_count=3)["runs"][0]
+    second["tool"]["driver"]["name"] = "Second Scanner"
+    data["runs"].append(second)
+    path = write_sarif(tmp_path, data)
+
+    report = SarifParser.parse_file(path)
+
+    assert report.tool.name == "Test Scanner"
+    assert len(report.findings) == 9
+    assert report.findings == list(SarifParser.iter_file(path))
+    assert report.get_statistics()["total_rules"] == 2
+    assert len(SarifParser.parse_file(path, compact=True).findings) == 9
+
+    with open(path, "rb") as f:
+        log = SarifParser.parse_log_bytes(f.read())
+    assert [len(r.findings) for r in log.reports] == [6, 3]
+
+
+def test_compact_report_matches_objects(tmp_path):
+    """FindingTable совместим с Finding и считает ту же статистику"""
+    path = write_sarif(tmp_path, make_sarif(results_count=20))
+    
+    report = SarifParser.parse_file(path)
+    compact = SarifParser.parse_file(path, compact=True)
+    
+    assert len(compact.findings) == 20
+    assert list(compact.findings) == report.findings
+    assert compact.findings[-1].locations == report.findings[-1].locations
+    assert compact.get_statistics() == report.get_statistics()
+
+
+def test_parse_many_aggregates(tmp_path):
+    """parse_many разбирает все файлы и объединяет статистику"""
+    paths = [
+        write_sarif(tmp_path, make_sarif(results_count=n), name=f"r{n}.sarif")
+        for n in (2, 3, 4)
+    ]
+    paths.append(str(tmp_path / "missing.sarif"))
+    
+    batch = SarifParser.parse_many(paths, workers=2)
+    parsed = dict(batch)
+    stats = batch.get_statistics()
+    
+    assert sorted(len(r.findings) for r in parsed.values()) == [2, 3, 4]
+    assert list(batch.errors) == [paths[-1]]
+    assert stats["total_findings"] == 9
+    assert stats["total_files"] == 3
+
+
+def test_parse_cache_hit_and_eviction(tmp_path):
+    """Повторный парсинг берется из кэша, лимит размера соблюдается"""
+    path = write_sarif(tmp_path, make_sarif(results_count=10))
+    cache = ParseCache(tmp_path / "cache")
+    
+    first = SarifParser.parse_file(path, cache=cache)
+    second = SarifParser.parse_file(path, cache=cache)
+    
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.findings == first.findings
+    
+    cache.max_bytes = 1
+    cache.evict()
+    assert SarifParser.parse_file(path, cache=cache).findings == first.findings
+    assert cache.misses == 2
+
+
+def test_parse_file_bom_and_utf16(tmp_path):
+    """Файлы с UTF-8 BOM и в UTF-16 читаются всеми способами"""
+    text = json.dumps(make_sarif(results_count=3), ensure_ascii=False)
+    expected = SarifParser.parse_dict(json.loads(text)).findings
+    
+    for name, encoding in (("bom.sarif", "utf-8-sig"), ("le.sarif", "utf-16"),
+                           ("be.sarif", "utf-16-be")):
+        path = tmp_path / name
+        path.write_bytes(text.encode(encoding))
+        
+        assert SarifParser.parse_file(str(path)).findings == expected
+        assert SarifParser.parse_bytes(path.read_bytes()).findings == expected
+        assert list(SarifParser.iter_file(str(path))) == expected
+
+
+def test_report_stats_accumulated_during_parsing(tmp_path):
+    """Статистика парсера совпадает с пересчетом и объединяется через merge"""
+    path = write_sarif(tmp_path, make_sarif(results_count=9))
+    report = SarifParser.parse_file(path)
+    
+    rebuilt = ReportStats.from_findings(report.findings, report.rules)
+    assert report.stats == rebuilt
+    assert report.stats.by_file["src/app/module_0.py"].total == 3
+    assert report.stats.paths.count("src/app") == 9
+    assert report.stats.paths.children("src") == {"app": 9}
+    assert sorted(report.stats.critical_files()) == ["src/app/module_0.py", "src/app/module_1.py",
+                                                     "src/app/module_2.py"]
+    
+    streamed = ReportStats()
+    for _ in SarifParser.iter_file(path, stats=streamed):
+        pass
+    assert streamed == report.stats
+    
+    merged = ReportStats().merge(report.stats).merge(streamed)
+    assert merged.total_findings == 18
+    assert merged.total_rules == 2
+    assert merged.by_rule["sqli"]["count"] == 10
+    assert merged.by_file["src/app/module_0.py"].by_severity["error"] == 4
+    assert merged.paths.children("src/app") == {"module_0.py": 6, "module_1.py": 6, "module_2.py": 6}
+
+
+def test_strings_interned_per_report(tmp_path):
+    """Одинаковые пути и id правил разделяют один объект строки"""
+    data = make_sarif(results_count=12)
+    data["runs"][0]["results"][0]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] = (
+        "lib/vendor/a.py")
+    path = write_sarif(tmp_path, data)
+    
+    for findings in (SarifParser.parse_file(path).findings, list(SarifParser.iter_file(path))):
+        paths = [f.locations[0].file_path for f in findings]
+        assert len({id(p) for p in paths}) == len(set(paths)) == 4
+        assert len({id(f.rule_id) for f in findings}) == 2
+    
+    tree = SarifParser.parse_file(path).stats.paths
+    assert list(tree.walk(max_depth=2)) == [("src", 11, 1), ("src/app", 11, 2),
+                                            ("lib", 1, 1), ("lib/vendor", 1, 2)]
+    assert [path for path, _, _ in tree.walk("src/app")] == [
+        "src/app/module_1.py", "src/app/module_2.py", "src/app/module_0.py"]
+
+
+def test_report_stats_follow_changes(tmp_path):
+    """Статистика пересчитывается после изменения находок, даже если их число не изменилось"""
+    report = SarifParser.parse_file(write_sarif(tmp_path, make_sarif(results_count=3)))
+    assert report.get_statistics()["by_severity"]["error"] == 2
+    
+    report.findings[1].level = SeverityLevel.ERROR
+    report.invalidate()
+    assert report.get_stats().by_severity["error"] == 3
+    assert report.get_statistics()["by_severity"]["error"] == 3
+    
+    report.add_findings([report.findings[0]])
+    assert report.get_stats().by_severity["error"] == 4
+
+
+def test_batch_counts_shared_rules_once(tmp_path):
+    """Правила, общие для нескольких файлов пакета, считаются один раз"""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"copy_{i}.sarif"
+        path.write_text(json.dumps(make_sarif(results_count=3)))
+        paths.append(str(path))
+    
+    stats = ParseBatch(paths, workers=1).get_statistics()
+    assert stats["total_findings"] == 9
+    assert stats["total_rules"] == 2
+
+
+def test_rule_resolution_by_index_guid_and_extensions(tmp_path):
+    """Правила расширений разрешаются по индексу, GUID и иерархическому id"""
+    data = make_sarif(results_count=0)
+    run = data["runs"][0]
+    run["tool"]["extensions"] = [{
+        "name": "Plugin Pack",
+        "guid": "pack-guid",
+        "rules": [
+            {"id": "ssrf", "name": "SSRF", "guid": "ssrf-guid",
+             "defaultConfiguration": {"level": "error"}},
+            {"id": "open-redirect", "name": "Open Redirect",
+             "defaultConfiguration": {"level": "warning"}},
+        ],
+    }]
+    run["results"] = [
+        {"ruleIndex": 1, "message": {"text": "driver index"}},
+        {"rule": {"index": 1, "toolComponent": {"index": 0}}},
+        {"rule": {"guid": "ssrf-guid"}},
+        {"ruleId": "ssrf", "rule": {"index": 0, "toolComponent": {"guid": "pack-guid"}}},
+        {"ruleId": "sqli/1"},
+    ]
+    path = write_sarif(tmp_path, data)
+    
+    report = SarifParser.parse_file(path)
+    
+    assert [f.rule_id for f in report.findings] == ["xss", "open-redirect", "ssrf", "ssrf", "sqli/1"]
+    assert [f.level.value for f in report.findings] == ["warning", "warning", "error", "error", "error"]
+    assert report.findings[2].rule is report.rules["ssrf"]
+    assert report.findings[4].rule_name == "SQL Injection"
+    assert list(SarifParser.iter_file(path)) == report.findings
+
+
+def test_fingerprints_and_deduplication(tmp_path):
+    """Отпечатки стабильны, учитывают partialFingerprints и дедуплицируют находки"""
+    first = make_sarif(results_count=4)
+    second = make_sarif(results_count=6)
+    # Те же находки, но с другими пробелами во фрагменте кода и путями Windows
+    for result in second["runs"][0]["results"]:
+        physical = result["locations"][0]["physicalLocation"]
+        physical["region"]["snippet"]["text"] = "  query(x)\n"
+        physical["artifactLocation"]["uri"] = physical["artifactLocation"]["uri"].replace("/", "\\")
+    second["runs"][0]["results"][5]["partialFingerprints"] = {"primaryLocationLineHash": "abc:1"}
+    
+    report1 = SarifParser.parse_dict(first)
+    report2 = SarifParser.parse_dict(second)
+    
+    assert report1.findings[0].fingerprint == SarifParser.parse_dict(first).findings[0].fingerprint
+    assert [f.fingerprint for f in report2.findings[:4]] == [f.fingerprint for f in report1.findings]
+    assert len({f.fingerprint for f in report2.findings}) == 6
+    
+    index = FingerprintIndex()
+    unique = list(index.deduplicate(list(report1.findings) + list(report2.findings)))
+    
+    assert len(unique) == 6
+    assert index.duplicates == 4
+    assert report2.findings[5] in index
+    assert SarifParser.parse_dict(second, compact=True).findings[5].fingerprint == report2.findings[5].fingerprint
+
+
+def test_diff_reports_classifies_findings(tmp_path):
+    """diff_reports различает новые, исправленные, перемещенные и неизмененные находки"""
+    old = make_sarif(results_count=6)
+    new = make_sarif(results_count=6)
+    new_results = new["runs"][0]["results"]
+    # 0 - исправлена, 1 - сдвинута на 10 строк, 6 - новая
+    del new_results[0]
+    new_results[0]["locations"][0]["physicalLocation"]["region"]["startLine"] += 10
+    new_results.append(make_sarif(results_count=7)["runs"][0]["results"][6])
+    new_results[-1]["locations"][0]["physicalLocation"]["region"]["snippet"]["text"] = "eval(x)"
+    old_path = write_sarif(tmp_path, old, name="old.sarif")
+    
+    diff = diff_reports(old_path, SarifParser.parse_dict(new))
+    
+    assert diff.get_statistics() == {"new": 1, "fixed": 1, "moved": 1, "unchanged": 4}
+    assert diff.fixed[0].message == "Finding 0"
+    assert diff.moved[0][0].locations[0].start_line == 2
+    assert diff.moved[0][1].locations[0].start_line == 12
+    assert diff.new[0].message == "Finding 6"
+
+
+def test_sarif_writer_round_trip(tmp_path):
+    """Записанный SARIF читается обратно, правила - только упомянутые"""
+    data = make_sarif(results_count=6)
+    report = SarifParser.parse_dict(data)
+    errors = [f for f in report.findings if f.level == SeverityLevel.ERROR]
+    out = str(tmp_path / "errors.sarif")
+    
+    assert write_report(report, out, findings=iter(errors)) == 3
+    
+    written = SarifParser.parse_file(out)
+    assert written.findings == errors
+    assert list(written.rules) == ["sqli"]
+    assert written.tool.name == "Test Scanner"
+    
+    buffer = io.BytesIO()
+    with SarifWriter(buffer) as writer:
+        writer.write_report(report)
+        writer.write_report(report, findings=errors)
+    log = SarifParser.parse_log(json.loads(buffer.getvalue()))
+    assert [len(r.findings) for r in log.reports] == [6, 3]
+    
+    # Отпечатки, в том числе построенные по partialFingerprints инструмента, не меняются
+    data["runs"][0]["results"][1]["partialFingerprints"] = {"primaryLocationLineHash": "abc:1"}
+    for source in (SarifParser.parse_dict(data), SarifParser.parse_dict(data, compact=True)):
+        buffer = io.BytesIO()
+        with SarifWriter(buffer) as writer:
+            writer.write_report(source)
+        written = SarifParser.parse_bytes(buffer.getvalue())
+        assert [f.fingerprint for f in written.findings] == [f.fingerprint for f in source.findings]
+
+
+def test_report_query_uses_indexes(tmp_path):
+    """query пересекает индексы по уровню, правилу и каталогу"""
+    data = make_sarif(results_count=12)
+    data["runs"][0]["results"][11]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] = \
+        "lib\\vendor\\module_2.py"
+    report = SarifParser.parse_dict(data)
+    
+    def expected(predicate):
+        return [f for f in report.findings if predicate(f)]
+    
+    assert report.query(severity="error") == expected(lambda f: f.level == SeverityLevel.ERROR)
+    assert report.query(rule=["xss"], path_prefix="src/app") == expected(
+        lambda f: f.rule_id == "xss" and f.locations[0].file_path.startswith("src/app"))
+    assert report.query(path_prefix="lib/vendor") == [report.findings[11]]
+    assert report.query(file="src/app/module_1.py", severity=SeverityLevel.WARNING) == expected(
+        lambda f: f.level == SeverityLevel.WARNING and f.locations[0].file_path == "src/app/module_1.py")
+    assert report.query(path_prefix="src/ap") == []
+    assert report.get_index().paths.children("src/app") == {
+        "module_0.py": 4, "module_1.py": 4, "module_2.py": 3}
+    
+    # Индекс перестраивается после изменения находок того же числа
+    report.findings[0].level = SeverityLevel.NOTE
+    report.invalidate()
+    assert report.query(severity="note") == [report.findings[0]]
+
+
+def test_report_index_select_matches_scan():
+    """Кэшированные объединения и пересечения совпадают с полным просмотром"""
+    rng = random.Random(3)
+    data = make_sarif(results_count=0)
+    run = data["runs"][0]
+    run["tool"]["driver"]["rules"] = [{"id": f"rule-{i}"} for i in range(40)]
+    run["results"] = [
+        {
+            "ruleId": f"rule-{rng.randrange(40)}",
+            "level": rng.choice(["error", "warning", "note"]),
+            "message": {"text": "m"},
+            "locations": [{"physicalLocation": {"artifactLocation": {
+                "uri": f"src/pkg_{rng.randrange(6)}/module_{rng.randrange(10)}.py"}}}],
+        }
+        for _ in range(3000)
+    ]
+    report = SarifParser.parse_dict(data, compact=True)
+    index = report.get_index()
+    rules = sorted(index.by_rule)
+    prefixes = [None, ""] + sorted({f.locations[0].file_path.rsplit("/", 1)[0] for f in report.findings})[:3]
+    
+    for severity in (None, "error", ["warning", "note"]):
+        for rule in (None, rules[0], rules[:15]):
+            for prefix in prefixes:
+                query = dict(severity=severity, rule=rule, path_prefix=prefix)
+                positions = [
+                    position for position, f in enumerate(report.findings)
+                    if (severity is None or f.level.value in ([severity] if isinstance(severity, str) else severity))
+                    and (rule is None or f.rule_id in ([rule] if isinstance(rule, str) else rule))
+                    and (prefix is None or f.locations[0].file_path.startswith(prefix))
+                ]
+                assert index.select(**query) == positions
+                index.select(**query).clear()
+                assert index.select(**query) == positions
+
+
+def test_stream_reader_small_chunks():
+    """Значения на границах буфера читаются корректно"""
+    text = json.dumps({"a": [1, 22, 333, {"b": "строка"}], "c": 12345.5})
+    reader = JsonStreamReader(io.StringIO(text), chunk_size=3)
+    
+    values = {}
+    for key in reader.iter_object():
+        if key == "a":
+            values[key] = list(reader.iter_array_values())
+        else:
+            values[key] = reader.read_value()
+    
+    assert values == json.loads(text)
+
+
+def test_stream_reader_numbers_on_chunk_boundaries():
+    """Дробные числа и экспоненты не обрезаются границей буфера при любом размере порции"""
+    text = json.dumps({
+        "rank": [12.5, 7, -0.25, 1e5, 2.5E-3, 10.25, 123456789.125, 0, -17],
+        "properties": {"score": 99.875, "weight": 3e+10},
+    })
+    expected = json.loads(text)
+    for chunk_size in range(1, len(text) + 2):
+        reader = JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+        values = {}
+        for key in reader.iter_object():
+            if key == "rank":
+                values[key] = list(reader.iter_array_values())
+            else:
+                values[key] = {k: reader.read_value() for k in reader.iter_object()}
+        assert values == expected, chunk_size
+
+
+def test_stream_reader_rejects_malformed_input_early():
+    """Синтаксическая ошибка в середине потока - исключение без чтения остатка потока"""
+    reader = JsonStreamReader(io.StringIO('{"a": [1, }' + " " * 100_000), chunk_size=8)
+    try:
+        reader.read_value()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("некорректный JSON должен вызывать ValueError")
+    assert len(reader._buffer) < 1000
+    
+    # Длинная строка, обрезанная границей буфера, дочитывается
+    text = "x" * 1000
+    reader = JsonStreamReader(io.StringIO(json.dumps({"a": [1, text, 3e-7]})), chunk_size=8)
+    assert reader.read_value() == {"a": [1, text, 3e-7]}
+
+
+def test_synthetic_generator():
+    """Генератор детерминирован, потоковая запись совпадает с построением в памяти"""
+    config = sarif_synth.SynthConfig(results=25, rules=4, locations_per_result=2, snippet_size=16, runs=2, seed=7)
+    
+    stream = io.StringIO()
+    sarif_synth.write_sarif(stream, config)
+    assert json.loads(stream.getvalue()) == sarif_synth.generate_sarif(config)
+    assert sarif_synth.generate_sarif(config) == sarif_synth.generate_sarif(config)
+    other = sarif_synth.SynthConfig(results=25, rules=4, locations_per_result=2, snippet_size=16, runs=2, seed=8)
+    assert sarif_synth.generate_sarif(config) != sarif_synth.generate_sarif(other)
+    
+    log = SarifParser.parse_log(json.loads(stream.getvalue()))
+    assert [len(report.findings) for report in log.reports] == [13, 12]
+    assert all(len(report.rules) == 4 for report in log.reports)
+    finding = log.reports[0].findings[0]
+    assert len(finding.locations) == 2
+    assert len(finding.locations[0].snippet) == 16
+
+
+def test_parse_profile(tmp_path):
+    """Наблюдатель получает время и счетчики по фазам, после блока отключается"""
+    path = write_sarif(tmp_path, make_sarif(6))
+    
+    with profiling() as profile:
+        report = SarifParser.parse_file(path)
+    assert SarifParser.observer is None
+    assert isinstance(profile, ParseProfile)
+    
+    phases = profile.phases
+    assert set(phases) == {"read", "decode", "tool", "rules", "findings", "locations", "stats"}
+    assert phases["read"].nbytes == phases["decode"].nbytes == os.path.getsize(path)
+    assert phases["rules"].objects == 2
+    assert phases["findings"].objects == phases["locations"].objects == 6
+    assert phases["locations"].nbytes == 6 * len("query(x)")
+    assert phases["findings"].seconds >= phases["locations"].seconds
+    
+    # Результат разбора не зависит от профилирования
+    assert report.findings == SarifParser.parse_file(path).findings
+    assert report.get_statistics() == SarifParser.parse_file(path).get_statistics()
+
+
+def test_compressed_inputs(tmp_path):
+    """Сжатые отчеты распознаются по сигнатуре, а не по расширению"""
+    text = json.dumps(make_sarif(results_count=4), ensure_ascii=False).encode("utf-8-sig")
+    expected = SarifParser.parse_dict(make_sarif(results_count=4)).findings
+    
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("README.txt", "not a report")
+        zf.writestr("out/report.sarif", text)
+    compressed = {
+        "gzip": gzip.compress(text),
+        "bz2": bz2.compress(text),
+        "xz": lzma.compress(text),
+        "zip": archive.getvalue(),
+    }
+    if sarif_io.zstandard is not None:
+        compressed["zstd"] = sarif_io.zstandard.ZstdCompressor().compress(text)
+    
+    for compression, content in compressed.items():
+        path = tmp_path / f"report_{compression}.bin"
+        path.write_bytes(content)
+        assert sarif_io.detect_compression(content) == compression
+        assert SarifParser.parse_file(str(path)).findings == expected
+        assert SarifParser.parse_bytes(content).findings == expected
+        assert list(SarifParser.iter_file(str(path))) == expected
+    
+    assert sarif_io.detect_compression(text) is None
+    assert sarif_io.is_sarif_path("scan.sarif.gz") and sarif_io.is_sarif_path("scan.zip")
+    assert not sarif_io.is_sarif_path("package.json.gz")
+
+
+def test_decompressed_size_limit(tmp_path, monkeypatch):
+    """Распаковка сверх MAX_DECOMPRESSED_SIZE прерывается ValueError во всех путях чтения"""
+    data = make_sarif(results_count=4)
+    data["runs"][0]["results"][0]["message"]["text"] = "x" * 100_000
+    text = json.dumps(data).encode("utf-8")
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("report.sarif", text)
+    monkeypatch.setattr(sarif_io, "MAX_DECOMPRESSED_SIZE", len(text) - 1)
+    
+    for name, content in (("bomb.sarif.gz", gzip.compress(text)), ("bomb.zip", archive.getvalue())):
+        path = tmp_path / name
+        path.write_bytes(content)
+        for read in (lambda: SarifParser.parse_bytes(content), lambda: SarifParser.parse_file(str(path)),
+                     lambda: list(SarifParser.iter_file(str(path)))):
+            try:
+                read()
+            except ValueError as e:
+                assert "превышают" in str(e)
+            else:
+                raise AssertionError(f"{name}: распаковка сверх предела должна вызывать ValueError")
+    
+    assert len(sarif_io.decompress_bytes(gzip.compress(text), max_size=len(text))) == len(text)
+
+
+def test_fields_projection(tmp_path):
+    """Незапрошенные поля не извлекаются, статистика по уровням и правилам не меняется"""
+    data = make_sarif(6)
+    data["runs"][0]["tool"]["driver"]["rules"][0]["fullDescription"] = {
+        "text": "Описание", "markdown": "**Описание**"}
+    path = write_sarif(tmp_path, data)
+    full = SarifParser.parse_file(path)
+    
+    report = SarifParser.parse_file(path, fields={"rule_id", "level", "file_path", "start_line"})
+    finding = report.findings[0]
+    assert finding.rule_id == "sqli" and finding.level == SeverityLevel.ERROR
+    assert finding.rule_name is None and finding.message is None and finding.fingerprint is None
+    location = finding.locations[0]
+    assert location.file_path == "src/app/module_0.py" and location.start_line == 1
+    assert location.snippet is None and location.end_line is None
+    assert report.rules["sqli"].description_markdown is None
+    assert report.stats.by_file == full.stats.by_file
+    
+    markdown = SarifParser.parse_file(path, fields={"description_markdown"})
+    assert markdown.rules["sqli"].description_markdown == "**Описание**"
+    assert markdown.rules["sqli"].description_text is None
+    
+    stats_only = SarifParser.parse_file(path, fields=STATS_FIELDS)
+    assert all(not f.locations for f in stats_only.findings)
+    assert stats_only.get_statistics() == full.get_statistics()
+    assert list(SarifParser.iter_file(path, fields=STATS_FIELDS)) == stats_only.findings
+    
+    cache = ParseCache(str(tmp_path / "cache"))
+    SarifParser.parse_file(path, cache=cache)
+    assert SarifParser.parse_file(path, cache=cache, fields=STATS_FIELDS).findings == stats_only.findings
+    assert cache.hits == 0
+    
+    try:
+        SarifParser.parse_file(path, fields={"snipet"})
+    except ValueError as e:
+        assert "snipet" in str(e)
+    else:
+        raise AssertionError("неизвестное поле должно вызывать ValueError")
+
+
+def test_snippet_store(tmp_path):
+    """Одинаковые фрагменты хранятся один раз, локации читают текст по ссылке"""
+    path = write_sarif(tmp_path, make_sarif(6))
+    report = SarifParser.parse_file(path)
+    expected = SarifParser.parse_file(path).findings
+    
+    store = SnippetStore(tmp_path / "data" / "snippets")
+    assert store.attach(report) == 6
+    assert len(store) == 1
+    location = report.findings[0].locations[0]
+    assert location.__dict__["_snippet"] is None
+    assert location.snippet == "query(x)" and location.snippet_ref in store
+    assert report.findings == expected
+    
+    # В pickle попадает текст, а не хранилище
+    restored = pickle.loads(pickle.dumps(report.findings[0]))
+    assert restored.locations[0].snippet_store is None
+    assert restored == expected[0]
+    
+    store.save()
+    reopened = SnippetStore.open(store.path)
+    other = SarifParser.parse_file(path)
+    assert reopened.attach(other) == 6 and len(reopened) == 1
+    assert other.findings[3].locations[0].snippet == "query(x)"
+
+
+def test_snippet_store_concurrent_writers(tmp_path):
+    """Открытые одновременно хранилища дописывают только свои фрагменты и не теряют чужие"""
+    first = SnippetStore.open(tmp_path / "snippets")
+    second = SnippetStore.open(tmp_path / "snippets")
+    a, b = first.put("query(a)"), second.put("query(b)")
+    shared = first.put("query(x)")
+    assert second.put("query(x)") == shared
+    second.save()
+    first.save()
+    
+    reopened = SnippetStore.open(tmp_path / "snippets")
+    assert len(reopened) == 3
+    assert reopened.get(a) == "query(a)" and reopened.get(b) == "query(b)"
+    assert reopened.get("../../etc/passwd") is None
+    assert not list(tmp_path.glob("snippets/*/*.tmp"))
+
+
+
+def test_code_flows_parsed_lazily(tmp_path):
+    """Трассы codeFlows разбираются только при обращении к Finding.code_flows"""
+    data = make_sarif(3)
+    step = lambda line, text: {
+        "location": {
+            "physicalLocation": {"artifactLocation": {"uri": "src/app/views.py"},
+                                 "region": {"startLine": line}},
+            "message": {"text": text}
+        },
+        "nestingLevel": 0,
+        "executionOrder": line,
+        "kinds": ["taint"]
+    }
+    data["runs"][0]["results"][0]["codeFlows"] = [{
+        "message": {"text": "request -> query"},
+        "threadFlows": [{"id": "main", "locations": [step(10, "source"), step(20, "sink")]}]
+    }]
+    path = write_sarif(tmp_path, data)
+    
+    report = SarifParser.parse_file(path)
+    finding = report.findings[0]
+    assert finding.has_code_flows and "_code_flows" not in finding.__dict__
+    assert not report.findings[1].has_code_flows and report.findings[1].code_flows == []
+    
+    flow = finding.code_flows[0]
+    assert flow.message == "request -> query"
+    steps = flow.thread_flows[0].locations
+    assert [s.message for s in steps] == ["source", "sink"]
+    assert steps[1].location.file_path == "src/app/views.py" and steps[1].location.start_line == 20
+    assert steps[0].kinds == ["taint"] and steps[0].execution_order == 10
+    assert finding.code_flows is finding.code_flows
+    
+    restored = pickle.loads(pickle.dumps(SarifParser.parse_file(path).findings[0]))
+    assert restored.code_flows == finding.code_flows
+    assert next(SarifParser.iter_file(path)).code_flows == finding.code_flows
+    assert SarifParser.parse_file(path, compact=True).findings[0].code_flows == finding.code_flows
+    assert not SarifParser.parse_file(path, fields={"rule_id", "file_path"}).findings[0].has_code_flows
+    
+    # Запись и повторное чтение сохраняют трассы (исходные и разобранные)
+    for source in (SarifParser.parse_dict(data), report, SarifParser.parse_dict(data, compact=True)):
+        buffer = io.BytesIO()
+        with SarifWriter(buffer) as writer:
+            writer.write_report(source)
+        written = SarifParser.parse_bytes(buffer.getvalue())
+        assert written.findings[0].code_flows == finding.code_flows
+        assert not written.findings[1].has_code_flows
+
+
 if __name__ == "__main__":
     print("🔍 SARIF Parser - Тестирование\n")
     test_parse_files()
@@ -0,0 +1,263 @@
+"""
+Тестирование хранилищ API сервера: JSON файл и SQLite ведут себя одинаково
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import storage
+
+
+def make_finding(severity="high", rule_id="sqli", status="new"):
+    return {
+        "severity": severity,
+        "ruleId": rule_id,
+        "fingerprint": f"{rule_id}-{severity}",
+        "message": "SQL-инъекция",
+        "file": "src/app/db.py",
+        "snippetRef": None,
+        "tool": "PT Application Inspector",
+        "status": status,
+        "projectName": "DM",
+        "created_at": "2024-01-01T00:00:00Z",
+    }
+
+
+@pytest.fixture(params=["json", "journal", "sqlite"])
+def store(request, tmp_path):
+    backend = storage.open_storage(request.param, tmp_path)
+    yield backend
+    backend.close()
+
+
+def test_projects_and_findings(store):
+    """Проекты, находки и статистика одинаковы для всех хранилищ"""
+    project = store.upsert_project("DM")
+    assert store.upsert_project("DM", "описание")["id"] == project["id"]
+    other = store.upsert_project("Other")
+
+    store.add_findings(project["id"], [make_finding(), make_finding("low", "xss")], ["PT AI"])
+    store.add_findings(other["id"], [make_finding("medium")])
+
+    projects = {p["name"]: p for p in store.list_projects()}
+    assert projects["DM"]["description"] == "описание"
+    assert projects["DM"]["total_findings"] == 2
+    assert projects["Other"]["total_findings"] == 1
+
+    findings = list(store.iter_findings(project["id"]))
+    assert [f["ruleId"] for f in findings] == ["sqli", "xss"]
+    assert all(f["id"] for f in findings)
+    assert len(list(store.iter_findings())) == 3
+
+    stats = store.get_statistics()
+    assert stats["total_findings"] == 3
+    assert stats["total_projects"] == 2
+    assert stats["by_severity"]["high"] == 1
+    assert stats["by_severity"]["medium"] == 1
+
+
+def test_set_finding_status(store):
+    """Смена статуса находки по id"""
+    project = store.upsert_project("DM")
+    store.add_findings(project["id"], [make_finding()])
+    finding_id = next(store.iter_findings())["id"]
+
+    assert store.set_finding_status(finding_id, "confirmed")["status"] == "confirmed"
+    assert next(store.iter_findings())["status"] == "confirmed"
+    assert store.set_finding_status("missing", "fixed") is None
+
+
+def test_query_findings_pages(store):
+    """Фильтры, сортировка и постраничный обход по курсору одинаковы для всех хранилищ"""
+    project = store.upsert_project("DM")
+    records = []
+    for i in range(25):
+        record = make_finding(("high", "low", "critical")[i % 3], f"rule-{i % 4}")
+        record["file"] = f"src/{'app' if i % 2 else 'lib'}/file{i}.py"
+        record["created_at"] = f"2024-01-01T00:00:{i:02d}Z"
+        records.append(record)
+    store.add_findings(project["id"], records)
+
+    def walk(**query):
+        items, cursor, pages = [], None, 0
+        while True:
+            page = store.query_findings(project_id=project["id"], limit=4, cursor=cursor, **query)
+            items.extend(page["items"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items, page["total"], pages
+
+    items, total, pages = walk()
+    assert total == 25 and pages == 7
+    assert [f["created_at"] for f in items] == sorted(r["created_at"] for r in records)
+
+    items, total, _ = walk(filters={"severity": ["high", "critical"]}, file_prefix="src/app/")
+    expected = [r for r in records if r["severity"] in ("high", "critical") and r["file"].startswith("src/app/")]
+    assert total == len(expected)
+    assert sorted(f["id"] for f in items) == sorted(r["id"] for r in expected)
+
+    items, _, _ = walk(sort="-severity")
+    assert [f["severity"] for f in items] == ["critical"] * 8 + ["high"] * 9 + ["low"] * 8
+    assert list(store.iter_matching(project_id=project["id"], sort="-severity")) == items
+    items, _, _ = walk(sort="severity")
+    assert [f["severity"] for f in items] == ["low"] * 8 + ["high"] * 9 + ["critical"] * 8
+
+    items, _, _ = walk(sort="-ruleId", filters={"ruleId": ["rule-1", "rule-3"]})
+    assert [f["ruleId"] for f in items] == ["rule-3"] * 6 + ["rule-1"] * 6
+    assert len({f["id"] for f in items}) == 12
+    exported = list(store.iter_matching(filters={"ruleId": ["rule-1", "rule-3"]}, sort="-ruleId"))
+    assert exported == items
+
+    with pytest.raises(ValueError):
+        store.query_findings(sort="bogus")
+    with pytest.raises(ValueError):
+        store.query_findings(cursor="!!!")
+
+
+def test_json_db_cache(tmp_path):
+    """Кэш декодированного db.json: shared видит запись другого процесса, process - нет"""
+    db_path = tmp_path / "db.json"
+    shared = storage.JsonStorage(db_path)
+    process = storage.JsonStorage(db_path, cache="process")
+    shared.upsert_project("DM")
+    assert shared.load() is process.load()
+
+    # Запись в обход кэша (другой воркер)
+    outside = storage.JsonStorage(db_path, cache=None)
+    db = outside.load()
+    db["projects"][0]["description"] = "извне"
+    outside.save(db)
+
+    assert process.list_projects()[0]["description"] == ""
+    assert shared.list_projects()[0]["description"] == "извне"
+    assert process.list_projects()[0]["description"] == "извне"
+
+    db["projects"][0]["description"] = "снова извне"
+    outside.save(db)
+    assert process.list_projects()[0]["description"] == "извне"
+    storage.invalidate_db_cache(db_path)
+    assert process.list_projects()[0]["description"] == "снова извне"
+
+
+def test_journal_replay_and_compaction(tmp_path):
+    """Журнал воспроизводится поверх снимка, уплотнение переносит его в db.json"""
+    db_path = tmp_path / "db.json"
+    journaled = storage.JournalStorage(db_path)
+    project = journaled.upsert_project("DM")
+    journaled.add_findings(project["id"], [make_finding(), make_finding("low")])
+    finding_id = next(journaled.iter_findings())["id"]
+    journaled.set_finding_status(finding_id, "fixed")
+    journaled.close()
+
+    assert not db_path.exists()
+    assert len(journaled.journal_path.read_bytes().splitlines()) == 3
+
+    # Оборванная последняя запись (сбой во время записи) отбрасывается
+    with journaled.journal_path.open("ab") as f:
+        f.write(b'{"op": "set_status", "id"')
+
+    reopened = storage.JournalStorage(db_path, compact_bytes=1)
+    assert reopened.get_statistics()["total_findings"] == 2
+    assert next(reopened.iter_findings())["status"] == "fixed"
+
+    # Запись сверх порога запускает фоновое уплотнение
+    reopened.upsert_project("DM", "описание")
+    reopened.close()
+    assert db_path.exists()
+    assert reopened.journal_path.stat().st_size == 0
+    assert not reopened.rotated_path.exists()
+
+    snapshot = storage.JsonStorage(db_path)
+    assert snapshot.list_projects()[0]["description"] == "описание"
+    assert next(snapshot.iter_findings())["status"] == "fixed"
+
+    final = storage.JournalStorage(db_path)
+    assert final.list_projects() == snapshot.list_projects()
+    final.close()
+
+
+def test_journal_rejects_failed_ops_and_corruption(tmp_path):
+    """Неудачная операция не попадает в журнал, порча в середине журнала не замалчивается"""
+    db_path = tmp_path / "db.json"
+    journaled = storage.JournalStorage(db_path)
+    project = journaled.upsert_project("DM")
+    with pytest.raises(KeyError):
+        journaled.add_findings("missing", [make_finding()])
+    journaled.add_findings(project["id"], [make_finding()])
+    # Смена статуса несуществующей находки ничего не меняет и не журналируется
+    assert journaled.set_finding_status("missing", "fixed") is None
+
+    # Второй писатель при открытом хранилище
+    with pytest.raises(RuntimeError):
+        storage.JournalStorage(db_path)
+    journaled.close()
+
+    lines = journaled.journal_path.read_bytes().splitlines(keepends=True)
+    assert len(lines) == 2
+    reopened = storage.JournalStorage(db_path)
+    assert reopened.get_statistics()["total_findings"] == 1
+    reopened.close()
+
+    journaled.journal_path.write_bytes(lines[0][:-5] + b"\n" + lines[1])
+    with pytest.raises(ValueError):
+        storage.JournalStorage(db_path)
+    assert journaled.journal_path.read_bytes() == lines[0][:-5] + b"\n" + lines[1]
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    """Перенос db.json в SQLite сохраняет проекты и находки, повторный запуск ничего не дублирует"""
+    source = storage.JsonStorage(tmp_path / "db.json")
+    project = source.upsert_project("DM", "описание")
+    source.add_findings(project["id"], [make_finding(), make_finding("low")], ["PT AI"])
+
+    sqlite_path = tmp_path / "db.sqlite3"
+    assert storage.migrate_json_to_sqlite(tmp_path / "db.json", sqlite_path) == {"projects": 1, "findings": 2}
+    assert storage.migrate_json_to_sqlite(tmp_path / "db.json", sqlite_path) == {"projects": 0, "findings": 0}
+
+    target = storage.SqliteStorage(sqlite_path)
+    try:
+        assert target.list_projects()[0]["total_findings"] == 2
+        assert list(target.iter_findings()) == list(source.iter_findings())
+    finally:
+        target.close()
+
+
+def test_migrate_open_journal_to_sqlite(tmp_path):
+    """Перенос журналируемой базы читает снимок и журнал, не изменяя их, даже при открытом хранилище"""
+    journaled = storage.JournalStorage(tmp_path / "db.json")
+    project = journaled.upsert_project("DM")
+    journaled.add_findings(project["id"], [make_finding(), make_finding("low")])
+    journaled.compact()
+    journaled.close()
+    journaled = storage.JournalStorage(tmp_path / "db.json")
+    finding_id = next(journaled.iter_findings())["id"]
+    journaled.set_finding_status(finding_id, "fixed")
+    files = {path.name: path.read_bytes() for path in tmp_path.iterdir()}
+
+    try:
+        sqlite_path = tmp_path / "db.sqlite3"
+        assert storage.migrate_json_to_sqlite(tmp_path / "db.json", sqlite_path) == {"projects": 1, "findings": 2}
+        assert {path.name: path.read_bytes() for path in tmp_path.iterdir() if path.name in files} == files
+        target = storage.SqliteStorage(sqlite_path)
+        try:
+            assert list(target.iter_findings()) == list(journaled.iter_findings())
+            assert next(target.iter_findings())["status"] == "fixed"
+        finally:
+            target.close()
+    finally:
+        journaled.close()
+
+
+def test_storage_interface_is_abstract():
+    """Хранилище без обязательных методов не создается"""
+    class Incomplete(storage.Storage):
+        def list_projects(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()